@@ -0,0 +1,902 @@
+''' Timing demonstrations for the ShortestPathsGraph.
+
+Run this file from the command line to print how long each of the
+benchmarks below takes over a range of graph sizes. '''
+
+import math
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+from timeit import default_timer
+
+import shortest_paths
+import grid_graph
+
+
+def build_random_road_graph(node_count, extra_edges_per_node=1, seed=0):
+    ''' Return a connected ShortestPathsGraph with node_count Nodes:
+    a weighted chain through every Node plus extra_edges_per_node
+    random weighted shortcuts per Node. '''
+
+    random_generator = random.Random(seed)
+    graph = shortest_paths.ShortestPathsGraph()
+
+    for each_integer in range(0, node_count):
+        graph.add_node(each_integer)
+
+    for each_index in range(1, node_count):
+        graph.add_weighted_edge(each_index - 1, each_index,
+                                random_generator.randint(1, 100))
+
+    for each_index in range(0, node_count * extra_edges_per_node):
+        graph.add_weighted_edge(random_generator.randrange(node_count),
+                                random_generator.randrange(node_count),
+                                random_generator.randint(1, 100))
+
+    return graph
+
+
+def build_grid_road_graph(side_length, seed=0):
+    ''' Return a side_length by side_length grid-shaped
+    ShortestPathsGraph with random weightings, whose Node values
+    are (row, column) tuples. Grids grow searches the way road
+    networks do, so they make a fair stand-in for one. '''
+
+    random_generator = random.Random(seed)
+    graph = shortest_paths.ShortestPathsGraph()
+
+    for each_row in range(0, side_length):
+        for each_column in range(0, side_length):
+            if each_column > 0:
+                graph.add_weighted_edge((each_row, each_column - 1),
+                                        (each_row, each_column),
+                                        random_generator.randint(1, 10))
+            if each_row > 0:
+                graph.add_weighted_edge((each_row - 1, each_column),
+                                        (each_row, each_column),
+                                        random_generator.randint(1, 10))
+
+    return graph
+
+
+def build_geometric_graph(node_count, seed=0):
+    ''' Return a ShortestPathsGraph of about node_count Nodes scattered
+    over a plane, each joined to its neighbors to the east, south and
+    both diagonals below it by Edges weighted with their length. '''
+
+    random_generator = random.Random(seed)
+    side_length = int(node_count ** 0.5)
+    graph = shortest_paths.ShortestPathsGraph()
+
+    # Each Node sits somewhere in its own unit square of a grid:
+    coordinates = {}
+    for each_row in range(0, side_length):
+        for each_column in range(0, side_length):
+            this_node = graph.add_node((each_row, each_column),
+                                       _returning=True)
+            this_node.x_coordinate = each_column + random_generator.random()
+            this_node.y_coordinate = each_row + random_generator.random()
+            coordinates[(each_row, each_column)] = (this_node.x_coordinate,
+                                                    this_node.y_coordinate)
+
+    def weighted_edges():
+        for each_row in range(0, side_length):
+            for each_column in range(0, side_length):
+                x_one, y_one = coordinates[(each_row, each_column)]
+                for row_step, column_step in ((0, 1), (1, 0), (1, 1),
+                                              (1, -1)):
+                    neighbor = (each_row + row_step, each_column + column_step)
+                    if neighbor in coordinates:
+                        x_two, y_two = coordinates[neighbor]
+                        yield ((each_row, each_column), neighbor,
+                               math.hypot(x_two - x_one, y_two - y_one))
+
+    graph.add_weighted_edges_from(weighted_edges())
+
+    return graph
+
+
+def build_cost_map(side_length, wall_fraction=0.2, seed=0):
+    ''' Return a side_length by side_length cost map, as a list of rows,
+    of open cells costing 1 with wall_fraction of the cells walled off
+    at random, leaving the two corners open. '''
+
+    random_generator = random.Random(seed)
+
+    cost_map = [[0 if random_generator.random() < wall_fraction else 1
+                 for each_column in range(0, side_length)]
+                for each_row in range(0, side_length)]
+    cost_map[0][0] = cost_map[-1][-1] = 1
+
+    return cost_map
+
+
+def build_open_field_map(side_length, seed=0):
+    ''' Return a side_length by side_length cost map, as a list of rows,
+    of open ground costing 1 with about one rectangular block of wall
+    for every ten rows, each up to a twentieth of the map across. '''
+
+    random_generator = random.Random(seed)
+
+    cost_map = [[1] * side_length for each_row in range(0, side_length)]
+    largest_block = max(side_length // 20, 1)
+
+    for each_block in range(0, side_length // 10):
+        top = random_generator.randrange(side_length)
+        left = random_generator.randrange(side_length)
+        for each_row in range(top, min(top + random_generator.randint(
+                1, largest_block), side_length)):
+            block_width = min(random_generator.randint(1, largest_block),
+                              side_length - left)
+            cost_map[each_row][left:left + block_width] = [0] * block_width
+
+    return cost_map
+
+
+def build_maze_map(side_length, seed=0):
+    ''' Return a side_length by side_length cost map, as a list of rows,
+    holding a maze of corridors one cell wide carved out of solid wall
+    by a randomized depth-first search, with open cells costing 1. '''
+
+    random_generator = random.Random(seed)
+
+    cost_map = [[0] * side_length for each_row in range(0, side_length)]
+
+    # Corridors run between the cells at odd rows and columns:
+    cost_map[1][1] = 1
+    cells_to_carve_from = [(1, 1)]
+
+    while cells_to_carve_from:
+        row, column = cells_to_carve_from[-1]
+        unvisited_neighbors = [
+            (row + row_step, column + column_step)
+            for row_step, column_step in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < row + row_step < side_length - 1
+            and 0 < column + column_step < side_length - 1
+            and not cost_map[row + row_step][column + column_step]]
+
+        if not unvisited_neighbors:
+            cells_to_carve_from.pop()
+            continue
+
+        next_row, next_column = random_generator.choice(unvisited_neighbors)
+        cost_map[(row + next_row) // 2][(column + next_column) // 2] = 1
+        cost_map[next_row][next_column] = 1
+        cells_to_carve_from.append((next_row, next_column))
+
+    return cost_map
+
+
+def build_random_dag(node_count, edges_per_node=3, seed=0):
+    ''' Return a directed acyclic ShortestPathsGraph with node_count
+    Nodes, shaped like a dependency graph: each Node leads to
+    edges_per_node random Nodes a little further along. '''
+
+    random_generator = random.Random(seed)
+    graph = shortest_paths.ShortestPathsGraph(directed=True)
+
+    for each_integer in range(0, node_count):
+        graph.add_node(each_integer)
+
+    graph.add_weighted_edges_from(
+        (each_index,
+         min(node_count - 1, each_index + random_generator.randint(1, 50)),
+         random_generator.randint(1, 100))
+        for each_index in range(0, node_count - 1)
+        for each_edge in range(0, edges_per_node))
+
+    return graph
+
+
+def count_nodes_settled_by_dijkstra(graph, start, end):
+    ''' Return how many Nodes dijkstra_algorithm settles
+    on its way from start to end. '''
+
+    settled_count = 0
+    for each_node in graph._settle_nodes(graph.nodes_by_value[start], {}, {}):
+        settled_count += 1
+        if each_node.value == end:
+            break
+    return settled_count
+
+
+def benchmark_graph_construction(node_counts):
+    ''' Time building graphs of each size in node_counts.
+    With constant-time lookups by value, the time per Node
+    should stay roughly flat as the graph grows. '''
+
+    print "\nGraph construction (add_node + add_weighted_edge):"
+    print "{:>10} {:>12} {:>16}".format("nodes", "seconds", "usec per node")
+
+    for each_node_count in node_counts:
+        started_at = default_timer()
+        build_random_road_graph(each_node_count)
+        elapsed = default_timer() - started_at
+        print "{:>10} {:>12.3f} {:>16.2f}".format(
+            each_node_count, elapsed, elapsed * 1e6 / each_node_count)
+
+
+def benchmark_bulk_edge_loading(edge_counts, seed=0):
+    ''' Time loading random weighted edge lists of each size in
+    edge_counts one add_weighted_edge() call at a time, and all at
+    once with add_weighted_edges_from(). '''
+
+    random_generator = random.Random(seed)
+
+    print "\nEdge loading (add_weighted_edge vs add_weighted_edges_from):"
+    print "{:>10} {:>12} {:>12}".format("edges", "one by one", "in bulk")
+
+    for each_edge_count in edge_counts:
+        node_count = max(2, each_edge_count // 2)
+        edge_triples = [(random_generator.randrange(node_count),
+                         random_generator.randrange(node_count),
+                         random_generator.randint(1, 100))
+                        for each_edge in range(0, each_edge_count)]
+
+        graph = shortest_paths.ShortestPathsGraph()
+        started_at = default_timer()
+        for n1, n2, weighting in edge_triples:
+            graph.add_weighted_edge(n1, n2, weighting)
+        one_by_one_seconds = default_timer() - started_at
+
+        graph = shortest_paths.ShortestPathsGraph()
+        started_at = default_timer()
+        graph.add_weighted_edges_from(edge_triples)
+        bulk_seconds = default_timer() - started_at
+
+        print "{:>10} {:>12.3f} {:>12.3f}".format(
+            each_edge_count, one_by_one_seconds, bulk_seconds)
+
+
+def benchmark_dag_shortest_paths(node_counts):
+    ''' Time shortest_path_tree() against dag_shortest_paths() and
+    critical_path() over random dependency graphs of each size in
+    node_counts. '''
+
+    print "\nFull shortest path tree on a DAG (seconds):"
+    print "{:>10} {:>12} {:>12} {:>12}".format(
+        "nodes", "dijkstra", "dag", "critical")
+
+    for each_node_count in node_counts:
+        graph = build_random_dag(each_node_count)
+
+        started_at = default_timer()
+        graph.shortest_path_tree(0)
+        dijkstra_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        graph.dag_shortest_paths(0)
+        dag_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        graph.critical_path()
+        critical_seconds = default_timer() - started_at
+
+        print "{:>10} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+            each_node_count, dijkstra_seconds, dag_seconds, critical_seconds)
+
+
+def benchmark_nearest_targets(side_lengths, target_count=20, k=5, seed=0):
+    ''' Time finding the k nearest of target_count random targets to
+    a random start on grids of each side length in side_lengths, with
+    nearest_targets() against one dijkstra_algorithm() per target. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nNearest {} of {} targets (seconds):".format(k, target_count)
+    print "{:>10} {:>14} {:>14}".format(
+        "nodes", "per target", "one search")
+
+    for each_side_length in side_lengths:
+        graph = build_grid_road_graph(each_side_length, seed)
+        all_values = graph.nodes()
+        start = random_generator.choice(all_values)
+        targets = random_generator.sample(all_values, target_count)
+
+        started_at = default_timer()
+        sorted(graph.dijkstra_algorithm(start, each_target)
+               for each_target in targets if each_target != start)[:k]
+        per_target_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        graph.nearest_targets(start, targets, k)
+        one_search_seconds = default_timer() - started_at
+
+        print "{:>10} {:>14.3f} {:>14.3f}".format(
+            each_side_length ** 2, per_target_seconds, one_search_seconds)
+
+
+def benchmark_within_cost(side_length, budgets=(10, 50, 250), seed=0):
+    ''' Time within_cost() from the middle of a side_length by
+    side_length grid for each budget in budgets, against a full
+    shortest_path_tree() from the same place. '''
+
+    graph = build_grid_road_graph(side_length, seed)
+    middle = (side_length // 2, side_length // 2)
+
+    print "\nNodes within a budget on a {}-node grid:".format(
+        side_length ** 2)
+    print "{:>10} {:>10} {:>12}".format("budget", "nodes", "seconds")
+
+    started_at = default_timer()
+    graph.shortest_path_tree(middle)
+    print "{:>10} {:>10} {:>12.4f}".format(
+        "(all)", side_length ** 2, default_timer() - started_at)
+
+    for each_budget in budgets:
+        started_at = default_timer()
+        reachable_count = sum(1 for each_pair
+                              in graph.within_cost(middle, each_budget))
+        print "{:>10} {:>10} {:>12.4f}".format(
+            each_budget, reachable_count, default_timer() - started_at)
+
+
+def benchmark_k_shortest_paths(side_lengths, k=10, query_count=5, seed=0):
+    ''' Time k_shortest_paths() between random corners of grids of each
+    side length in side_lengths, against a single dijkstra_algorithm(). '''
+
+    random_generator = random.Random(seed)
+
+    print "\n{} shortest paths on grid graphs (seconds per query):".format(k)
+    print "{:>10} {:>12} {:>12}".format("nodes", "dijkstra", "k paths")
+
+    for each_side_length in side_lengths:
+        graph = build_grid_road_graph(each_side_length, seed)
+        half_side = each_side_length // 2
+        queries = [((random_generator.randrange(half_side),
+                     random_generator.randrange(half_side)),
+                    (random_generator.randrange(half_side, each_side_length),
+                     random_generator.randrange(half_side, each_side_length)))
+                   for each_query in range(0, query_count)]
+
+        started_at = default_timer()
+        for start, end in queries:
+            graph.dijkstra_algorithm(start, end)
+        dijkstra_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        for start, end in queries:
+            graph.k_shortest_paths(start, end, k)
+        k_paths_seconds = default_timer() - started_at
+
+        print "{:>10} {:>12.3f} {:>12.3f}".format(
+            each_side_length ** 2, dijkstra_seconds / query_count,
+            k_paths_seconds / query_count)
+
+
+def benchmark_coordinate_heuristics(node_counts, query_count=10, seed=0):
+    ''' Time A* with a Euclidean heuristic between random Nodes of
+    geometric graphs of each size in node_counts: on the graph itself,
+    on its FrozenGraph with the euclidean_heuristic method, and on the
+    FrozenGraph with a EuclideanHeuristic object. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nA* with a Euclidean heuristic on geometric graphs" \
+        " (seconds per query):"
+    print "{:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "nodes", "dijkstra", "graph", "method", "object")
+
+    for each_node_count in node_counts:
+        graph = build_geometric_graph(each_node_count, seed)
+        frozen_graph = graph.freeze()
+        all_values = graph.nodes()
+        queries = [(random_generator.choice(all_values),
+                    random_generator.choice(all_values))
+                   for each_query in range(0, query_count)]
+
+        timings = []
+        for each_search in (
+                lambda start, end: frozen_graph.dijkstra_algorithm(start, end),
+                lambda start, end: graph.a_star_algorithm(
+                    start, end, heuristic=graph.euclidean_heuristic),
+                lambda start, end: frozen_graph.a_star_algorithm(
+                    start, end, heuristic=frozen_graph.euclidean_heuristic),
+                lambda start, end: frozen_graph.a_star_algorithm(
+                    start, end,
+                    heuristic=frozen_graph.coordinate_heuristic())):
+            started_at = default_timer()
+            for start, end in queries:
+                each_search(start, end)
+            timings.append((default_timer() - started_at) / query_count)
+
+        print "{:>10}".format(len(all_values)) + "".join(
+            "{:>11.4f}".format(each_timing) for each_timing in timings)
+
+
+def benchmark_grid_graph(side_lengths, query_count=10, reach=100,
+                         object_graph_side_limit=316, seed=0):
+    ''' Compare the memory a GridGraph takes per cell against a
+    ShortestPathsGraph of the same randomly walled grid, and time A*
+    with each heuristic between random cells up to reach rows and
+    columns apart on grids of each size in side_lengths. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nGridGraph A* on randomly walled grids" \
+        " (8-connected, seconds per query):"
+    print "{:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "cells", "B/cell", "grid", "build sec", "dijkstra", "euclidean",
+        "chebyshev")
+
+    for each_side_length in side_lengths:
+        cost_map = build_cost_map(each_side_length, seed=seed)
+
+        started_at = default_timer()
+        grid = grid_graph.GridGraph(cost_map)
+        build_seconds = default_timer() - started_at
+        del cost_map
+
+        cell_count = each_side_length ** 2
+
+        # The costs, plus the distances, predecessors and bytearray of
+        # settled cells that each search keeps:
+        distances, predecessors = grid._new_search_state()
+        grid_bytes = (array_bytes(grid.costs) + array_bytes(distances)
+                      + array_bytes(predecessors) + cell_count)
+        del distances, predecessors
+
+        # Building every Edge of a large grid as an object takes longer
+        # than the rest of this benchmark, so that's left to small ones.
+        if each_side_length <= object_graph_side_limit:
+            object_graph = shortest_paths.ShortestPathsGraph(directed=True)
+            for each_cell in grid.nodes():
+                object_graph.add_node(each_cell)
+                for each_neighbor in grid.neighbors(each_cell):
+                    object_graph.add_weighted_edge(each_cell, each_neighbor,
+                                                   1)
+            object_bytes_per_cell = "{:.1f}".format(
+                float(approximate_object_graph_bytes(object_graph))
+                / cell_count)
+            del object_graph
+        else:
+            object_bytes_per_cell = "-"
+
+        queries = []
+        while len(queries) < query_count:
+            start = (random_generator.randrange(each_side_length),
+                     random_generator.randrange(each_side_length))
+            end = (min(start[0] + random_generator.randint(0, reach),
+                       each_side_length - 1),
+                   min(start[1] + random_generator.randint(0, reach),
+                       each_side_length - 1))
+            if start != end and grid.has_node(start) and grid.has_node(end):
+                queries.append((start, end))
+
+        timings = []
+        for each_heuristic in (None, grid.euclidean_heuristic,
+                               grid.chebyshev_heuristic):
+            started_at = default_timer()
+            for start, end in queries:
+                grid.a_star_algorithm(start, end, each_heuristic)
+            timings.append((default_timer() - started_at) / query_count)
+
+        print "{:>10} {:>10} {:>10.1f} {:>10.3f}".format(
+            cell_count, object_bytes_per_cell,
+            float(grid_bytes) / cell_count, build_seconds) + "".join(
+                "{:>11.4f}".format(each_timing) for each_timing in timings)
+
+
+def benchmark_jump_point_search(side_lengths, query_count=5, seed=0):
+    ''' Compare A* with the Chebyshev heuristic against Jump Point
+    Search between random cells of open fields, of mazes and of maps
+    walled at random cell by cell, of each size in side_lengths, by the
+    cells each expands and the time each takes. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nA* versus Jump Point Search on uniform-cost grids" \
+        " (expansions and seconds per query):"
+    print "{:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "map", "cells", "A* cells", "JPS cells", "A* sec", "JPS sec")
+
+    for each_side_length in side_lengths:
+        for map_name, cost_map in (
+                ("open", build_open_field_map(each_side_length, seed)),
+                ("maze", build_maze_map(each_side_length, seed)),
+                ("scattered", build_cost_map(each_side_length,
+                                             wall_fraction=0.05,
+                                             seed=seed))):
+
+            grid = grid_graph.GridGraph(cost_map)
+            open_cells = grid.nodes()
+            queries = [(random_generator.choice(open_cells),
+                        random_generator.choice(open_cells))
+                       for each_query in range(0, query_count)]
+
+            expansion_counts = []
+            timings = []
+            for each_settler, each_search in (
+                    (lambda starting_id, ending_id, heuristic:
+                        grid._settle_ids(starting_id,
+                                         *grid._new_search_state(),
+                                         ending_id=ending_id,
+                                         heuristic=heuristic),
+                     lambda start, end: grid.a_star_algorithm(
+                         start, end, grid.chebyshev_heuristic)),
+                    (lambda starting_id, ending_id, heuristic:
+                        grid._settle_jump_points(starting_id, ending_id,
+                                                 *grid._new_search_state(),
+                                                 heuristic=heuristic),
+                     grid.jump_point_search)):
+
+                expansion_count = 0
+                for start, end in queries:
+                    ending_id = grid._id_of(end)
+                    for each_id in each_settler(grid._id_of(start), ending_id,
+                                                grid.chebyshev_heuristic):
+                        expansion_count += 1
+                        if each_id == ending_id:
+                            break
+                expansion_counts.append(expansion_count / query_count)
+
+                started_at = default_timer()
+                for start, end in queries:
+                    each_search(start, end)
+                timings.append((default_timer() - started_at) / query_count)
+
+            print "{:>10} {:>10} {:>10} {:>10} {:>10.4f} {:>10.4f}".format(
+                map_name, each_side_length ** 2, expansion_counts[0],
+                expansion_counts[1], timings[0], timings[1])
+
+
+def benchmark_spatial_queries(node_counts, query_count=1000, seed=0):
+    ''' Time snapping random points to their nearest Node on geometric
+    graphs of each size in node_counts, by scanning every Node against
+    nearest_node(), and time k_nearest() and nodes_in_box() too. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nSpatial queries (milliseconds per query):"
+    print "{:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "nodes", "index sec", "scan", "nearest", "10 nearest", "box")
+
+    for each_node_count in node_counts:
+        graph = build_geometric_graph(each_node_count, seed)
+        side_length = int(each_node_count ** 0.5)
+        points = [(random_generator.uniform(0, side_length),
+                   random_generator.uniform(0, side_length))
+                  for each_query in range(0, query_count)]
+
+        # Scanning is slow enough that a few queries make the point.
+        started_at = default_timer()
+        for x, y in points[:10]:
+            min(graph.node_list,
+                key=lambda each_node: math.hypot(each_node.x_coordinate - x,
+                                                 each_node.y_coordinate - y))
+        scan_milliseconds = (default_timer() - started_at) * 100
+
+        started_at = default_timer()
+        graph._spatial_index()
+        index_seconds = default_timer() - started_at
+
+        timings = []
+        for each_query in (
+                lambda x, y: graph.nearest_node(x, y),
+                lambda x, y: graph.k_nearest(x, y, 10),
+                lambda x, y: graph.nodes_in_box(x, y, x + 5, y + 5)):
+            started_at = default_timer()
+            for x, y in points:
+                each_query(x, y)
+            timings.append((default_timer() - started_at) * 1000
+                           / query_count)
+
+        print "{:>10} {:>10.3f} {:>10.3f}".format(
+            len(graph.node_list), index_seconds, scan_milliseconds) + "".join(
+                "{:>11.3f}".format(each_timing) for each_timing in timings)
+
+
+def benchmark_dynamic_shortest_path_tree(side_lengths, update_count=50,
+                                         seed=0):
+    ''' Time keeping a shortest path tree current through update_count
+    random weighting changes on grids of each side length in
+    side_lengths, by repairing a DynamicShortestPathTree against
+    building a new shortest_path_tree() after every change. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nShortest path tree kept current through {} weighting" \
+        " changes:".format(update_count)
+    print "{:>10} {:>12} {:>12} {:>14}".format(
+        "nodes", "rebuild sec", "repair sec", "touched/update")
+
+    for each_side_length in side_lengths:
+        graph = build_grid_road_graph(each_side_length, seed)
+        edge_values = [(each_edge.alpha_node.value, each_edge.beta_node.value)
+                       for each_edge in graph.edge_list]
+        updates = [random_generator.choice(edge_values)
+                   + (random_generator.randint(1, 10),)
+                   for each_update in range(0, update_count)]
+
+        started_at = default_timer()
+        for n1, n2, weighting in updates:
+            graph.add_weighted_edge(n1, n2, weighting)
+            graph.shortest_path_tree((0, 0))
+        rebuild_seconds = default_timer() - started_at
+
+        tree = graph.dynamic_shortest_path_tree((0, 0))
+        touched_before = tree.total_touched_count
+
+        started_at = default_timer()
+        for n1, n2, weighting in updates:
+            graph.add_weighted_edge(n1, n2, weighting)
+        repair_seconds = default_timer() - started_at
+
+        print "{:>10} {:>12.3f} {:>12.3f} {:>14.1f}".format(
+            each_side_length ** 2, rebuild_seconds, repair_seconds,
+            (tree.total_touched_count - touched_before)
+            / float(update_count))
+
+
+def benchmark_bidirectional_dijkstra(side_lengths, query_count=20, seed=0):
+    ''' Compare Nodes settled and time taken by dijkstra_algorithm
+    and bidirectional_dijkstra over random queries on grids. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nOne-sided versus bidirectional Dijkstra ({} random queries):" \
+        .format(query_count)
+    print "{:>10} {:>14} {:>14} {:>10} {:>10}".format(
+        "nodes", "settled 1-way", "settled 2-way", "sec 1-way", "sec 2-way")
+
+    for each_side_length in side_lengths:
+        graph = build_grid_road_graph(each_side_length)
+        all_values = graph.nodes()
+        queries = [(random_generator.choice(all_values),
+                    random_generator.choice(all_values))
+                   for each_query in range(0, query_count)]
+
+        one_way_settled = 0
+        two_way_settled = 0
+        for start, end in queries:
+            one_way_settled += count_nodes_settled_by_dijkstra(graph,
+                                                               start, end)
+            two_way_settled += graph._bidirectional_search(
+                graph.nodes_by_value[start], graph.nodes_by_value[end])[4]
+
+        started_at = default_timer()
+        for start, end in queries:
+            graph.dijkstra_algorithm(start, end)
+        one_way_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        for start, end in queries:
+            graph.bidirectional_dijkstra(start, end)
+        two_way_seconds = default_timer() - started_at
+
+        print "{:>10} {:>14} {:>14} {:>10.3f} {:>10.3f}".format(
+            len(all_values), one_way_settled // query_count,
+            two_way_settled // query_count, one_way_seconds, two_way_seconds)
+
+
+def benchmark_contraction_hierarchy(side_lengths, query_count=100, seed=0):
+    ''' Time building a ContractionHierarchy over grids, and compare its
+    query times with dijkstra_algorithm's over the same random queries. '''
+
+    random_generator = random.Random(seed)
+
+    print "\nContraction hierarchy versus Dijkstra ({} random queries):" \
+        .format(query_count)
+    print "{:>10} {:>12} {:>16} {:>16}".format(
+        "nodes", "build sec", "Dijkstra msec/q", "hierarchy msec/q")
+
+    for each_side_length in side_lengths:
+        graph = build_grid_road_graph(each_side_length)
+        all_values = graph.nodes()
+        queries = [(random_generator.choice(all_values),
+                    random_generator.choice(all_values))
+                   for each_query in range(0, query_count)]
+
+        started_at = default_timer()
+        hierarchy = graph.build_contraction_hierarchy()
+        build_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        for start, end in queries:
+            graph.dijkstra_algorithm(start, end)
+        dijkstra_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        for start, end in queries:
+            hierarchy.shortest_path(start, end)
+        hierarchy_seconds = default_timer() - started_at
+
+        print "{:>10} {:>12.2f} {:>16.3f} {:>16.3f}".format(
+            len(all_values), build_seconds,
+            dijkstra_seconds * 1000 / query_count,
+            hierarchy_seconds * 1000 / query_count)
+
+
+def benchmark_distance_matrix(side_length, matrix_size=64, seed=0):
+    ''' Time distance_matrix() on one grid with growing numbers of
+    worker processes. '''
+
+    random_generator = random.Random(seed)
+
+    graph = build_grid_road_graph(side_length)
+    all_values = graph.nodes()
+    sources = random_generator.sample(all_values, matrix_size)
+    targets = random_generator.sample(all_values, matrix_size)
+
+    print "\n{0}x{0} distance matrix on {1} nodes:".format(
+        matrix_size, len(all_values))
+    print "{:>10} {:>12} {:>10}".format("workers", "seconds", "speedup")
+
+    single_worker_seconds = None
+    worker_count = 1
+    while worker_count <= multiprocessing.cpu_count():
+        started_at = default_timer()
+        graph.distance_matrix(sources, targets, workers=worker_count)
+        elapsed = default_timer() - started_at
+        if single_worker_seconds is None:
+            single_worker_seconds = elapsed
+        print "{:>10} {:>12.3f} {:>10.2f}".format(
+            worker_count, elapsed, single_worker_seconds / elapsed)
+        worker_count *= 2
+
+
+def approximate_object_graph_bytes(graph):
+    ''' Return roughly how many bytes a graph's Node and Edge objects,
+    and the lists and dicts hanging off them, take up. Node values and
+    weightings themselves are not counted. '''
+
+    total_bytes = 0
+
+    for each_node in graph.node_list:
+        total_bytes += sys.getsizeof(each_node)
+        total_bytes += sys.getsizeof(each_node.__dict__)
+        total_bytes += sys.getsizeof(each_node.edges_for_this_node)
+        total_bytes += sys.getsizeof(each_node.edges_by_neighbor)
+
+    for each_edge in graph.edge_list:
+        total_bytes += sys.getsizeof(each_edge)
+        total_bytes += sys.getsizeof(each_edge.__dict__)
+
+    return total_bytes
+
+
+def array_bytes(each_array):
+
+    return each_array.buffer_info()[1] * each_array.itemsize
+
+
+def benchmark_frozen_graph(node_counts, object_traversal_node_limit=2000):
+    ''' Compare the memory taken per Edge and the time taken by full
+    traversals and Dijkstra's algorithm searches on random graphs
+    before and after freezing them. '''
+
+    print "\nObject graph versus FrozenGraph:"
+    print "{:>10} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "nodes", "B/edge", "frozen", "BFS sec", "frozen", "SSSP sec",
+        "frozen")
+
+    for each_node_count in node_counts:
+        graph = build_random_road_graph(each_node_count)
+        frozen_graph = graph.freeze()
+        edge_count = len(graph.edge_list)
+
+        object_bytes = approximate_object_graph_bytes(graph)
+        frozen_bytes = sum(array_bytes(each_array) for each_array
+                           in (frozen_graph.offsets, frozen_graph.targets,
+                               frozen_graph.weights))
+
+        # The object graph's traversals check visited Nodes against lists,
+        # which is quadratic, so they're only timed on small graphs.
+        if each_node_count <= object_traversal_node_limit:
+            started_at = default_timer()
+            graph.breadth_first_traversal(0)
+            object_bfs_seconds = "{:.3f}".format(default_timer() - started_at)
+        else:
+            object_bfs_seconds = "-"
+
+        started_at = default_timer()
+        frozen_graph.breadth_first_traversal(0)
+        frozen_bfs_seconds = default_timer() - started_at
+
+        # A full single-source search, from each representation's engine:
+        started_at = default_timer()
+        for each_node in graph._settle_nodes(graph.node_list[0], {}, {}):
+            pass
+        object_sssp_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        for each_id in frozen_graph._settle_ids(0, {}, {}):
+            pass
+        frozen_sssp_seconds = default_timer() - started_at
+
+        print "{:>10} {:>10.1f} {:>10.1f} {:>10} {:>10.3f} {:>10.3f} " \
+            "{:>10.3f}".format(
+                each_node_count, float(object_bytes) / edge_count,
+                float(frozen_bytes) / edge_count, object_bfs_seconds,
+                frozen_bfs_seconds, object_sssp_seconds, frozen_sssp_seconds)
+
+
+def benchmark_binary_loading(node_counts):
+    ''' Time building random graphs of each size in node_counts from
+    scratch, against loading them with load_binary() from a file written
+    by save_binary(), both mapped into memory and read into arrays. '''
+
+    print "\nBuilding versus loading a saved graph:"
+    print "{:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "nodes", "build sec", "save sec", "mmap sec", "read sec")
+
+    file_descriptor, path = tempfile.mkstemp()
+    os.close(file_descriptor)
+
+    try:
+        for each_node_count in node_counts:
+
+            started_at = default_timer()
+            graph = build_random_road_graph(each_node_count)
+            build_seconds = default_timer() - started_at
+
+            started_at = default_timer()
+            graph.save_binary(path)
+            save_seconds = default_timer() - started_at
+
+            started_at = default_timer()
+            shortest_paths.ShortestPathsGraph.load_binary(path)
+            mmap_seconds = default_timer() - started_at
+
+            started_at = default_timer()
+            shortest_paths.ShortestPathsGraph.load_binary(path, mmap=False)
+            read_seconds = default_timer() - started_at
+
+            print "{:>10} {:>12.3f} {:>12.3f} {:>12.4f} {:>12.4f}".format(
+                each_node_count, build_seconds, save_seconds, mmap_seconds,
+                read_seconds)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+
+    # Pass smaller limits on the command line for a quicker run,
+    # e.g. "python benchmark_shortest_paths.py 100000"
+    largest_graph = 1000000
+    if len(sys.argv) > 1:
+        largest_graph = int(sys.argv[1])
+
+    graph_sizes = [each_size for each_size in (1000, 10000, 100000, 1000000)
+                   if each_size <= largest_graph]
+
+    benchmark_graph_construction(graph_sizes)
+
+    benchmark_bulk_edge_loading(graph_sizes)
+
+    benchmark_dag_shortest_paths(graph_sizes)
+
+    grid_side_lengths = [int(each_size ** 0.5) for each_size in graph_sizes]
+
+    benchmark_bidirectional_dijkstra(grid_side_lengths)
+
+    benchmark_dynamic_shortest_path_tree(grid_side_lengths[:3])
+
+    benchmark_k_shortest_paths(grid_side_lengths[:3])
+
+    benchmark_nearest_targets(grid_side_lengths[:3])
+
+    benchmark_within_cost(grid_side_lengths[-1])
+
+    # Preprocessing is the slow part of a contraction hierarchy,
+    # so the largest graph is left out here.
+    benchmark_contraction_hierarchy(grid_side_lengths[:3])
+
+    benchmark_distance_matrix(grid_side_lengths[-1])
+
+    benchmark_coordinate_heuristics(graph_sizes)
+
+    benchmark_spatial_queries(graph_sizes)
+
+    # A 4096 by 4096 grid, past the largest graph, shows how little
+    # room a GridGraph needs even for tens of millions of cells.
+    benchmark_grid_graph(grid_side_lengths
+                         + ([4096] if largest_graph >= 1000000 else []))
+
+    benchmark_jump_point_search(grid_side_lengths)
+
+    benchmark_frozen_graph(graph_sizes)
+
+    benchmark_binary_loading(graph_sizes)
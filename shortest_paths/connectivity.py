@@ -0,0 +1,62 @@
+class ConnectivityIndex:
+    ''' A disjoint-set forest recording which Nodes of a graph are
+    connected to each other by some chain of Edges.
+
+    Each Node points at a parent Node, and following parents leads to
+    the root that stands for its whole component. Joining components
+    hangs the shallower tree under the deeper one (union by rank) and
+    lookups point every Node they pass straight at the root (path
+    compression), which keeps both operations close to constant time.
+
+    The forest can only ever join components, never split them, so
+    once an Edge or Node is deleted ShortestPathsGraph treats its index
+    as stale: still good for ruling paths out, but rebuilt before it is
+    asked which Nodes are connected. '''
+
+    def __init__(self):
+
+        self.parents = {}
+        self.ranks = {}
+
+    def add(self, new_node):
+        ''' Give new_node a component of its own. '''
+
+        self.parents[new_node] = new_node
+        self.ranks[new_node] = 0
+
+    def find(self, this_node):
+        ''' Return the root Node of this_node's component. '''
+
+        parents = self.parents
+
+        root_node = this_node
+        while parents[root_node] is not root_node:
+            root_node = parents[root_node]
+
+        # Point everything along the way straight at the root:
+        while this_node is not root_node:
+            parents[this_node], this_node = root_node, parents[this_node]
+
+        return root_node
+
+    def union(self, node_one, node_two):
+        ''' Merge the components holding node_one and node_two. '''
+
+        root_one = self.find(node_one)
+        root_two = self.find(node_two)
+
+        if root_one is root_two:
+            return
+
+        if self.ranks[root_one] < self.ranks[root_two]:
+            root_one, root_two = root_two, root_one
+
+        self.parents[root_two] = root_one
+        if self.ranks[root_one] == self.ranks[root_two]:
+            self.ranks[root_one] += 1
+
+    def connected(self, node_one, node_two):
+        ''' Return True if node_one and node_two are in the same
+        component and False if not. '''
+
+        return self.find(node_one) is self.find(node_two)
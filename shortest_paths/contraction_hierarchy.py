@@ -0,0 +1,391 @@
+from array import array
+from heapq import heappush, heappop
+import pickle
+
+
+infinity = float('inf')
+
+
+class ContractionHierarchy:
+    ''' A preprocessed, read-only copy of a ShortestPathsGraph that
+    answers shortest path queries much faster than searching the
+    graph itself.
+
+    Every Node is given a rank, and Nodes are "contracted" (removed)
+    from lowest rank to highest. Whenever removing a Node would break
+    a shortest path running through it, a shortcut Edge is added between
+    its neighbors to stand in for that path. Afterwards, any shortest
+    path can be found by searching only "upward" (towards higher ranks)
+    from both of its ends, which touches very few Nodes.
+
+    Build one with ShortestPathsGraph.build_contraction_hierarchy(),
+    keep it with save() and bring it back with
+    ContractionHierarchy.load(). It does not notice later changes
+    to the graph it was built from. '''
+
+    # The number of Nodes a witness search may settle before giving up
+    # and adding the shortcut anyway. Extra shortcuts never make answers
+    # wrong, only the hierarchy a little larger.
+    witness_search_limit = 50
+
+    def __init__(self, node_values, upward_offsets, upward_targets,
+                 upward_weights, downward_offsets, downward_targets,
+                 downward_weights, shortcut_middles):
+
+        # Nodes are numbered by their position in node_values.
+        self.node_values = node_values
+        self.node_ids_by_value = dict((each_value, each_id) for each_id,
+                                      each_value in enumerate(node_values))
+
+        # Both halves of the search graph are stored in compressed
+        # sparse row form: the arcs leaving Node i are the entries of
+        # the targets and weights arrays from offsets[i] to offsets[i + 1].
+        # Upward arcs are those a search from the start may follow;
+        # downward arcs are reversed, for the search from the end.
+        self.upward_offsets = upward_offsets
+        self.upward_targets = upward_targets
+        self.upward_weights = upward_weights
+        self.downward_offsets = downward_offsets
+        self.downward_targets = downward_targets
+        self.downward_weights = downward_weights
+
+        # Maps (tail id, head id) of each shortcut to the id of the
+        # contracted Node it skips over, for unpacking paths.
+        self.shortcut_middles = shortcut_middles
+
+    @classmethod
+    def from_graph(cls, graph):
+        ''' Contract every Node of the given ShortestPathsGraph
+        and return the resulting ContractionHierarchy. '''
+
+        node_values = [each_node.value for each_node in graph.node_list]
+        node_ids = dict((each_node, each_id) for each_id, each_node
+                        in enumerate(graph.node_list))
+        node_count = len(node_values)
+
+        # The graph still being contracted, as dicts of
+        # {neighbor id: weighting} per Node id in each direction.
+        outgoing_arcs = [{} for each_id in range(0, node_count)]
+        incoming_arcs = [{} for each_id in range(0, node_count)]
+
+        for tail_node, head_node, weighting in graph._weighted_arcs():
+            tail_id = node_ids[tail_node]
+            head_id = node_ids[head_node]
+            # Self-loops never shorten anything, and of any duplicate
+            # Edges only the lightest matters.
+            if tail_id == head_id:
+                continue
+            if weighting < outgoing_arcs[tail_id].get(head_id, infinity):
+                outgoing_arcs[tail_id][head_id] = weighting
+                incoming_arcs[head_id][tail_id] = weighting
+
+        shortcut_middles = {}
+        upward_arcs = [None] * node_count
+        downward_arcs = [None] * node_count
+        contracted_neighbor_counts = [0] * node_count
+
+        # Contract the Node that changes the graph least first, judged by
+        # how many shortcuts its contraction would add compared to how
+        # many arcs it would remove. Priorities go stale as neighbors are
+        # contracted, so each Node's is recomputed as it comes out of the
+        # heap, and put back if it is no longer the lowest.
+        contraction_heap = []
+        for each_id in range(0, node_count):
+            heappush(contraction_heap,
+                     (cls._contraction_priority(
+                         each_id, outgoing_arcs, incoming_arcs,
+                         contracted_neighbor_counts), each_id))
+
+        while contraction_heap:
+
+            each_id = heappop(contraction_heap)[1]
+            current_priority = cls._contraction_priority(
+                each_id, outgoing_arcs, incoming_arcs,
+                contracted_neighbor_counts)
+
+            if contraction_heap and current_priority > contraction_heap[0][0]:
+                heappush(contraction_heap, (current_priority, each_id))
+                continue
+
+            for tail_id, head_id, weighting in cls._shortcuts_needed(
+                    each_id, outgoing_arcs, incoming_arcs):
+                if weighting < outgoing_arcs[tail_id].get(head_id, infinity):
+                    outgoing_arcs[tail_id][head_id] = weighting
+                    incoming_arcs[head_id][tail_id] = weighting
+                    shortcut_middles[(tail_id, head_id)] = each_id
+
+            # Every arc still attached to this Node leads to a Node
+            # contracted later, which is to say upward.
+            upward_arcs[each_id] = outgoing_arcs[each_id]
+            downward_arcs[each_id] = incoming_arcs[each_id]
+
+            for head_id in outgoing_arcs[each_id]:
+                del incoming_arcs[head_id][each_id]
+                contracted_neighbor_counts[head_id] += 1
+            for tail_id in incoming_arcs[each_id]:
+                del outgoing_arcs[tail_id][each_id]
+                contracted_neighbor_counts[tail_id] += 1
+
+            outgoing_arcs[each_id] = None
+            incoming_arcs[each_id] = None
+
+        upward = cls._compress(upward_arcs)
+        downward = cls._compress(downward_arcs)
+
+        return cls(node_values, upward[0], upward[1], upward[2],
+                   downward[0], downward[1], downward[2], shortcut_middles)
+
+    @classmethod
+    def _contraction_priority(cls, node_id, outgoing_arcs, incoming_arcs,
+                              contracted_neighbor_counts):
+        ''' Return the "edge difference" of contracting node_id, plus the
+        number of its neighbors already contracted, which spreads
+        contraction evenly across the graph. '''
+
+        shortcut_count = len(cls._shortcuts_needed(node_id, outgoing_arcs,
+                                                   incoming_arcs))
+
+        return (shortcut_count - len(outgoing_arcs[node_id])
+                - len(incoming_arcs[node_id])
+                + contracted_neighbor_counts[node_id])
+
+    @classmethod
+    def _shortcuts_needed(cls, node_id, outgoing_arcs, incoming_arcs):
+        ''' Return (tail id, head id, weighting) for every shortcut
+        needed to preserve shortest paths through node_id if it were
+        removed from the graph. '''
+
+        shortcuts = []
+        heads = outgoing_arcs[node_id]
+
+        for tail_id, weighting_in in incoming_arcs[node_id].items():
+
+            longest_candidate = 0
+            for head_id, weighting_out in heads.items():
+                if head_id != tail_id:
+                    longest_candidate = max(longest_candidate,
+                                            weighting_in + weighting_out)
+
+            witness_distances = cls._witness_search(
+                tail_id, node_id, longest_candidate, outgoing_arcs)
+
+            for head_id, weighting_out in heads.items():
+                if head_id == tail_id:
+                    continue
+                through_this_node = weighting_in + weighting_out
+                # A "witness" path that avoids this Node and is no longer
+                # than going through it makes the shortcut unnecessary.
+                if witness_distances.get(head_id, infinity) \
+                        > through_this_node:
+                    shortcuts.append((tail_id, head_id, through_this_node))
+
+        return shortcuts
+
+    @classmethod
+    def _witness_search(cls, starting_id, avoided_id, distance_limit,
+                        outgoing_arcs):
+        ''' Run a small Dijkstra's algorithm search from starting_id
+        that never passes through avoided_id, stopping at distance_limit
+        or after settling witness_search_limit Nodes. Return the
+        distances it found. '''
+
+        distances = {starting_id: 0}
+        settled_ids = set()
+        heap_to_visit = [(0, starting_id)]
+
+        while heap_to_visit and len(settled_ids) < cls.witness_search_limit:
+
+            current_distance, current_id = heappop(heap_to_visit)
+
+            if current_id in settled_ids:
+                continue
+            if current_distance > distance_limit:
+                break
+
+            settled_ids.add(current_id)
+
+            for head_id, weighting in outgoing_arcs[current_id].items():
+                if head_id == avoided_id or head_id in settled_ids:
+                    continue
+                new_distance = current_distance + weighting
+                if new_distance < distances.get(head_id, infinity):
+                    distances[head_id] = new_distance
+                    heappush(heap_to_visit, (new_distance, head_id))
+
+        return distances
+
+    @staticmethod
+    def _compress(arcs_by_id):
+        ''' Pack a list of {head id: weighting} dicts into compressed
+        sparse row offset, target and weight arrays. '''
+
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('d')
+
+        for each_arcs in arcs_by_id:
+            for head_id, weighting in each_arcs.items():
+                targets.append(head_id)
+                weights.append(weighting)
+            offsets.append(len(targets))
+
+        return offsets, targets, weights
+
+    def shortest_path(self, start, end):
+        ''' Return the shortest path between the Nodes with the values
+        start and end in the same (cost, path) form as
+        ShortestPathsGraph.dijkstra_algorithm, or None if no path
+        exists. '''
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        try:
+            starting_id = self.node_ids_by_value[start]
+            ending_id = self.node_ids_by_value[end]
+        except KeyError:
+            raise ValueError("Cannot path between {} and {}:"
+                             " no such Node(s)".format(start, end))
+
+        best_distance, meeting_id, forward_predecessors, \
+            backward_predecessors = self._upward_search(starting_id,
+                                                        ending_id)
+
+        if meeting_id is None:
+            return None
+
+        # Read the path off in hierarchy ids (shortcuts and all), ...
+        id_path = []
+        each_id = meeting_id
+        while each_id is not None:
+            id_path.append(each_id)
+            each_id = forward_predecessors[each_id]
+        id_path.reverse()
+
+        each_id = backward_predecessors[meeting_id]
+        while each_id is not None:
+            id_path.append(each_id)
+            each_id = backward_predecessors[each_id]
+
+        # ... then replace every shortcut with the path it stands for.
+        return best_distance, [self.node_values[each_id] for each_id
+                               in self._unpack_path(id_path)]
+
+    def _upward_search(self, starting_id, ending_id):
+        ''' Search upward from both ends at once. Return (distance,
+        meeting id, forward predecessors, backward predecessors),
+        where the meeting id is None if there is no path. '''
+
+        # Index 0 holds the forward search's state, index 1 the backward's.
+        distances = ({starting_id: 0}, {ending_id: 0})
+        predecessors = ({starting_id: None}, {ending_id: None})
+        settled_ids = (set(), set())
+        heaps = ([(0, starting_id)], [(0, ending_id)])
+        arcs = ((self.upward_offsets, self.upward_targets,
+                 self.upward_weights),
+                (self.downward_offsets, self.downward_targets,
+                 self.downward_weights))
+
+        best_distance = infinity
+        meeting_id = None
+
+        # Unlike plain bidirectional Dijkstra, the two searches here may
+        # not meet on the first Node they share, because each only
+        # climbs; each side simply runs until it can't beat the best.
+        while True:
+
+            forward_can_improve = (heaps[0]
+                                   and heaps[0][0][0] < best_distance)
+            backward_can_improve = (heaps[1]
+                                    and heaps[1][0][0] < best_distance)
+
+            if forward_can_improve and (not backward_can_improve
+                                        or heaps[0][0][0] <= heaps[1][0][0]):
+                this_side = 0
+            elif backward_can_improve:
+                this_side = 1
+            else:
+                break
+
+            current_distance, current_id = heappop(heaps[this_side])
+
+            if current_id in settled_ids[this_side]:
+                continue
+
+            settled_ids[this_side].add(current_id)
+
+            other_sides_distance = distances[1 - this_side].get(current_id)
+            if other_sides_distance is not None:
+                if current_distance + other_sides_distance < best_distance:
+                    best_distance = current_distance + other_sides_distance
+                    meeting_id = current_id
+
+            offsets, targets, weights = arcs[this_side]
+            these_distances = distances[this_side]
+
+            for each_index in range(offsets[current_id],
+                                    offsets[current_id + 1]):
+                head_id = targets[each_index]
+                new_distance = current_distance + weights[each_index]
+                if new_distance < these_distances.get(head_id, infinity):
+                    these_distances[head_id] = new_distance
+                    predecessors[this_side][head_id] = current_id
+                    heappush(heaps[this_side], (new_distance, head_id))
+
+        return best_distance, meeting_id, predecessors[0], predecessors[1]
+
+    def _unpack_path(self, id_path):
+        ''' Return id_path with every shortcut arc in it
+        replaced by the original arcs it was made from. '''
+
+        unpacked_path = [id_path[0]]
+
+        for each_index in range(1, len(id_path)):
+
+            # Unpack each arc depth-first, working from its far end
+            # back so the stack pops in path order.
+            arcs_to_unpack = [(id_path[each_index - 1], id_path[each_index])]
+
+            while arcs_to_unpack:
+                tail_id, head_id = arcs_to_unpack.pop()
+                middle_id = self.shortcut_middles.get((tail_id, head_id))
+                if middle_id is None:
+                    unpacked_path.append(head_id)
+                else:
+                    arcs_to_unpack.append((middle_id, head_id))
+                    arcs_to_unpack.append((tail_id, middle_id))
+
+        return unpacked_path
+
+    def save(self, path):
+        ''' Write this ContractionHierarchy to the file at path. '''
+
+        with open(path, 'wb') as file_to_write:
+            pickle.dump(
+                {'node_values': self.node_values,
+                 'upward': (self.upward_offsets.tostring(),
+                            self.upward_targets.tostring(),
+                            self.upward_weights.tostring()),
+                 'downward': (self.downward_offsets.tostring(),
+                              self.downward_targets.tostring(),
+                              self.downward_weights.tostring()),
+                 'shortcut_middles': self.shortcut_middles},
+                file_to_write, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        ''' Return the ContractionHierarchy saved to the file at path. '''
+
+        with open(path, 'rb') as file_to_read:
+            saved = pickle.load(file_to_read)
+
+        unpacked_arrays = []
+        for each_half in (saved['upward'], saved['downward']):
+            for typecode, each_string in zip('lld', each_half):
+                each_array = array(typecode)
+                each_array.fromstring(each_string)
+                unpacked_arrays.append(each_array)
+
+        return cls(saved['node_values'], *(unpacked_arrays
+                                           + [saved['shortcut_middles']]))
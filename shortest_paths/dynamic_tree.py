@@ -0,0 +1,282 @@
+from heapq import heappush, heappop
+from itertools import count
+
+
+infinity = float('inf')
+
+
+class DynamicShortestPathTree:
+    ''' The shortest paths from one starting Node to every Node it can
+    reach, kept current as the graph they were found in changes.
+
+    Build one with ShortestPathsGraph.dynamic_shortest_path_tree(). The
+    graph tells every such tree about each Edge whose weighting is set
+    by add_weighted_edge() or which is deleted by del_edge() or
+    del_node(), and the tree repairs only the part of itself that the
+    change can affect:
+
+    An Edge that gets shorter (or is new) can only shorten paths through
+    it, so a search spreads outward from its far end and stops wherever
+    distances don't improve.
+
+    An Edge on the tree that gets longer (or goes away) can only lengthen
+    paths through it, which are exactly those to the Nodes below it in
+    the tree. Those Nodes are cut loose, given the best distance they
+    can get from the rest of the tree in one step, and searched from
+    there. Edges that get longer but aren't on the tree change nothing.
+
+    Each update counts the Nodes whose distance it had to reconsider;
+    the count for the latest one is kept in last_touched_count.
+    add_weighted_edges_from() simply rebuilds the whole tree. '''
+
+    def __init__(self, graph, starting_node):
+
+        self.graph = graph
+        self.starting_node = starting_node
+        self.start = starting_node.value
+
+        # distances[Node] is its distance from the start, predecessors[Node]
+        # is the Node before it on its shortest path and children[Node]
+        # holds the Nodes it comes before. Nodes the start cannot reach
+        # appear in none of them.
+        self.distances = {}
+        self.predecessors = {}
+        self.children = {}
+
+        self.update_count = 0
+        self.last_touched_count = 0
+        self.total_touched_count = 0
+
+        self._rebuild()
+
+    def reaches(self, n):
+        ''' Return True if there is a path from the start to the Node
+        with the value n, and False if not. '''
+
+        return self.graph.nodes_by_value.get(n) in self.distances
+
+    def distance_to(self, n):
+        ''' Return the length of the shortest path from the start to
+        the Node with the value n, or None if there is no such path. '''
+
+        return self.distances.get(self.graph.nodes_by_value.get(n))
+
+    def path_to(self, n):
+        ''' Return the values along the shortest path from the start to
+        the Node with the value n, or None if there is no such path. '''
+
+        this_node = self.graph.nodes_by_value.get(n)
+        if this_node not in self.distances:
+            return None
+
+        ordered_path_list = []
+        while this_node is not None:
+            ordered_path_list.append(this_node.value)
+            this_node = self.predecessors[this_node]
+
+        ordered_path_list.reverse()
+
+        return ordered_path_list
+
+    def _rebuild(self):
+        ''' Search the whole graph from the start again. '''
+
+        self.distances = {}
+        self.predecessors = {}
+        self.children = {}
+
+        if self.starting_node is not None:
+            for each_node in self.graph._settle_nodes(
+                    self.starting_node, self.distances, self.predecessors):
+                predecessor_node = self.predecessors[each_node]
+                if predecessor_node is not None:
+                    self.children.setdefault(predecessor_node,
+                                             set()).add(each_node)
+
+        self._record(len(self.distances))
+
+    def _edge_changed(self, node_one, node_two):
+        ''' Repair the tree after the Edge from node_one to node_two
+        has been given a new weighting, added or deleted. '''
+
+        touched_count = self._arc_changed(node_one, node_two)
+        if not self.graph.directed:
+            touched_count += self._arc_changed(node_two, node_one)
+
+        self._record(touched_count)
+
+    def _node_deleted(self, deleted_node):
+        ''' Repair the tree after deleted_node and all of its Edges
+        have been deleted from the graph. '''
+
+        if deleted_node is self.starting_node:
+            # With no start, there are no paths left to keep.
+            touched_count = len(self.distances)
+            self.starting_node = None
+            self.distances = {}
+            self.predecessors = {}
+            self.children = {}
+        elif deleted_node in self.distances:
+            touched_count = self._lengthen(deleted_node,
+                                           dropping_the_root=True)
+        else:
+            touched_count = 0
+
+        self._record(touched_count)
+
+    def _record(self, touched_count):
+
+        self.update_count += 1
+        self.last_touched_count = touched_count
+        self.total_touched_count += touched_count
+
+    def _arc_changed(self, tail_node, head_node):
+        ''' Repair the tree for a change to the one-way trip from
+        tail_node to head_node, and return how many Nodes it touched. '''
+
+        the_edge = tail_node.edges_by_neighbor.get(head_node)
+        tail_distance = self.distances.get(tail_node)
+
+        if tail_distance is None or the_edge is None:
+            distance_through_tail = infinity
+        else:
+            distance_through_tail = tail_distance + the_edge.weighting
+
+        if self.predecessors.get(head_node) is tail_node:
+            if distance_through_tail > self.distances[head_node]:
+                return self._lengthen(head_node)
+        elif head_node is self.starting_node:
+            return 0
+
+        if distance_through_tail < self.distances.get(head_node, infinity):
+            return self._shorten(head_node, distance_through_tail, tail_node)
+
+        return 0
+
+    def _shorten(self, this_node, new_distance, new_predecessor):
+        ''' Move this_node to new_distance under new_predecessor and
+        carry the improvement on to every Node it shortens the path to.
+        Returns the number of Nodes whose distance changed. '''
+
+        tie_breaker = count()
+        touched_nodes = set()
+
+        self._attach(this_node, new_predecessor, new_distance)
+        heap_to_visit = [(new_distance, next(tie_breaker), this_node)]
+
+        while heap_to_visit:
+
+            current_distance, _, current_node = heappop(heap_to_visit)
+
+            # A stale entry, for a Node that has since come closer:
+            if current_distance > self.distances[current_node]:
+                continue
+
+            touched_nodes.add(current_node)
+
+            for the_other_node, each_edge \
+                    in current_node.edges_by_neighbor.items():
+
+                distance_through_current_node = (current_distance
+                                                 + each_edge.weighting)
+
+                if (distance_through_current_node
+                        < self.distances.get(the_other_node, infinity)):
+
+                    self._attach(the_other_node, current_node,
+                                 distance_through_current_node)
+                    heappush(heap_to_visit,
+                             (distance_through_current_node,
+                              next(tie_breaker), the_other_node))
+
+        return len(touched_nodes)
+
+    def _lengthen(self, root_node, dropping_the_root=False):
+        ''' Cut root_node and every Node below it in the tree loose, then
+        find their new shortest paths from what remains of the tree.
+        With dropping_the_root, root_node leaves the tree for good.
+        Returns the number of Nodes cut loose. '''
+
+        cut_nodes = set([root_node])
+        nodes_to_cut = [root_node]
+        while nodes_to_cut:
+            for each_child in self.children.get(nodes_to_cut.pop(), ()):
+                cut_nodes.add(each_child)
+                nodes_to_cut.append(each_child)
+
+        touched_count = len(cut_nodes)
+
+        self._detach(root_node)
+        for each_node in cut_nodes:
+            del self.distances[each_node]
+            del self.predecessors[each_node]
+            self.children.pop(each_node, None)
+
+        if dropping_the_root:
+            cut_nodes.discard(root_node)
+
+        # Every cut Node starts from its best single step off the
+        # remaining tree, if it has one; Nodes outside the cut keep
+        # their distances, since none of them could have gotten longer.
+        tie_breaker = count()
+        heap_to_visit = []
+
+        for each_node in cut_nodes:
+
+            best_distance = infinity
+            best_predecessor = None
+
+            for the_other_node, each_edge \
+                    in each_node.edges_by_incoming_neighbor.items():
+
+                other_distance = self.distances.get(the_other_node)
+                if other_distance is None:
+                    continue
+
+                if other_distance + each_edge.weighting < best_distance:
+                    best_distance = other_distance + each_edge.weighting
+                    best_predecessor = the_other_node
+
+            if best_predecessor is not None:
+                self._attach(each_node, best_predecessor, best_distance)
+                heappush(heap_to_visit,
+                         (best_distance, next(tie_breaker), each_node))
+
+        while heap_to_visit:
+
+            current_distance, _, current_node = heappop(heap_to_visit)
+
+            if current_distance > self.distances[current_node]:
+                continue
+
+            for the_other_node, each_edge \
+                    in current_node.edges_by_neighbor.items():
+
+                distance_through_current_node = (current_distance
+                                                 + each_edge.weighting)
+
+                if (distance_through_current_node
+                        < self.distances.get(the_other_node, infinity)):
+
+                    self._attach(the_other_node, current_node,
+                                 distance_through_current_node)
+                    heappush(heap_to_visit,
+                             (distance_through_current_node,
+                              next(tie_breaker), the_other_node))
+
+        return touched_count
+
+    def _attach(self, this_node, predecessor_node, distance):
+        ''' Hang this_node under predecessor_node at the given distance,
+        taking it out from under its old predecessor first. '''
+
+        self._detach(this_node)
+        self.distances[this_node] = distance
+        self.predecessors[this_node] = predecessor_node
+        self.children.setdefault(predecessor_node, set()).add(this_node)
+
+    def _detach(self, this_node):
+
+        old_predecessor = self.predecessors.get(this_node)
+        if old_predecessor is not None:
+            self.children[old_predecessor].discard(this_node)
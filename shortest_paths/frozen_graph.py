@@ -0,0 +1,698 @@
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+import math
+import mmap as memory_map
+import cPickle as pickle
+import struct
+import sys
+
+# NumPy is optional; without it, mapped arrays are read through
+# MappedArray instead.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+infinity = float('inf')
+
+# The layout of files written by FrozenGraph.save_binary(): a header,
+# then offsets, targets, weights, x and y coordinates as little-endian
+# arrays, each starting on an 8-byte boundary, then the pickled tuple
+# of Node values. Bump binary_format_version whenever it changes.
+binary_file_signature = 'FROZENGR'
+binary_format_version = 1
+
+# Signature, format version, node count, arc count, value table length.
+binary_header = struct.Struct('<8sIxxxxQQQ')
+
+# Struct format character, native array typecode and width in bytes
+# of each array section, in the order they appear in the file.
+binary_sections = (('offsets', 'q', 'l', 8),
+                   ('targets', 'i', 'i', 4),
+                   ('weights', 'd', 'd', 8),
+                   ('x_coordinates', 'd', 'd', 8),
+                   ('y_coordinates', 'd', 'd', 8))
+
+
+class MappedArray:
+    ''' A read-only, array-like view of little-endian numbers stored
+    in a memory-mapped file, used by FrozenGraph.load_binary() when
+    NumPy is not installed. Items are unpacked from the mapping as they
+    are read, so nothing is copied up front. '''
+
+    def __init__(self, mapped_file, start, length, format_character):
+
+        self.mapped_file = mapped_file
+        self.start = start
+        self.length = length
+        self.item = struct.Struct('<' + format_character)
+
+    def __len__(self):
+
+        return self.length
+
+    def __getitem__(self, index):
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("MappedArray index out of range")
+
+        return self.item.unpack_from(self.mapped_file,
+                                     self.start + index * self.item.size)[0]
+
+    def __iter__(self):
+
+        for each_index in range(0, self.length):
+            yield self[each_index]
+
+
+class CoordinateHeuristic(object):
+    ''' An A* heuristic for FrozenGraphs whose Nodes have coordinates,
+    reading them straight out of the graph's coordinate arrays.
+
+    Before each search, aim_at() looks the end's coordinates up once
+    and returns a plain function that scores a Node with two array
+    reads and a little arithmetic, with nothing else to look up.
+
+    Use a subclass (EuclideanHeuristic, ManhattanHeuristic or
+    ChebyshevHeuristic), usually by way of
+    FrozenGraph.coordinate_heuristic(). '''
+
+    def __init__(self, frozen_graph):
+
+        frozen_graph._require_coordinates()
+
+        self.x_coordinates = frozen_graph.x_coordinates
+        self.y_coordinates = frozen_graph.y_coordinates
+
+        self.ending_id = None
+        self.ending_x = self.ending_y = float('nan')
+        self.estimate = None
+
+    def aim_at(self, ending_id):
+        ''' Make the Node with the id ending_id the one every estimate
+        is made towards, and return a function of a Node id that
+        makes the estimate. '''
+
+        self.ending_id = ending_id
+        self.ending_x = self.x_coordinates[ending_id]
+        self.ending_y = self.y_coordinates[ending_id]
+        self.estimate = self._estimator(self.x_coordinates,
+                                        self.y_coordinates,
+                                        self.ending_x, self.ending_y)
+
+        return self.estimate
+
+    def __call__(self, this_id, ending_id=None):
+
+        if ending_id is not None and ending_id != self.ending_id:
+            self.aim_at(ending_id)
+
+        return self.estimate(this_id)
+
+
+class EuclideanHeuristic(CoordinateHeuristic):
+    ''' Straight-line distance, for graphs whose Edges can run in
+    any direction. '''
+
+    @staticmethod
+    def _estimator(x_coordinates, y_coordinates, ending_x, ending_y):
+
+        square_root = math.sqrt
+
+        def estimate(this_id, ending_id=None):
+            x_distance = x_coordinates[this_id] - ending_x
+            y_distance = y_coordinates[this_id] - ending_y
+            return square_root(x_distance * x_distance
+                               + y_distance * y_distance)
+
+        return estimate
+
+
+class ManhattanHeuristic(CoordinateHeuristic):
+    ''' Taxicab distance, for graphs whose Edges only run along
+    the axes. '''
+
+    @staticmethod
+    def _estimator(x_coordinates, y_coordinates, ending_x, ending_y):
+
+        def estimate(this_id, ending_id=None):
+            return (abs(x_coordinates[this_id] - ending_x)
+                    + abs(y_coordinates[this_id] - ending_y))
+
+        return estimate
+
+
+class ChebyshevHeuristic(CoordinateHeuristic):
+    ''' Chessboard distance, for graphs where a diagonal step costs
+    the same as a straight one. '''
+
+    @staticmethod
+    def _estimator(x_coordinates, y_coordinates, ending_x, ending_y):
+
+        def estimate(this_id, ending_id=None):
+            return max(abs(x_coordinates[this_id] - ending_x),
+                       abs(y_coordinates[this_id] - ending_y))
+
+        return estimate
+
+
+coordinate_heuristics = {'euclidean': EuclideanHeuristic,
+                         'manhattan': ManhattanHeuristic,
+                         'chebyshev': ChebyshevHeuristic}
+
+
+class FrozenGraph(object):
+    ''' An immutable snapshot of a graph in compressed sparse row form,
+    as returned by the freeze() method of graphs with weighted Edges.
+
+    Nodes are numbered 0 to n - 1 in the order of the frozen graph's
+    node_list, and all of its arcs are kept in three flat arrays: the
+    arcs leaving Node i are those from offsets[i] to offsets[i + 1]
+    in targets (the ids of the Nodes they lead to) and weights.
+    Undirected Edges appear once in each direction, directed Edges
+    only in the direction they lead.
+
+    Searching a FrozenGraph never follows references between Node and
+    Edge objects or creates any, and its arrays take a small fraction
+    of the memory the objects do. The traversals and path algorithms
+    take and return Node values, just like the graph's own. '''
+
+    def __init__(self, node_values, offsets, targets, weights,
+                 x_coordinates, y_coordinates):
+
+        self.node_values = node_values
+
+        # Built the first time a Node is looked up by value, so loading
+        # a saved graph doesn't have to wait for it.
+        self._node_ids_by_value = None
+
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+        # NaN wherever a Node has no coordinates.
+        self.x_coordinates = x_coordinates
+        self.y_coordinates = y_coordinates
+
+        # Whether every Node has coordinates, checked the first time a
+        # coordinate heuristic needs to know.
+        self._has_all_coordinates = None
+
+        # The memory-mapped file the arrays are views of, if any,
+        # which has to stay open for as long as they do.
+        self.mapped_file = None
+
+    @property
+    def node_ids_by_value(self):
+
+        if self._node_ids_by_value is None:
+            self._node_ids_by_value = dict(
+                (each_value, each_id) for each_id, each_value
+                in enumerate(self.node_values))
+
+        return self._node_ids_by_value
+
+    @classmethod
+    def from_graph(cls, graph):
+        ''' Return a FrozenGraph holding the Nodes and weighted Edges
+        currently in graph. Of several Edges joining the same two Nodes,
+        only the lightest is kept; unweighted Edges and self-loops
+        are left out. '''
+
+        node_ids = dict((each_node, each_id) for each_id, each_node
+                        in enumerate(graph.node_list))
+
+        # A directed graph's Edges only lead away from their alpha_node.
+        directed = getattr(graph, 'directed', False)
+
+        node_values = []
+        offsets = array('l', [0])
+        targets = array('i')
+        weights = array('d')
+        x_coordinates = array('d')
+        y_coordinates = array('d')
+
+        for each_node in graph.node_list:
+
+            node_values.append(each_node.value)
+            x_coordinates.append(cls._coordinate_or_nan(
+                getattr(each_node, 'x_coordinate', None)))
+            y_coordinates.append(cls._coordinate_or_nan(
+                getattr(each_node, 'y_coordinate', None)))
+
+            lightest_arcs = {}
+            for each_edge in each_node.edges_for_this_node:
+                weighting = getattr(each_edge, 'weighting', None)
+                if weighting is None:
+                    continue
+                if each_edge.alpha_node is each_node:
+                    head_node = each_edge.beta_node
+                elif directed:
+                    continue
+                else:
+                    head_node = each_edge.alpha_node
+                # Self-loops never lead anywhere new.
+                if head_node is each_node:
+                    continue
+                head_id = node_ids[head_node]
+                if weighting < lightest_arcs.get(head_id, infinity):
+                    lightest_arcs[head_id] = weighting
+
+            for head_id, weighting in lightest_arcs.items():
+                targets.append(head_id)
+                weights.append(weighting)
+            offsets.append(len(targets))
+
+        return cls(tuple(node_values), offsets, targets, weights,
+                   x_coordinates, y_coordinates)
+
+    def save_binary(self, path):
+        ''' Write this FrozenGraph to the file at path in a fixed binary
+        layout that load_binary() can map straight into memory. Node values
+        are pickled, so the file is only as safe to load as its source
+        is trustworthy. '''
+
+        node_values_pickle = pickle.dumps(self.node_values,
+                                          pickle.HIGHEST_PROTOCOL)
+
+        with open(path, 'wb') as file_to_write:
+
+            file_to_write.write(binary_header.pack(
+                binary_file_signature, binary_format_version,
+                len(self.node_values), len(self.targets),
+                len(node_values_pickle)))
+
+            for name, format_character, typecode, width in binary_sections:
+                file_to_write.write(_little_endian_bytes(
+                    getattr(self, name), format_character, typecode, width))
+                _pad_to_eight_bytes(file_to_write)
+
+            file_to_write.write(node_values_pickle)
+
+    @classmethod
+    def load_binary(cls, path, mmap=True):
+        ''' Return the FrozenGraph saved to the file at path with
+        save_binary(). Raise ValueError if it isn't one.
+
+        With mmap, the file is mapped into memory rather than read, and
+        the graph's arrays are views of the mapping (NumPy arrays if NumPy
+        is installed, MappedArrays otherwise). Nothing is copied but the
+        Node values, so loading takes next to no time, and every process
+        that loads the same file shares one copy of it in the page cache.
+        Without mmap, the arrays are read into ordinary arrays, which are
+        faster to search.
+
+        The Node values are unpickled, and unpickling can run arbitrary
+        code, so never load a file from a source you don't trust. '''
+
+        with open(path, 'rb') as file_to_read:
+
+            signature, version, node_count, arc_count, values_length \
+                = binary_header.unpack(file_to_read.read(binary_header.size))
+
+            if signature != binary_file_signature:
+                raise ValueError("{} is not a FrozenGraph file".format(path))
+            if version != binary_format_version:
+                raise ValueError("{} has binary format version {}, but only"
+                                 " version {} can be read".format(
+                                     path, version, binary_format_version))
+
+            if mmap:
+                file_contents = memory_map.mmap(file_to_read.fileno(), 0,
+                                                access=memory_map.ACCESS_READ)
+            else:
+                file_to_read.seek(0)
+                file_contents = file_to_read.read()
+
+        section_lengths = (node_count + 1, arc_count, arc_count,
+                           node_count, node_count)
+
+        arrays = []
+        position = binary_header.size
+
+        for (name, format_character, typecode, width), length \
+                in zip(binary_sections, section_lengths):
+
+            if not mmap:
+                arrays.append(_array_from_bytes(
+                    file_contents[position:position + length * width],
+                    format_character, typecode, width))
+            elif numpy is not None:
+                arrays.append(numpy.frombuffer(
+                    file_contents, dtype='<' + format_character,
+                    count=length, offset=position))
+            else:
+                arrays.append(MappedArray(file_contents, position, length,
+                                          format_character))
+
+            position += -(-(length * width) // 8) * 8
+
+        node_values = pickle.loads(
+            file_contents[position:position + values_length])
+
+        frozen_graph = cls(node_values, *arrays)
+        if mmap:
+            frozen_graph.mapped_file = file_contents
+
+        return frozen_graph
+
+    @staticmethod
+    def _coordinate_or_nan(coordinate):
+
+        if coordinate is None:
+            return float('nan')
+        return coordinate
+
+    def nodes(self):
+        ''' Return a list containing the values of all Nodes
+        in the FrozenGraph. '''
+
+        return list(self.node_values)
+
+    def has_node(self, n):
+        ''' Return True if n is contained in the FrozenGraph
+        and False if not. '''
+
+        return n in self.node_ids_by_value
+
+    def neighbors(self, n):
+        ''' Return the values of the Nodes the Node with the value n
+        has arcs leading to. Raise an exception if n is not in the
+        FrozenGraph. '''
+
+        node_id = self._return_id_of_this_value(n)
+
+        return [self.node_values[self.targets[each_index]] for each_index
+                in range(self.offsets[node_id], self.offsets[node_id + 1])]
+
+    def _return_id_of_this_value(self, n):
+
+        try:
+            return self.node_ids_by_value[n]
+        except KeyError:
+            raise ValueError("{} not in FrozenGraph".format(n))
+
+    def depth_first_traversal(self, start):
+        ''' Perform a full depth-first traversal of the graph beginning
+        at start. Return the full visited path when traversal is complete. '''
+
+        starting_id = self._return_id_of_this_value(start)
+
+        offsets = self.offsets
+        targets = self.targets
+
+        stack_to_visit = [starting_id]
+        ids_already_added = bytearray(len(self.node_values))
+        ids_already_added[starting_id] = 1
+        visited_ids = []
+
+        while stack_to_visit:
+
+            current_id = stack_to_visit.pop()
+            visited_ids.append(current_id)
+
+            for each_index in range(offsets[current_id],
+                                    offsets[current_id + 1]):
+                each_neighbor_id = targets[each_index]
+                if not ids_already_added[each_neighbor_id]:
+                    ids_already_added[each_neighbor_id] = 1
+                    stack_to_visit.append(each_neighbor_id)
+
+        return [self.node_values[each_id] for each_id in visited_ids]
+
+    def breadth_first_traversal(self, start):
+        ''' Perform a full breadth-first traversal of the graph, beginning
+        at start. Return the full visited path when traversal is complete. '''
+
+        starting_id = self._return_id_of_this_value(start)
+
+        offsets = self.offsets
+        targets = self.targets
+
+        queue_to_visit = deque([starting_id])
+        ids_already_added = bytearray(len(self.node_values))
+        ids_already_added[starting_id] = 1
+        visited_ids = []
+
+        while queue_to_visit:
+
+            current_id = queue_to_visit.popleft()
+            visited_ids.append(current_id)
+
+            for each_index in range(offsets[current_id],
+                                    offsets[current_id + 1]):
+                each_neighbor_id = targets[each_index]
+                if not ids_already_added[each_neighbor_id]:
+                    ids_already_added[each_neighbor_id] = 1
+                    queue_to_visit.append(each_neighbor_id)
+
+        return [self.node_values[each_id] for each_id in visited_ids]
+
+    def dijkstra_algorithm(self, start, end):
+        ''' Return the (cost, path) of the shortest path between the
+        Nodes with the values start and end, or None if there is none,
+        as ShortestPathsGraph.dijkstra_algorithm does. '''
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        return self._find_path(start, end)
+
+    def a_star_algorithm(self, start, end, heuristic=None):
+        ''' Return the (cost, path) of the shortest path between the
+        Nodes with the values start and end, or None if there is none,
+        using the A* algorithm. The heuristic is called with the ids of
+        a Node and of the end, and defaults to default_heuristic; see
+        coordinate_heuristic() for faster ones on graphs with
+        coordinates. '''
+
+        if heuristic is None:
+            heuristic = self.default_heuristic
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        if heuristic in (self.euclidean_heuristic, self.manhattan_heuristic,
+                         self.chebyshev_heuristic):
+            self._require_coordinates()
+
+        return self._find_path(start, end, heuristic)
+
+    def _find_path(self, start, end, heuristic=None):
+
+        starting_id = self._return_id_of_this_value(start)
+        ending_id = self._return_id_of_this_value(end)
+
+        distances = {}
+        predecessors = {}
+
+        for each_settled_id in self._settle_ids(starting_id, distances,
+                                                predecessors, ending_id,
+                                                heuristic):
+            if each_settled_id == ending_id:
+                return distances[ending_id], self._build_path(predecessors,
+                                                              ending_id)
+
+        return None
+
+    def _settle_ids(self, starting_id, distances, predecessors,
+                    ending_id=None, heuristic=None):
+        ''' Search outward from starting_id, yielding each Node id once
+        its shortest distance is known, exactly as
+        ShortestPathsGraph._settle_nodes() does for Nodes. '''
+
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+
+        tie_breaker = count()
+        settled_ids = set()
+
+        # CoordinateHeuristics look the end up once, here, and hand back
+        # a plain function to score Nodes with.
+        if heuristic is not None and hasattr(heuristic, 'aim_at'):
+            heuristic = heuristic.aim_at(ending_id)
+
+        distances[starting_id] = 0
+        predecessors[starting_id] = None
+
+        if heuristic is None:
+            starting_priority = 0
+        else:
+            starting_priority = heuristic(starting_id, ending_id)
+
+        heap_to_visit = [(starting_priority, next(tie_breaker), starting_id)]
+
+        while heap_to_visit:
+
+            current_id = heappop(heap_to_visit)[2]
+
+            if current_id in settled_ids:
+                continue
+
+            settled_ids.add(current_id)
+            yield current_id
+
+            distance_to_current_id = distances[current_id]
+            for each_index in range(offsets[current_id],
+                                    offsets[current_id + 1]):
+
+                head_id = targets[each_index]
+                if head_id in settled_ids:
+                    continue
+
+                new_distance = distance_to_current_id + weights[each_index]
+
+                if new_distance < distances.get(head_id, infinity):
+                    distances[head_id] = new_distance
+                    predecessors[head_id] = current_id
+
+                    if heuristic is None:
+                        priority = new_distance
+                    else:
+                        priority = new_distance + heuristic(head_id,
+                                                            ending_id)
+
+                    heappush(heap_to_visit,
+                             (priority, next(tie_breaker), head_id))
+
+    def _distances_to_targets(self, source_id, target_ids):
+        ''' Run Dijkstra's algorithm from source_id until every id in
+        target_ids is settled, and return the distance to each of
+        target_ids in order (infinity where there is no path). '''
+
+        distances = {}
+        unsettled_target_ids = set(target_ids)
+        settled_ids = set()
+
+        for each_settled_id in self._settle_ids(source_id, distances, {}):
+            settled_ids.add(each_settled_id)
+            unsettled_target_ids.discard(each_settled_id)
+            if not unsettled_target_ids:
+                break
+
+        return [distances[each_id] if each_id in settled_ids else infinity
+                for each_id in target_ids]
+
+    def _build_path(self, predecessors, ending_id):
+
+        ordered_path_list = []
+        each_id = ending_id
+
+        while each_id is not None:
+            ordered_path_list.append(self.node_values[each_id])
+            each_id = predecessors[each_id]
+
+        ordered_path_list.reverse()
+
+        return ordered_path_list
+
+    def coordinate_heuristic(self, metric='euclidean'):
+        ''' Return a CoordinateHeuristic measuring by the given metric
+        ('euclidean', 'manhattan' or 'chebyshev') to pass to
+        a_star_algorithm. It scores Nodes faster than the methods
+        below. '''
+
+        if metric not in coordinate_heuristics:
+            raise ValueError("metric must be 'euclidean', 'manhattan'"
+                             " or 'chebyshev'")
+
+        return coordinate_heuristics[metric](self)
+
+    def _require_coordinates(self):
+        ''' Raise ValueError unless every Node has coordinates.
+
+        A Node without them is frozen with NaN coordinates, and any
+        estimate involving NaN is NaN, which compares as neither less
+        nor greater than anything else; heapq would then settle Nodes
+        out of order, and A* return paths that aren't the shortest. '''
+
+        if self._has_all_coordinates is None:
+            # NaN is the one value that isn't equal to itself:
+            self._has_all_coordinates = not any(
+                each_coordinate != each_coordinate
+                for each_array in (self.x_coordinates, self.y_coordinates)
+                for each_coordinate in each_array)
+
+        if not self._has_all_coordinates:
+            raise ValueError("coordinate heuristics need every Node to"
+                             " have x and y coordinates")
+
+    # The heuristics below mirror ShortestPathsGraph's, but take Node ids
+    # and read coordinates out of the coordinate arrays.
+
+    def default_heuristic(self, *args, **kwargs):
+
+        return 0
+
+    def euclidean_heuristic(self, this_id, ending_id):
+
+        x_difference = self.x_coordinates[ending_id] \
+            - self.x_coordinates[this_id]
+        y_difference = self.y_coordinates[ending_id] \
+            - self.y_coordinates[this_id]
+
+        return math.sqrt((x_difference ** 2) + (y_difference ** 2))
+
+    def manhattan_heuristic(self, this_id, ending_id):
+
+        x_difference = self.x_coordinates[ending_id] \
+            - self.x_coordinates[this_id]
+        y_difference = self.y_coordinates[ending_id] \
+            - self.y_coordinates[this_id]
+
+        return abs(x_difference) + abs(y_difference)
+
+    def chebyshev_heuristic(self, this_id, ending_id):
+
+        x_difference = self.x_coordinates[ending_id] \
+            - self.x_coordinates[this_id]
+        y_difference = self.y_coordinates[ending_id] \
+            - self.y_coordinates[this_id]
+
+        return max(abs(x_difference), abs(y_difference))
+
+
+def _little_endian_bytes(values, format_character, typecode, width):
+    ''' Return the contents of the array (or other sequence) values
+    as a string of little-endian numbers width bytes wide. '''
+
+    if (isinstance(values, array) and values.typecode == typecode
+            and values.itemsize == width):
+        if sys.byteorder == 'little':
+            return values.tostring()
+        swapped_values = array(typecode, values)
+        swapped_values.byteswap()
+        return swapped_values.tostring()
+
+    return struct.pack('<{}{}'.format(len(values), format_character),
+                       *values)
+
+
+def _array_from_bytes(data, format_character, typecode, width):
+    ''' Return a native array of the little-endian numbers, each width
+    bytes wide, in the string data. '''
+
+    new_array = array(typecode)
+
+    if new_array.itemsize != width:
+        new_array.extend(struct.unpack(
+            '<{}{}'.format(len(data) // width, format_character), data))
+        return new_array
+
+    new_array.fromstring(data)
+    if sys.byteorder != 'little':
+        new_array.byteswap()
+    return new_array
+
+
+def _pad_to_eight_bytes(file_to_write):
+
+    file_to_write.write('\0' * (-file_to_write.tell() % 8))
@@ -0,0 +1,653 @@
+from array import array
+from heapq import heappush, heappop
+from itertools import count
+import math
+
+# NumPy is optional; without it, cost maps are given as lists of rows.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+infinity = float('inf')
+
+# The (row step, column step) of each move, straight moves first.
+straight_moves = ((-1, 0), (1, 0), (0, -1), (0, 1))
+diagonal_moves = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class GridGraph(object):
+    ''' A graph of the cells of a 2D cost map, whose Edges are never
+    stored anywhere: each cell's neighbors are worked out from its
+    position whenever they are needed.
+
+    Cells are named by (row, column) and numbered row by row, so the
+    cell at (row, column) has the id row * width + column, and the
+    cost map is kept as one flat array of doubles indexed by id.
+    Moving into a cell costs that cell's cost, times the square root
+    of two for a diagonal move. Cells whose cost isn't a positive,
+    finite number are walls, which can't be entered; diagonal moves
+    can't cut the corner of a wall, either.
+
+    With 4-connectivity, cells connect to the four cells beside them;
+    with 8-connectivity, to the four diagonal ones as well. Searches
+    keep their distances, predecessors and visited cells in flat arrays
+    indexed by id too, so a grid of millions of cells takes about
+    twenty bytes per cell in all, search included, where a
+    ShortestPathsGraph of the same grid would take hundreds. '''
+
+    def __init__(self, cost_map, connectivity=8):
+
+        if connectivity not in (4, 8):
+            raise ValueError("connectivity must be 4 or 8")
+
+        self.connectivity = connectivity
+        if connectivity == 8:
+            self.moves = straight_moves + diagonal_moves
+        else:
+            self.moves = straight_moves
+
+        if numpy is not None and isinstance(cost_map, numpy.ndarray):
+            self.height, self.width = cost_map.shape
+            float_map = numpy.array(cost_map, dtype=float)
+            float_map[~(float_map > 0)] = infinity
+            self.costs = array('d')
+            self.costs.fromstring(float_map.tostring())
+        else:
+            rows = [list(each_row) for each_row in cost_map]
+            self.height = len(rows)
+            self.width = len(rows[0]) if rows else 0
+            self.costs = array('d')
+            for each_row in rows:
+                if len(each_row) != self.width:
+                    raise ValueError("every row of cost_map must be"
+                                     " the same length")
+                self.costs.extend(each_cost if each_cost > 0 else infinity
+                                  for each_cost in each_row)
+
+        # NaN isn't greater than zero, so it became infinity above.
+        passable_costs = [each_cost for each_cost in self.costs
+                          if each_cost != infinity]
+
+        # The heuristics measure distance in cells, so they're scaled
+        # by the cheapest cell to keep them from overestimating.
+        self.minimum_cost = min(passable_costs) if passable_costs else 1.0
+        self.maximum_cost = max(passable_costs) if passable_costs else 1.0
+
+        # Built by the first Jump Point Search:
+        self._walls_by_row = None
+        self._walls_by_column = None
+
+    def nodes(self):
+        ''' Return the (row, column) of every passable cell. '''
+
+        return [self._cell_of(each_id)
+                for each_id in range(0, len(self.costs))
+                if self.costs[each_id] != infinity]
+
+    def has_node(self, n):
+        ''' Return True if n is the (row, column) of a passable cell
+        and False if not. '''
+
+        try:
+            return self.costs[self._id_of(n)] != infinity
+        except (TypeError, ValueError):
+            return False
+
+    def neighbors(self, n):
+        ''' Return the (row, column) of every cell that can be moved
+        into from the cell n. Raises ValueError if n is not a
+        passable cell. '''
+
+        return [self._cell_of(each_id)
+                for each_id, each_step_cost
+                in self._steps_from(self._return_id_of_this_value(n))]
+
+    def cost_of(self, n):
+        ''' Return the cost of moving into the cell n. '''
+
+        return self.costs[self._return_id_of_this_value(n)]
+
+    def _id_of(self, n):
+
+        row, column = n
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise ValueError("{} is outside the grid".format(n))
+
+        return row * self.width + column
+
+    def _cell_of(self, this_id):
+
+        return divmod(this_id, self.width)
+
+    def _return_id_of_this_value(self, n):
+
+        this_id = self._id_of(n)
+        if self.costs[this_id] == infinity:
+            raise ValueError("{} is a wall".format(n))
+
+        return this_id
+
+    def _steps_from(self, this_id):
+        ''' Return (neighbor id, cost of moving there) for every cell
+        that can be moved into from the cell this_id. '''
+
+        costs = self.costs
+        width = self.width
+        row, column = divmod(this_id, width)
+
+        steps = []
+        for row_step, column_step in self.moves:
+
+            next_row = row + row_step
+            next_column = column + column_step
+            if not (0 <= next_row < self.height
+                    and 0 <= next_column < width):
+                continue
+
+            next_id = next_row * width + next_column
+            step_cost = costs[next_id]
+            if step_cost == infinity:
+                continue
+
+            if row_step and column_step:
+                # No cutting corners:
+                if (costs[row * width + next_column] == infinity
+                        or costs[next_row * width + column] == infinity):
+                    continue
+                step_cost *= math.sqrt(2)
+
+            steps.append((next_id, step_cost))
+
+        return steps
+
+    def dijkstra_algorithm(self, start, end):
+        ''' Return the (cost, path) of the cheapest path between the
+        cells start and end, as a list of (row, column), or None if
+        there is none, as ShortestPathsGraph.dijkstra_algorithm does. '''
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        return self._find_path(start, end)
+
+    def a_star_algorithm(self, start, end, heuristic=None):
+        ''' Return the (cost, path) of the cheapest path between the
+        cells start and end, or None if there is none, using the A*
+        algorithm. The heuristic is called with the ids of a cell and
+        of the end, and defaults to default_heuristic. '''
+
+        if heuristic is None:
+            heuristic = self.default_heuristic
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        return self._find_path(start, end, heuristic)
+
+    def jump_point_search(self, start, end, heuristic=None):
+        ''' Return the (cost, path) of the cheapest path between the
+        cells start and end, or None if there is none, as
+        a_star_algorithm does, but using Jump Point Search.
+
+        On a grid where every open cell costs the same, most cheapest
+        paths have many twins of equal cost that differ only in the
+        order of their moves, and A* expands the cells along all of
+        them. Jump Point Search prunes those symmetric moves and jumps
+        in straight lines past every cell where nothing new could
+        branch off, expanding only the "jump points" where a wall
+        forces a turn. The path returned is the same cost A*'s would
+        be, spelled out cell by cell.
+
+        Only works on 8-connected grids whose open cells all cost the
+        same; raises ValueError on any other. The heuristic defaults to
+        chebyshev_heuristic. '''
+
+        if self.connectivity != 8:
+            raise ValueError("Jump Point Search needs an 8-connected grid")
+        if self.minimum_cost != self.maximum_cost:
+            raise ValueError("Jump Point Search needs every open cell"
+                             " to cost the same")
+
+        if heuristic is None:
+            heuristic = self.chebyshev_heuristic
+
+        # The trivial case.
+        if start == end:
+            return [start]
+
+        starting_id = self._return_id_of_this_value(start)
+        ending_id = self._return_id_of_this_value(end)
+
+        distances, predecessors = self._new_search_state()
+
+        for each_settled_id in self._settle_jump_points(
+                starting_id, ending_id, distances, predecessors, heuristic):
+            if each_settled_id == ending_id:
+                return distances[ending_id], self._fill_in_jumps(
+                    self._build_path(predecessors, ending_id))
+
+        return None
+
+    def _find_path(self, start, end, heuristic=None):
+
+        starting_id = self._return_id_of_this_value(start)
+        ending_id = self._return_id_of_this_value(end)
+
+        distances, predecessors = self._new_search_state()
+
+        for each_settled_id in self._settle_ids(starting_id, distances,
+                                                predecessors, ending_id,
+                                                heuristic):
+            if each_settled_id == ending_id:
+                return distances[ending_id], self._build_path(predecessors,
+                                                              ending_id)
+
+        return None
+
+    def _new_search_state(self):
+        ''' Return the distances and predecessors arrays a search fills
+        in, indexed by cell id: every distance infinity and every
+        predecessor -1, meaning none, until the search reaches it. '''
+
+        cell_count = len(self.costs)
+
+        return array('d', [infinity]) * cell_count, \
+            array('i', [-1]) * cell_count
+
+    def _settle_ids(self, starting_id, distances, predecessors,
+                    ending_id=None, heuristic=None):
+        ''' Search outward from starting_id, yielding each cell's id once
+        its cheapest distance is known, exactly as
+        ShortestPathsGraph._settle_nodes() does for Nodes. distances and
+        predecessors are filled in as _new_search_state() lays them out.
+        '''
+
+        costs = self.costs
+        width = self.width
+        height = self.height
+        moves = self.moves
+        diagonal_multiplier = math.sqrt(2)
+
+        tie_breaker = count()
+        settled_ids = bytearray(len(costs))
+
+        distances[starting_id] = 0
+        predecessors[starting_id] = -1
+
+        if heuristic is None:
+            starting_priority = 0
+        else:
+            starting_priority = heuristic(starting_id, ending_id)
+
+        heap_to_visit = [(starting_priority, next(tie_breaker), starting_id)]
+
+        while heap_to_visit:
+
+            current_id = heappop(heap_to_visit)[2]
+
+            if settled_ids[current_id]:
+                continue
+
+            settled_ids[current_id] = 1
+            yield current_id
+
+            distance_to_current_id = distances[current_id]
+            row, column = divmod(current_id, width)
+
+            # The same steps as _steps_from(), written out here
+            # because this is where searches spend their time.
+            for row_step, column_step in moves:
+
+                next_row = row + row_step
+                next_column = column + column_step
+                if not (0 <= next_row < height
+                        and 0 <= next_column < width):
+                    continue
+
+                head_id = next_row * width + next_column
+                if settled_ids[head_id]:
+                    continue
+
+                step_cost = costs[head_id]
+                if step_cost == infinity:
+                    continue
+
+                if row_step and column_step:
+                    if (costs[row * width + next_column] == infinity
+                            or costs[next_row * width + column] == infinity):
+                        continue
+                    step_cost *= diagonal_multiplier
+
+                new_distance = distance_to_current_id + step_cost
+
+                if new_distance < distances[head_id]:
+                    distances[head_id] = new_distance
+                    predecessors[head_id] = current_id
+
+                    if heuristic is None:
+                        priority = new_distance
+                    else:
+                        priority = new_distance + heuristic(head_id,
+                                                            ending_id)
+
+                    heappush(heap_to_visit,
+                             (priority, next(tie_breaker), head_id))
+
+    def _settle_jump_points(self, starting_id, ending_id, distances,
+                            predecessors, heuristic):
+        ''' Search from starting_id toward ending_id as _settle_ids()
+        does, but over jump points only, yielding each one's id once
+        its cheapest distance is known. predecessors[id] is the jump
+        point that the jump to id was made from. '''
+
+        if self._walls_by_row is None:
+            self._build_wall_tables()
+
+        width = self.width
+        straight_cost = self.minimum_cost
+        diagonal_cost = self.minimum_cost * math.sqrt(2)
+
+        tie_breaker = count()
+        settled_ids = bytearray(len(self.costs))
+
+        distances[starting_id] = 0
+        predecessors[starting_id] = -1
+
+        heap_to_visit = [(heuristic(starting_id, ending_id),
+                          next(tie_breaker), starting_id)]
+
+        while heap_to_visit:
+
+            current_id = heappop(heap_to_visit)[2]
+
+            if settled_ids[current_id]:
+                continue
+
+            settled_ids[current_id] = 1
+            yield current_id
+
+            distance_to_current_id = distances[current_id]
+            row, column = divmod(current_id, width)
+
+            for row_step, column_step in self._pruned_moves(
+                    current_id, predecessors[current_id]):
+
+                jump_point_id = self._jump(row, column, row_step,
+                                           column_step, ending_id)
+                if jump_point_id is None or settled_ids[jump_point_id]:
+                    continue
+
+                # Every jump is a straight or diagonal line, so its
+                # cost is its length in steps of one kind.
+                jump_row, jump_column = divmod(jump_point_id, width)
+                step_count = max(abs(jump_row - row),
+                                 abs(jump_column - column))
+                if row_step and column_step:
+                    new_distance = (distance_to_current_id
+                                    + step_count * diagonal_cost)
+                else:
+                    new_distance = (distance_to_current_id
+                                    + step_count * straight_cost)
+
+                if new_distance < distances[jump_point_id]:
+                    distances[jump_point_id] = new_distance
+                    predecessors[jump_point_id] = current_id
+                    heappush(heap_to_visit,
+                             (new_distance + heuristic(jump_point_id,
+                                                       ending_id),
+                              next(tie_breaker), jump_point_id))
+
+    def _pruned_moves(self, this_id, predecessor_id):
+        ''' Return the moves worth jumping along from this_id, having
+        jumped there from predecessor_id, or -1 for the start.
+
+        Without corner cutting, walls never force a turn off a diagonal,
+        so a diagonal jump carries on in its own direction and the two
+        straight ones it is made of. A straight jump carries on ahead,
+        diagonally ahead to either side, and out to either side; any of
+        these that are walled off get no further than _jump(). '''
+
+        if predecessor_id == -1:
+            return self.moves
+
+        row, column = divmod(this_id, self.width)
+        predecessor_row, predecessor_column = divmod(predecessor_id,
+                                                     self.width)
+        row_step = cmp(row, predecessor_row)
+        column_step = cmp(column, predecessor_column)
+
+        if row_step and column_step:
+            return ((row_step, column_step), (row_step, 0), (0, column_step))
+        elif row_step:
+            return ((row_step, 0), (row_step, -1), (row_step, 1),
+                    (0, -1), (0, 1))
+        else:
+            return ((0, column_step), (-1, column_step), (1, column_step),
+                    (-1, 0), (1, 0))
+
+    def _jump(self, row, column, row_step, column_step, ending_id):
+        ''' Step from (row, column) by (row_step, column_step) until
+        reaching a jump point, and return its id, or return None if a
+        wall or the edge of the grid comes first.
+
+        A jump point is the end, a cell beside which a wall has just
+        ended (so the cell past the wall's end can only be reached
+        cheapest by turning here), or, for a diagonal jump, a cell from
+        which a straight jump would find a jump point. '''
+
+        if not (row_step and column_step):
+            return self._jump_straight(row, column, row_step, column_step,
+                                       ending_id)
+
+        costs = self.costs
+        width = self.width
+        height = self.height
+
+        while True:
+
+            next_row = row + row_step
+            next_column = column + column_step
+            if not (0 <= next_row < height and 0 <= next_column < width):
+                return None
+
+            this_id = next_row * width + next_column
+            if costs[this_id] == infinity:
+                return None
+
+            # No cutting corners:
+            if (costs[row * width + next_column] == infinity
+                    or costs[next_row * width + column] == infinity):
+                return None
+
+            row = next_row
+            column = next_column
+
+            if this_id == ending_id:
+                return this_id
+
+            if (self._jump_straight(row, column, row_step, 0, ending_id)
+                    is not None
+                    or self._jump_straight(row, column, 0, column_step,
+                                           ending_id) is not None):
+                return this_id
+
+    def _jump_straight(self, row, column, row_step, column_step, ending_id):
+        ''' _jump() along a row or a column.
+
+        Rather than stepping cell by cell, this searches the walls
+        of the line and of the lines to either side of it, as stored in
+        _walls_by_row or _walls_by_column, with bytearray.find(): the
+        jump ends at the first of the next wall, the end, or the first
+        place where a side line goes from wall to open. '''
+
+        if row_step:
+            # Scanning down a column, with columns to either side:
+            walls = self._walls_by_column
+            line_length = self.height
+            line = column
+            line_count = self.width
+            position = row
+            direction = row_step
+        else:
+            walls = self._walls_by_row
+            line_length = self.width
+            line = row
+            line_count = self.height
+            position = column
+            direction = column_step
+
+        line_start = line * line_length
+        side_line_starts = []
+        if line > 0:
+            side_line_starts.append(line_start - line_length)
+        if line < line_count - 1:
+            side_line_starts.append(line_start + line_length)
+
+        ending_row, ending_column = divmod(ending_id, self.width)
+        if row_step:
+            ending_line, ending_position = ending_column, ending_row
+        else:
+            ending_line, ending_position = ending_row, ending_column
+
+        if direction > 0:
+            # The open run ahead covers positions up to, not including,
+            # the next wall or the end of the line:
+            wall_index = walls.find('\x01', line_start + position + 1,
+                                    line_start + line_length)
+            run_end = (line_length if wall_index == -1
+                       else wall_index - line_start)
+
+            jump_position = None
+            if (ending_line == line
+                    and position < ending_position < run_end):
+                jump_position = ending_position
+
+            for each_side_start in side_line_starts:
+                # A wall at k and an open cell at k + 1 make k + 1 a
+                # jump point:
+                pattern_index = walls.find('\x01\x00',
+                                           each_side_start + position,
+                                           each_side_start + run_end)
+                if pattern_index != -1:
+                    forced_position = pattern_index - each_side_start + 1
+                    if jump_position is None or forced_position \
+                            < jump_position:
+                        jump_position = forced_position
+        else:
+            wall_index = walls.rfind('\x01', line_start,
+                                     line_start + position)
+            run_end = -1 if wall_index == -1 else wall_index - line_start
+
+            jump_position = None
+            if (ending_line == line
+                    and run_end < ending_position < position):
+                jump_position = ending_position
+
+            for each_side_start in side_line_starts:
+                # An open cell at k and a wall at k + 1 make k a jump
+                # point, scanning backward:
+                pattern_index = walls.rfind('\x00\x01',
+                                            each_side_start + run_end + 1,
+                                            each_side_start + position + 1)
+                if pattern_index != -1:
+                    forced_position = pattern_index - each_side_start
+                    if jump_position is None or forced_position \
+                            > jump_position:
+                        jump_position = forced_position
+
+        if jump_position is None:
+            return None
+        elif row_step:
+            return jump_position * self.width + column
+        else:
+            return row * self.width + jump_position
+
+    def _build_wall_tables(self):
+        ''' Mark every wall with a 1 in two bytearrays, one laid out row
+        by row like the costs and one column by column, for
+        _jump_straight() to search. '''
+
+        self._walls_by_row = bytearray(each_cost == infinity
+                                       for each_cost in self.costs)
+
+        self._walls_by_column = bytearray(len(self.costs))
+        for each_column in range(0, self.width):
+            self._walls_by_column[each_column * self.height:
+                                  (each_column + 1) * self.height] = \
+                self._walls_by_row[each_column::self.width]
+
+    def _fill_in_jumps(self, jump_point_path):
+        ''' Return jump_point_path, a list of (row, column) each a
+        straight or diagonal line apart, with every cell between
+        them filled in. '''
+
+        ordered_path_list = jump_point_path[:1]
+
+        for row, column in jump_point_path[1:]:
+            last_row, last_column = ordered_path_list[-1]
+            row_step = cmp(row, last_row)
+            column_step = cmp(column, last_column)
+            while (last_row, last_column) != (row, column):
+                last_row += row_step
+                last_column += column_step
+                ordered_path_list.append((last_row, last_column))
+
+        return ordered_path_list
+
+    def _build_path(self, predecessors, ending_id):
+
+        ordered_path_list = []
+        each_id = ending_id
+
+        while each_id != -1:
+            ordered_path_list.append(self._cell_of(each_id))
+            each_id = predecessors[each_id]
+
+        ordered_path_list.reverse()
+
+        return ordered_path_list
+
+    # The heuristics below mirror ShortestPathsGraph's, but take cell ids
+    # and measure in cells, scaled by the cheapest cell's cost.
+    # Moving diagonally costs more than moving straight, so the
+    # Manhattan heuristic can overestimate with 8-connectivity, where
+    # the Chebyshev and Euclidean heuristics never do.
+
+    def default_heuristic(self, *args, **kwargs):
+
+        return 0
+
+    def euclidean_heuristic(self, this_id, ending_id):
+
+        row_difference, column_difference = self._differences(this_id,
+                                                              ending_id)
+
+        return self.minimum_cost * math.sqrt(
+            (row_difference ** 2) + (column_difference ** 2))
+
+    def manhattan_heuristic(self, this_id, ending_id):
+
+        row_difference, column_difference = self._differences(this_id,
+                                                              ending_id)
+
+        return self.minimum_cost * (row_difference + column_difference)
+
+    def chebyshev_heuristic(self, this_id, ending_id):
+
+        row_difference, column_difference = self._differences(this_id,
+                                                              ending_id)
+
+        return self.minimum_cost * max(row_difference, column_difference)
+
+    def _differences(self, this_id, ending_id):
+        ''' Return how many rows and how many columns apart two cells
+        are. '''
+
+        this_row, this_column = divmod(this_id, self.width)
+        ending_row, ending_column = divmod(ending_id, self.width)
+
+        return abs(ending_row - this_row), abs(ending_column - this_column)
@@ -0,0 +1,268 @@
+from array import array
+import random
+
+
+infinity = float('inf')
+
+
+class LandmarkHeuristic:
+    ''' An A* heuristic for ShortestPathsGraphs with no coordinates,
+    built from precomputed distances to a handful of "landmark" Nodes.
+
+    By the triangle inequality, no path from a Node to a target can be
+    shorter than the difference between their distances to any one
+    landmark, so the largest such difference is a lower bound on the
+    true distance. That keeps the heuristic admissible (and consistent),
+    which A* needs in order to return shortest paths.
+
+    In a directed graph, distances to a landmark differ from distances
+    from it, so both are kept, and each gives a bound of its own.
+
+    Build one with ShortestPathsGraph.build_landmark_heuristic() and pass
+    it as a_star_algorithm's heuristic. Its tables describe the graph
+    as it was when they were built, so rebuild it after changing the
+    graph; Nodes added since then are given no guidance (a guess of 0). '''
+
+    def __init__(self, graph, landmark_count=8, strategy='farthest',
+                 seed=None):
+
+        if strategy not in ('farthest', 'avoid'):
+            raise ValueError("strategy must be 'farthest' or 'avoid'")
+
+        self.graph = graph
+        self.node_ids = dict((each_node, each_id) for each_id, each_node
+                             in enumerate(graph.node_list))
+        self.node_count = len(graph.node_list)
+        self.directed = getattr(graph, 'directed', False)
+
+        # Distances are kept in one flat array of doubles, one row of
+        # node_count entries per landmark, so Node i's distance from
+        # landmark j is landmark_distances[j * node_count + i].
+        self.landmarks = []
+        self.landmark_distances = array('d')
+
+        # Laid out the same way, but only filled in for directed graphs:
+        # Node i's distance to landmark j.
+        self.distances_to_landmarks = array('d')
+
+        # The target's distances only change when the target does,
+        # so they're kept from one call to the next.
+        self._cached_target = None
+        self._cached_target_distances = ()
+
+        self._random_generator = random.Random(seed)
+
+        landmark_count = min(landmark_count, self.node_count)
+
+        while len(self.landmarks) < landmark_count:
+            if strategy == 'farthest' or not self.landmarks:
+                next_landmark = self._farthest_node()
+            else:
+                next_landmark = self._avoiding_node()
+            if next_landmark is None:
+                break
+            self._add_landmark(next_landmark)
+
+    def __call__(self, this_node, ending_node):
+        ''' Return a lower bound on the distance from this_node
+        to ending_node. '''
+
+        if ending_node is not self._cached_target:
+            self._cached_target = ending_node
+            self._cached_target_distances = self._distances_of(ending_node)
+
+        this_node_id = self.node_ids.get(this_node)
+        if this_node_id is None:
+            return 0
+
+        if self.directed:
+            return self._directed_bound(this_node_id)
+
+        best_bound = 0
+        landmark_distances = self.landmark_distances
+
+        for each_row_start, target_distance \
+                in self._cached_target_distances:
+
+            this_distance = landmark_distances[each_row_start + this_node_id]
+
+            # A landmark that can't reach both Nodes says nothing
+            # about the distance between them.
+            if this_distance == infinity:
+                continue
+
+            bound = abs(target_distance - this_distance)
+            if bound > best_bound:
+                best_bound = bound
+
+        return best_bound
+
+    def _directed_bound(self, this_node_id):
+        ''' Return the lower bound for a directed graph. The distance
+        from this Node to the target can be no shorter than the target's
+        distance from a landmark less this Node's, nor than this Node's
+        distance to a landmark less the target's. '''
+
+        best_bound = 0
+        landmark_distances = self.landmark_distances
+        distances_to_landmarks = self.distances_to_landmarks
+
+        for each_row_start, target_distance_from, target_distance_to \
+                in self._cached_target_distances:
+
+            distance_from = landmark_distances[each_row_start + this_node_id]
+            if distance_from != infinity and target_distance_from != infinity:
+                bound = target_distance_from - distance_from
+                if bound > best_bound:
+                    best_bound = bound
+
+            distance_to = distances_to_landmarks[each_row_start
+                                                 + this_node_id]
+            if distance_to != infinity and target_distance_to != infinity:
+                bound = distance_to - target_distance_to
+                if bound > best_bound:
+                    best_bound = bound
+
+        return best_bound
+
+    def _distances_of(self, this_node):
+        ''' Return (row start, distance) pairs for this_node and every
+        landmark that can reach it. In a directed graph, return (row
+        start, distance from, distance to) for every landmark that can
+        reach it or be reached from it instead. '''
+
+        this_node_id = self.node_ids.get(this_node)
+        if this_node_id is None:
+            return ()
+
+        distances = []
+        for each_index in range(0, len(self.landmarks)):
+            each_row_start = each_index * self.node_count
+            each_distance = self.landmark_distances[each_row_start
+                                                    + this_node_id]
+            if self.directed:
+                each_distance_to = self.distances_to_landmarks[
+                    each_row_start + this_node_id]
+                if each_distance != infinity \
+                        or each_distance_to != infinity:
+                    distances.append((each_row_start, each_distance,
+                                      each_distance_to))
+            elif each_distance != infinity:
+                distances.append((each_row_start, each_distance))
+
+        return tuple(distances)
+
+    def _add_landmark(self, landmark_node):
+
+        self.landmarks.append(landmark_node)
+        self.landmark_distances.extend(self._distance_row(landmark_node))
+        if self.directed:
+            self.distances_to_landmarks.extend(
+                self._distance_row(landmark_node, reverse=True))
+
+        self._cached_target = None
+
+    def _distance_row(self, landmark_node, reverse=False):
+        ''' Return an array of every Node's distance from landmark_node
+        (or to it, with reverse), by Node id. '''
+
+        distances = self._distances_from(landmark_node, reverse)[0]
+
+        row = array('d', [infinity]) * self.node_count
+        for each_node, each_distance in distances.items():
+            row[self.node_ids[each_node]] = each_distance
+
+        return row
+
+    def _distances_from(self, starting_node, reverse=False):
+        ''' Return (distances, predecessors, settling order) from a
+        full Dijkstra's algorithm search starting at starting_node,
+        following Edges backward with reverse. '''
+
+        distances = {}
+        predecessors = {}
+        settling_order = list(self.graph._settle_nodes(
+            starting_node, distances, predecessors, reverse=reverse))
+
+        return distances, predecessors, settling_order
+
+    def _farthest_node(self):
+        ''' Return the Node farthest from every landmark chosen so far,
+        or, for the first landmark, from a randomly chosen Node. Nodes
+        no landmark can reach count as infinitely far away, which spreads
+        landmarks across separate parts of the graph. '''
+
+        if not self.landmarks:
+            random_node = self._random_generator.choice(self.graph.node_list)
+            distances = self._distances_from(random_node)[0]
+            return max(distances, key=distances.get)
+
+        best_node = None
+        best_distance = -1
+
+        for each_node, each_id in self.node_ids.items():
+            if each_node in self.landmarks:
+                continue
+            closest_landmark_distance = min(
+                self.landmark_distances[each_index * self.node_count
+                                        + each_id]
+                for each_index in range(0, len(self.landmarks)))
+            if closest_landmark_distance > best_distance:
+                best_node = each_node
+                best_distance = closest_landmark_distance
+
+        return best_node
+
+    def _avoiding_node(self):
+        ''' Choose the next landmark by the "avoid" strategy: grow a
+        shortest path tree from a random root, score each Node by how
+        badly the current landmarks underestimate its distance from the
+        root, and descend towards the worst-served subtree that holds
+        no landmark yet, taking the leaf that is reached. '''
+
+        root_node = self._random_generator.choice(self.graph.node_list)
+        distances, predecessors, settling_order \
+            = self._distances_from(root_node)
+
+        landmark_set = set(self.landmarks)
+        subtree_sizes = {}
+        subtrees_holding_landmarks = set()
+        children = {}
+
+        # Children always settle after their parents, so walking the
+        # settling order backward totals each subtree before its root.
+        for each_node in reversed(settling_order):
+
+            if each_node in landmark_set:
+                subtrees_holding_landmarks.add(each_node)
+
+            if each_node not in subtrees_holding_landmarks:
+                subtree_sizes[each_node] = (
+                    subtree_sizes.get(each_node, 0) + distances[each_node]
+                    - self(root_node, each_node))
+
+            parent_node = predecessors[each_node]
+            if parent_node is None:
+                continue
+
+            children.setdefault(parent_node, []).append(each_node)
+
+            # A landmark anywhere below a Node rules out its whole subtree.
+            if each_node in subtrees_holding_landmarks:
+                subtrees_holding_landmarks.add(parent_node)
+            else:
+                subtree_sizes[parent_node] = (subtree_sizes.get(parent_node, 0)
+                                              + subtree_sizes[each_node])
+
+        current_node = root_node
+        while children.get(current_node):
+            candidates = [each_child for each_child in children[current_node]
+                          if each_child not in subtrees_holding_landmarks]
+            if not candidates:
+                break
+            current_node = max(candidates, key=subtree_sizes.get)
+
+        if current_node in landmark_set:
+            return self._farthest_node()
+
+        return current_node
@@ -1,20 +1,56 @@
 
-from Queue import Queue, PriorityQueue
+from array import array
+from collections import deque, OrderedDict
+import csv
+import gc
+from heapq import heappush, heappop
+from itertools import count, izip
+import math
+import multiprocessing
+import weakref
 
+# NumPy is optional; distance_matrix() returns nested lists without it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-class Node:
+from connectivity import ConnectivityIndex
+from contraction_hierarchy import ContractionHierarchy
+from dynamic_tree import DynamicShortestPathTree
+from frozen_graph import FrozenGraph
+from landmarks import LandmarkHeuristic
+from spatial_index import SpatialGrid
 
-    def __init__(self, value):
+
+infinity = float('inf')
+
+
+# New-style classes hash much faster as the dict keys Nodes serve as.
+class Node(object):
+
+    def __init__(self, value, directed=False):
 
         self.value = value
         self.edges_for_this_node = []
 
+        # Maps each neighboring Node to the Edge connecting it to this one,
+        # so edges can be found without walking edges_for_this_node.
+        # In a directed graph these are the Edges leading out of this Node
+        # and edges_by_incoming_neighbor holds those leading into it;
+        # in an undirected graph the two are one and the same dict.
+        self.edges_by_neighbor = {}
+        if directed:
+            self.edges_by_incoming_neighbor = {}
+        else:
+            self.edges_by_incoming_neighbor = self.edges_by_neighbor
+
         # For the A* algorithm; optional in all other cases.
         self.x_coordinate = None
         self.y_coordinate = None
 
 
-class Edge:
+class Edge(object):
 
     def __init__(self, alpha_node, beta_node):
 
@@ -25,13 +61,254 @@ class Edge:
         self.weighting = None
 
 
+# The FrozenGraph each distance_matrix() worker process searches,
+# set once per worker when its pool starts up.
+_worker_frozen_graph = None
+_worker_target_ids = None
+
+
+def _initialize_distance_matrix_worker(frozen_graph, target_ids):
+
+    global _worker_frozen_graph, _worker_target_ids
+    _worker_frozen_graph = frozen_graph
+    _worker_target_ids = target_ids
+
+
+def _distance_matrix_row(source_id):
+
+    return _worker_frozen_graph._distances_to_targets(source_id,
+                                                      _worker_target_ids)
+
+
+def _number_from_string(text):
+    ''' Return text as an int if it is one, or else as a float. '''
+
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class ShortestPathTree:
+    ''' The shortest paths from one starting Node to every Node it can
+    reach, as returned by ShortestPathsGraph.shortest_path_tree().
+
+    Distances and predecessors are kept in arrays indexed by the order
+    in which Nodes were reached, so looking up a distance costs one dict
+    lookup and a path costs one step per Node along it; the search is
+    never run again. The tree is a snapshot, unaffected by later changes
+    to the graph. '''
+
+    def __init__(self, start, node_values, distances, predecessor_ids):
+
+        self.start = start
+        self.node_values = node_values
+        self.node_ids_by_value = dict((each_value, each_id) for each_id,
+                                      each_value in enumerate(node_values))
+
+        # distances[i] is how far node_values[i] is from the start, and
+        # predecessor_ids[i] is the id of the Node before it on its
+        # shortest path, or -1 for the start itself.
+        self.distances = distances
+        self.predecessor_ids = predecessor_ids
+
+    @classmethod
+    def _from_search(cls, start, settling_order, distances_from_the_start,
+                     dict_of_which_nodes_were_visited_before_which):
+        ''' Pack the results of a search into a ShortestPathTree,
+        giving each Node its position in settling_order as its id.
+        Every Node's predecessor must come before it in settling_order. '''
+
+        node_ids = {}
+        node_values = []
+        distances = array('d')
+        predecessor_ids = array('l')
+
+        for each_node in settling_order:
+            node_ids[each_node] = len(node_values)
+            node_values.append(each_node.value)
+            distances.append(distances_from_the_start[each_node])
+
+            predecessor_node \
+                = dict_of_which_nodes_were_visited_before_which[each_node]
+            if predecessor_node is None:
+                predecessor_ids.append(-1)
+            else:
+                predecessor_ids.append(node_ids[predecessor_node])
+
+        return cls(start, node_values, distances, predecessor_ids)
+
+    def reaches(self, n):
+        ''' Return True if there is a path from the start to the Node
+        with the value n, and False if not. '''
+
+        return n in self.node_ids_by_value
+
+    def distance_to(self, n):
+        ''' Return the length of the shortest path from the start to
+        the Node with the value n, or None if there is no such path. '''
+
+        node_id = self.node_ids_by_value.get(n)
+        if node_id is None:
+            return None
+
+        return self.distances[node_id]
+
+    def path_to(self, n):
+        ''' Return the values along the shortest path from the start to
+        the Node with the value n, or None if there is no such path. '''
+
+        node_id = self.node_ids_by_value.get(n)
+        if node_id is None:
+            return None
+
+        ordered_path_list = []
+        while node_id != -1:
+            ordered_path_list.append(self.node_values[node_id])
+            node_id = self.predecessor_ids[node_id]
+
+        ordered_path_list.reverse()
+
+        return ordered_path_list
+
+
+class ShortestPathCache:
+    ''' A least-recently-used cache of shortest path query results,
+    as kept by ShortestPathsGraph.enable_query_cache().
+
+    Every result is stored along with the graph version it was computed
+    against. The first lookup made against a newer version throws the
+    whole cache out, since any change to the graph may change any path.
+
+    The cache holds at most max_entries results and at most
+    max_path_nodes path values across all of them, whichever limit is
+    reached first; the least recently used results are evicted to stay
+    within both. '''
+
+    def __init__(self, max_entries=1024, max_path_nodes=1000000):
+
+        if max_entries < 1 or max_path_nodes < 1:
+            raise ValueError("cache limits must be positive")
+
+        self.max_entries = max_entries
+        self.max_path_nodes = max_path_nodes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        self.graph_version = None
+        self.stored_path_nodes = 0
+        self._results = OrderedDict()
+
+    def __len__(self):
+
+        return len(self._results)
+
+    def get(self, graph_version, key):
+        ''' Return (True, result) if a result for key computed against
+        graph_version is cached, and (False, None) if not. '''
+
+        self._catch_up_with(graph_version)
+
+        if key not in self._results:
+            self.misses += 1
+            return False, None
+
+        # Re-inserting moves it to the most recently used end.
+        result = self._results.pop(key)
+        self._results[key] = result
+        self.hits += 1
+
+        # Hand out copies so callers can't alter the cached paths.
+        if result is None:
+            return True, None
+        return True, (result[0], list(result[1]))
+
+    def put(self, graph_version, key, result):
+        ''' Cache result for key as computed against graph_version. '''
+
+        self._catch_up_with(graph_version)
+
+        if key in self._results:
+            self.stored_path_nodes -= self._size_of(self._results.pop(key))
+
+        result_size = self._size_of(result)
+        if result_size > self.max_path_nodes:
+            return
+
+        if result is not None:
+            result = (result[0], list(result[1]))
+
+        self._results[key] = result
+        self.stored_path_nodes += result_size
+
+        while (len(self._results) > self.max_entries
+               or self.stored_path_nodes > self.max_path_nodes):
+            evicted_result = self._results.popitem(last=False)[1]
+            self.stored_path_nodes -= self._size_of(evicted_result)
+            self.evictions += 1
+
+    def clear(self):
+        ''' Throw out every cached result. '''
+
+        self._results.clear()
+        self.stored_path_nodes = 0
+
+    def _catch_up_with(self, graph_version):
+
+        if graph_version != self.graph_version:
+            if self._results:
+                self.invalidations += 1
+            self.clear()
+            self.graph_version = graph_version
+
+    @staticmethod
+    def _size_of(result):
+
+        if result is None:
+            return 1
+        return len(result[1])
+
+
 class ShortestPathsGraph:
 
-    def __init__(self):
+    def __init__(self, directed=False):
 
         self.node_list = []
         self.edge_list = []
 
+        # In a directed graph, each Edge leads only from its alpha_node
+        # to its beta_node.
+        self.directed = directed
+
+        # Every Node is also indexed by its value, so looking a Node up
+        # by value doesn't require walking the whole node_list.
+        self.nodes_by_value = {}
+
+        # Counts changes made to the graph, so cached results
+        # can tell whether they are still current.
+        self.version = 0
+        self.query_cache = None
+
+        # Which Nodes can reach which, kept up to date as Nodes and Edges
+        # are added. Deleting either can split a component, which the
+        # index can't follow, so it goes stale until _connectivity_index()
+        # rebuilds it. A stale index can still rule out paths, since
+        # deletions never join anything that it has kept apart.
+        self.connectivity = ConnectivityIndex()
+        self.connectivity_is_stale = False
+
+        # Every DynamicShortestPathTree built on this graph, to be told
+        # about each Edge change; they drop out once no longer in use.
+        self.dynamic_trees = weakref.WeakSet()
+
+        # Nodes with coordinates, indexed by them. Built by
+        # _spatial_index() when first needed and kept current from then
+        # on by set_coordinates() and del_node().
+        self.spatial_index = None
+
     def nodes(self):
         ''' Return a list containing all Nodes in the ShortestPathsGraph. '''
 
@@ -58,33 +335,44 @@ class ShortestPathsGraph:
         ''' Add a new Node with the value n to the ShortestPathsGraph. '''
 
         # Nodes may not have duplicate values.
-        if self.has_node(n):
+        if n in self.nodes_by_value:
             return
 
-        new_node = Node(n)
+        new_node = Node(n, self.directed)
         self.node_list.append(new_node)
+        self.nodes_by_value[n] = new_node
+        self.version += 1
+
+        self.connectivity.add(new_node)
 
         if _returning is True:
             return new_node
 
     def add_edge(self, n1, n2, _returning=False):
-        ''' Add an edge connecting the nodes n1 and n2. '''
+        ''' Add an edge connecting the nodes n1 and n2
+        (leading from n1 to n2, if the graph is directed). '''
 
-        if self.has_node(n1) is False:
+        node_one = self.nodes_by_value.get(n1)
+        if node_one is None:
             node_one = self.add_node(n1, _returning=True)
-        else:
-            node_one = self._return_node_with_this_value(n1)
-        if self.has_node(n2) is False:
+        node_two = self.nodes_by_value.get(n2)
+        if node_two is None:
             node_two = self.add_node(n2, _returning=True)
-        else:
-            node_two = self._return_node_with_this_value(n2)
 
         new_edge = Edge(node_one, node_two)
 
         node_one.edges_for_this_node.append(new_edge)
         node_two.edges_for_this_node.append(new_edge)
 
+        # If these Nodes were already connected, the first Edge
+        # between them stays the one their neighbor maps point to.
+        node_one.edges_by_neighbor.setdefault(node_two, new_edge)
+        node_two.edges_by_incoming_neighbor.setdefault(node_one, new_edge)
+
         self.edge_list.append(new_edge)
+        self.version += 1
+
+        self.connectivity.union(node_one, node_two)
 
         if _returning is True:
             return new_edge
@@ -93,73 +381,91 @@ class ShortestPathsGraph:
         ''' Return True if n is contained in the graph
         and False if n is not contained in the graph. '''
 
-        for each_node in self.node_list:
-            if each_node.value == n:
-                return True
-        return False
+        return n in self.nodes_by_value
 
     def del_node(self, n):
-        ''' Deletes the edge connecting the node n from the graph,
-        raising an error if no such node exists; also removes all edges
-        connecting to the node n. '''
+        ''' Deletes the node n from the graph, raising an error if
+        no such node exists; also removes all edges connecting
+        to the node n. '''
 
-        if self.has_node(n) is False:
+        node_to_delete = self.nodes_by_value.get(n)
 
-            raise Exception("{} not in ShortestPathsGraph".formate(n))
+        if node_to_delete is None:
 
-        for each_edge in self.edge_list:
+            raise Exception("{} not in ShortestPathsGraph".format(n))
 
-            # This design decision means Nodes with identical values
-            # are considered to be identical nodes.
-            if n == each_edge.alpha_node or n == each_edge.beta_node:
+        # Take each of this Node's Edges out of the Node at its other end,
+        # then out of the graph's edge_list in a single pass.
+        edges_to_delete = set(node_to_delete.edges_for_this_node)
+        for each_edge in edges_to_delete:
+            the_other_node = self.other_node(node_to_delete, each_edge)
+            if the_other_node is not node_to_delete:
+                the_other_node.edges_for_this_node = [
+                    each_other_edge for each_other_edge
+                    in the_other_node.edges_for_this_node
+                    if each_other_edge is not each_edge]
+                the_other_node.edges_by_neighbor.pop(node_to_delete, None)
+                the_other_node.edges_by_incoming_neighbor.pop(node_to_delete,
+                                                              None)
 
-                self.edge_list.remove(each_edge)
+        if edges_to_delete:
+            self.edge_list = [each_edge for each_edge in self.edge_list
+                              if each_edge not in edges_to_delete]
 
-        for each_node in self.node_list:
+        self.node_list.remove(node_to_delete)
+        del self.nodes_by_value[n]
+        self.version += 1
+        self.connectivity_is_stale = True
 
-            if n == each_node.value:
+        if self.spatial_index is not None:
+            self.spatial_index.remove(node_to_delete)
 
-                # del did not work here.
-                # I think it was removing the reference
-                # and NOT removing the thing from the list.
-                # Fortunately, since objects with no external
-                # references are garbage-collected automatically
-                # by Python during execution, removing it from
-                # all the lists should be sufficient.
-                # But oerhaps not, since it might still bounce
-                # references around with its own Edges, which were
-                # also remove()d... hmm! A question for another day.
-                self.node_list.remove(each_node)
+        for each_tree in self.dynamic_trees:
+            each_tree._node_deleted(node_to_delete)
 
     def del_edge(self, n1, n2):
         ''' Delete the Edge connecting the Nodes with values
-        n1 and n2 from the ShortestPathsGraph. If no such Edge
+        n1 and n2 (leading from n1 to n2, if the graph is directed)
+        from the ShortestPathsGraph. If no such Edge
         exists, raise an exception. '''
 
-        found_the_correct_edge = False
-        for each_edge in self.edge_list:
-            alpha_node_value = each_edge.alpha_node.value
-            beta_node_value = each_edge.beta_node.value
-            if (n1 == alpha_node_value) or (n1 == beta_node_value):
-                # This used to be AND, but a second conditional is clearer:
-                if (n2 == alpha_node_value) or (n2 == beta_node_value):
-                    self.edge_list.remove(each_edge)
-                    # Take this Edge out of its Nodes:
-                    each_edge.alpha_node.edges_for_this_node.remove(each_edge)
-                    each_edge.beta_node.edges_for_this_node.remove(each_edge)
-                    # Tell Python it doesn't have to freak out:
-                    found_the_correct_edge = True
-        if found_the_correct_edge is False:
+        node_one = self._return_node_with_this_value(n1)
+        node_two = self._return_node_with_this_value(n2)
+
+        if (node_one is None or node_two is None
+           or node_two not in node_one.edges_by_neighbor):
             raise Exception("Edge ({}, {}) not in graph".format(n1, n2))
 
+        # Any duplicate Edges between these two Nodes go too:
+        edges_to_delete = set(
+            each_edge for each_edge in node_one.edges_for_this_node
+            if self._leads_to(node_one, each_edge) is node_two)
+
+        for each_node in (node_one, node_two):
+            each_node.edges_for_this_node = [
+                each_edge for each_edge in each_node.edges_for_this_node
+                if each_edge not in edges_to_delete]
+
+        del node_one.edges_by_neighbor[node_two]
+        node_two.edges_by_incoming_neighbor.pop(node_one, None)
+
+        self.edge_list = [each_edge for each_edge in self.edge_list
+                          if each_edge not in edges_to_delete]
+        self.version += 1
+        self.connectivity_is_stale = True
+
+        for each_tree in self.dynamic_trees:
+            each_tree._edge_changed(node_one, node_two)
+
     def neighbors(self, n):
-        ''' Return the list of all Nodes connected to Node n by Edges.
+        ''' Return the list of all Nodes connected to Node n by Edges
+        (only those Edges leading out of n, if the graph is directed).
         Raise an exception if n is not in the ShortestPathsGraph. '''
 
         if self.has_node(n) is False:
             raise Exception("{} not in ShortestPathsGraph.\n"
                             "ShortestPathsGraphlist:\n"
-                            "{}".format(n.value, self.nodes()))
+                            "{}".format(n, self.nodes()))
 
         list_of_values_of_neighbors = []
 
@@ -173,7 +479,8 @@ class ShortestPathsGraph:
         for each_edge in this_node.edges_for_this_node:
 
             if ((each_edge.alpha_node != this_node)
-               and (each_edge.beta_node == this_node)):
+               and (each_edge.beta_node == this_node)
+               and not self.directed):
 
                 list_of_values_of_neighbors.append(each_edge.alpha_node.value)
 
@@ -187,7 +494,8 @@ class ShortestPathsGraph:
 
     def adjacent(self, n1, n2):
         ''' Return True if Nodes with values n1 and n2
-        are connected by an Edge and False if they are not.
+        are connected by an Edge (leading from n1 to n2, if the graph
+        is directed) and False if they are not.
         Raises an error if either of the supplied
         Nodes are not in the ShortestPathsGraph. '''
 
@@ -197,21 +505,16 @@ class ShortestPathsGraph:
         if not self.has_node(n2):
             raise Exception("{} not in ShortestPathsGraph".format(n2))
 
-        for each_edge in self.edge_list:
-            # Spread out and euonymized to make it easier to read:
-            alpha_node_value = each_edge.alpha_node.value
-            beta_node_value = each_edge.beta_node.value
-            if (n1 == alpha_node_value) or (n1 == beta_node_value):
-                if (n2 == alpha_node_value) or n2 == (beta_node_value):
-                    return True
-        return False
+        node_one = self._return_node_with_this_value(n1)
+        node_two = self._return_node_with_this_value(n2)
+
+        return node_two in node_one.edges_by_neighbor
 
     def _return_node_with_this_value(self, n):
-        ''' Return the Node object with the given value n. '''
+        ''' Return the Node object with the given value n,
+        or None if there is no such Node. '''
 
-        for each_node in self.node_list:
-            if each_node.value == n:
-                return each_node
+        return self.nodes_by_value.get(n)
 
     def _return_edge_between_these_nodes(self, n1, n2):
         ''' Return the Edge object between Nodes in the Graph
@@ -219,17 +522,31 @@ class ShortestPathsGraph:
         Nodes or Edges cannot be found in the Graph. '''
 
         primary_node = self._return_node_with_this_value(n1)
-        for each_edge in primary_node.edges_for_this_node:
-            alpha_node_value = each_edge.alpha_node.value
-            beta_node_value = each_edge.beta_node.value
-            if alpha_node_value == n2 or beta_node_value == n2:
-                return each_edge
-        raise Exception("Internal structure error: failed Edge Node indexing")
+        secondary_node = self._return_node_with_this_value(n2)
+
+        try:
+            return primary_node.edges_by_neighbor[secondary_node]
+        except (AttributeError, KeyError):
+            raise Exception("Internal structure error:"
+                            " failed Edge Node indexing")
 
     def depth_first_traversal(self, start):
         ''' Perform a full depth-first traversal of the graph beginning
         at start. Return the full visited path when traversal is complete. '''
 
+        return list(self.iter_dfs(start))
+
+    def breadth_first_traversal(self, start):
+        ''' Perform a full breadth-first traversal of the graph, beginning
+        at start. Return the full visited path when traversal is complete. '''
+
+        return list(self.iter_bfs(start))
+
+    def iter_dfs(self, start):
+        ''' Yield the values of the Nodes reachable from start one at a
+        time, in depth-first order, as the traversal reaches them.
+        Raise an exception if start is not in the ShortestPathsGraph. '''
+
         # A depth-first traversal algorithm is the same thing as
         # a breadth-first traversal algorithm, except it uses a stack
         # instead of a queue.
@@ -238,107 +555,177 @@ class ShortestPathsGraph:
         # http://eddmann.com/posts/
         #    depth-first-search-and-breadth-first-search-in-python/
 
-        starting_node = self._return_node_with_this_value(start)
+        starting_node = self._return_starting_node(start)
 
         # Seed the stack with where ever we're starting.
         stack_to_visit = [starting_node]
 
-        # The visited Nodes list will serve as a record of our path.
-        previously_visited_nodes = []
-        nodes_already_added_to_stack = []
+        # Nodes go in this set as they go on the stack, so no Node
+        # is ever stacked (or visited) twice.
+        nodes_already_added_to_stack = set([starting_node])
 
-        # Base the while loop on the size of the stack:
-        while len(stack_to_visit) > 0:
+        while stack_to_visit:
 
             current_node = stack_to_visit.pop()
-            previously_visited_nodes.append(current_node)
-
-            for each_value in self.neighbors(current_node.value):
-                # This is inefficient but economizes on writing new functions.
-                # If desired, can be fixed by implementing an internal call
-                # for _neighbor_nodes() (that accepts a Node, perhaps).
-                each_neighbor = self._return_node_with_this_value(each_value)
-
-                # This wrecks the big O value, but I don't feel like i have
-                # enough time to improve it right now.
-                # Probably something involving dictionaries.
-                if each_neighbor not in previously_visited_nodes:
-                    if each_neighbor not in nodes_already_added_to_stack:
-                        stack_to_visit.append(each_neighbor)
-                        nodes_already_added_to_stack.append(each_neighbor)
+            yield current_node.value
 
-        previously_visited_node_values \
-            = [each_node.value for each_node in previously_visited_nodes]
+            # Only Edges leading out of the Node are followed.
+            for each_neighbor in current_node.edges_by_neighbor:
+                if each_neighbor not in nodes_already_added_to_stack:
+                    stack_to_visit.append(each_neighbor)
+                    nodes_already_added_to_stack.add(each_neighbor)
 
-        return previously_visited_node_values
-
-    def breadth_first_traversal(self, start):
-        ''' Perform a full breadth-first traversal of the graph, beginning
-        at start. Return the full visited path when traversal is complete. '''
+    def iter_bfs(self, start):
+        ''' Yield the values of the Nodes reachable from start one at a
+        time, in breadth-first order, as the traversal reaches them.
+        Raise an exception if start is not in the ShortestPathsGraph. '''
 
         # A breadth-first traversal algorithm is the same thing as
         # a depth-first traversal algorithm, except it uses a queue
         # instead of a stack.
 
-        # Well-informed (possibly to the point of nearly copying) by:
-        # http://eddmann.com/posts/
-        #    depth-first-search-and-breadth-first-search-in-python/
+        starting_node = self._return_starting_node(start)
+
+        # A deque, unlike Queue.Queue, takes no locks on the way in or out.
+        queue_to_visit = deque([starting_node])
+        nodes_already_added_to_queue = set([starting_node])
+
+        while queue_to_visit:
+
+            current_node = queue_to_visit.popleft()
+            yield current_node.value
+
+            for each_neighbor in current_node.edges_by_neighbor:
+                if each_neighbor not in nodes_already_added_to_queue:
+                    queue_to_visit.append(each_neighbor)
+                    nodes_already_added_to_queue.add(each_neighbor)
 
-        # Seed the queue with where ever we're starting.
-        queue_to_visit = Queue()
-        queue_to_visit.put(self._return_node_with_this_value(start))
-        # The visited nodes list will serve as a record of our path.
-        previously_visited_nodes = []
-        nodes_already_added_to_queue = []
-
-        # Base the while loop on the size of the queue:
-        while queue_to_visit.qsize() > 0:
-
-            current_node = queue_to_visit.get()
-            previously_visited_nodes.append(current_node)
-
-            for each_value in self.neighbors(current_node.value):
-                # This is inefficient but economizes on writing new functions.
-                # If desired, can be fixed by implementing an internal call
-                # for _neighbor_nodes() (that accepts a Node, perhaps).
-                each_neighbor = self._return_node_with_this_value(each_value)
-
-                # This wrecks the big O value, but I don't feel like i have
-                # enough time to improve it right now.
-                # Probably something involving dictionaries.
-                if each_neighbor not in previously_visited_nodes:
-                    if each_neighbor not in nodes_already_added_to_queue:
-                        queue_to_visit.put(each_neighbor)
-                        # Queue.Queue does not have a simply way to surveil its
-                        # own contents, so we build a list to keep track of
-                        # what we've added to it to prevent certain situations
-                        # involving multiple neighbors:
-                        nodes_already_added_to_queue.append(each_neighbor)
-
-        previously_visited_node_values \
-            = [each_node.value for each_node in previously_visited_nodes]
-
-        return previously_visited_node_values
+    def _return_starting_node(self, start):
+
+        starting_node = self.nodes_by_value.get(start)
+        if starting_node is None:
+            raise Exception("{} not in ShortestPathsGraph".format(start))
+        return starting_node
 
     def add_weighted_edge(self, n1, n2, weighting):
-        ''' Add an edge connecting the nodes n1 and n2. '''
+        ''' Add an edge connecting the nodes n1 and n2
+        (leading from n1 to n2, if the graph is directed). '''
 
         if not (isinstance(weighting, int) or isinstance(weighting, float)):
             raise TypeError("weighting must be int or float")
 
-        if self.has_edge(n1, n2):
-            existing_edge = self._return_edge_between_these_nodes(n1, n2)
+        node_one = self._return_node_with_this_value(n1)
+        node_two = self._return_node_with_this_value(n2)
+
+        if node_one is not None and node_two in node_one.edges_by_neighbor:
+            existing_edge = node_one.edges_by_neighbor[node_two]
             existing_edge.weighting = weighting
+            self.version += 1
 
         else:
-            # Note: add_edge() will create node(s) if they don't exist.
+            # Note: add_edge() will create node(s) if they don't exist,
+            # and files the new Edge with both of its Nodes.
             new_edge = self.add_edge(n1, n2, _returning=True)
-            node_one = self._return_node_with_this_value(n1)
-            node_two = self._return_node_with_this_value(n2)
             new_edge.weighting = weighting
-            node_one.edges_for_this_node.append(new_edge)
-            node_two.edges_for_this_node.append(new_edge)
-            self.edge_list.append(new_edge)
+            node_one = new_edge.alpha_node
+            node_two = new_edge.beta_node
+
+        for each_tree in self.dynamic_trees:
+            each_tree._edge_changed(node_one, node_two)
+
+    def add_weighted_edges_from(self, weighted_edges):
+        ''' Add every (n1, n2, weighting) in weighted_edges as
+        add_weighted_edge() would, creating Nodes as needed and updating
+        the weighting of Edges that already exist, in a single pass. '''
+
+        nodes_by_value = self.nodes_by_value
+        node_list = self.node_list
+        edge_list = self.edge_list
+        connectivity = self.connectivity
+
+        # Once for the whole batch, and up front, so the cache can't
+        # keep results from before a batch that fails partway through.
+        self.version += 1
+
+        # Spare the cyclic collector rescanning every new Node and Edge:
+        collector_was_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            for n1, n2, weighting in weighted_edges:
+
+                if not (isinstance(weighting, int)
+                        or isinstance(weighting, float)):
+                    raise TypeError("weighting must be int or float")
+
+                node_one = nodes_by_value.get(n1)
+                if node_one is None:
+                    node_one = nodes_by_value[n1] = Node(n1, self.directed)
+                    node_list.append(node_one)
+                    connectivity.add(node_one)
+
+                node_two = nodes_by_value.get(n2)
+                if node_two is None:
+                    node_two = nodes_by_value[n2] = Node(n2, self.directed)
+                    node_list.append(node_two)
+                    connectivity.add(node_two)
+
+                existing_edge = node_one.edges_by_neighbor.get(node_two)
+                if existing_edge is not None:
+                    existing_edge.weighting = weighting
+                    continue
+
+                new_edge = Edge(node_one, node_two)
+                new_edge.weighting = weighting
+
+                node_one.edges_for_this_node.append(new_edge)
+                node_two.edges_for_this_node.append(new_edge)
+                node_one.edges_by_neighbor[node_two] = new_edge
+                node_two.edges_by_incoming_neighbor[node_one] = new_edge
+                edge_list.append(new_edge)
+
+                connectivity.union(node_one, node_two)
+        finally:
+            if collector_was_enabled:
+                gc.enable()
+
+            # Repairing the trees Edge by Edge would cost more than
+            # searching again once the whole batch is in.
+            for each_tree in self.dynamic_trees:
+                each_tree._rebuild()
+
+    def add_weighted_edges_from_csv(self, path, node_type=str,
+                                    delimiter=',', has_header=False):
+        ''' Add the weighted Edges listed in the CSV file at path, one
+        "n1,n2,weighting" row per Edge, with add_weighted_edges_from().
+        Node values are converted with node_type, and weightings become
+        ints or, failing that, floats. Set has_header to skip the
+        first row. '''
+
+        with open(path, 'rb') as csv_file:
+            rows = csv.reader(csv_file, delimiter=delimiter)
+            if has_header:
+                next(rows, None)
+            self.add_weighted_edges_from(
+                (node_type(n1), node_type(n2), _number_from_string(weighting))
+                for n1, n2, weighting in rows)
+
+    def add_weighted_edges_from_arrays(self, alpha_values, beta_values,
+                                       weightings):
+        ''' Add an Edge between alpha_values[i] and beta_values[i]
+        weighted weightings[i] for each i, with add_weighted_edges_from().
+        NumPy arrays are converted to lists of plain Python numbers
+        first, all at once. '''
+
+        columns = [each_column.tolist() if hasattr(each_column, 'tolist')
+                   else each_column for each_column
+                   in (alpha_values, beta_values, weightings)]
+
+        if not len(columns[0]) == len(columns[1]) == len(columns[2]):
+            raise ValueError("alpha_values, beta_values and weightings"
+                             " must be the same length")
+
+        self.add_weighted_edges_from(izip(*columns))
 
     def return_weighting(self, n1, n2):
         ''' Return the weighting between the Nodes with
@@ -351,15 +738,16 @@ class ShortestPathsGraph:
 
     def has_edge(self, n1, n2):
         ''' Return True if there is an Edge in the Graph between
-        two nodes with values n1, n2; otherwise, return False. '''
+        two nodes with values n1, n2 (leading from n1 to n2, if the graph
+        is directed); otherwise, return False. '''
 
-        for each_edge in self.edge_list:
-            alpha_node_value = each_edge.alpha_node.value
-            beta_node_value = each_edge.beta_node.value
-            if ((alpha_node_value == n1 or beta_node_value == n1)
-               and (alpha_node_value == n2 or beta_node_value == n2)):
-                return True
-        return False
+        node_one = self._return_node_with_this_value(n1)
+        node_two = self._return_node_with_this_value(n2)
+
+        if node_one is None or node_two is None:
+            return False
+
+        return node_two in node_one.edges_by_neighbor
 
     def dijkstra_algorithm(self, start, end):
         '''
@@ -372,187 +760,1059 @@ class ShortestPathsGraph:
         if start == end:
             return [start]
 
-        try:
-            starting_node = self._return_node_with_this_value(start)
-            ending_node = self._return_node_with_this_value(end)
-        except:
-            raise ValueError("Cannot path between {} and {}:"
-                             " no such Node(s)".format(start, end))
+        starting_node, ending_node = self._return_path_endpoints(start, end)
 
-        distances_from_the_start = {}
+        return self._find_path(('dijkstra_algorithm', start, end),
+                               starting_node, ending_node)
 
-        priority_queue_to_visit = PriorityQueue()
+    def a_star_algorithm(self, start, end, heuristic=None):
 
-        # I made the mistake of making these identical on one of my tries...
-        dict_of_which_nodes_were_visited_before_which = {}
-        already_pathed_nodes_list = []
+        # The A* algorithm is very similar to Dijkstra's algorithm.
+        # This is because the A* algorithm is an improvement upon
+        # Dijkstra's algorithm, adding a step that consults a heuristic
+        # to determine which nodes to check next. This heuristic can,
+        # if properly chosen, increase the efficiency with which the
+        # shortest path may be found.
 
-        dict_of_which_nodes_were_visited_before_which[starting_node] = None
+        # Developed with reference to:
+        # http://en.wikipedia.org/wiki/A*_search_algorithm
+        # Some insight from:
+        # http://code.activestate.com
+        #      /recipes/577519-a-star-shortest-path-algorithm/
 
-        # Put the starting node in the graph as the node with the lowest
-        # distance away from the starting node.
-        priority_queue_to_visit.put((0, starting_node))
+        if heuristic is None:
+            heuristic = self.default_heuristic
 
-        distances_from_the_start[starting_node] = 0
+        # The trivial case.
+        if start == end:
+            return [start]
 
-        # When nothing has been added to the priority queue in a given pass
-        # and everything added before has been removed, there is nothing
-        # left to check.
-        while priority_queue_to_visit.qsize() > 0:
+        starting_node, ending_node = self._return_path_endpoints(start, end)
 
-            # Take the node out of the priority queue with
-            # the lowest distance away from the starting node.
-            current_node = priority_queue_to_visit.get()[1]
+        # Important!
+        # The A* algorithm does NOT use the heuristic's guesses
+        # when returning the path.
+        # The actual distance from the start determines what route
+        # to take; the heuristic modifier only changes how fast
+        # it finds it.
+        return self._find_path(('a_star_algorithm', start, end, heuristic),
+                               starting_node, ending_node, heuristic)
+
+    def _find_path(self, cache_key, starting_node, ending_node,
+                   heuristic=None):
+        ''' Return the (cost, path) of the shortest path between two
+        Nodes, or None if there is none, searching with the given
+        heuristic (or none, for Dijkstra's algorithm). Results are
+        looked up in and added to the query cache under cache_key
+        if the cache is enabled. '''
+
+        if self.query_cache is not None:
+            found_it, cached_result = self.query_cache.get(self.version,
+                                                           cache_key)
+            if found_it:
+                return cached_result
+
+        # No search can find a path between separate components.
+        if not self.connectivity.connected(starting_node, ending_node):
+            return None
 
-            # Make sure you only do this for nodes that have been
-            # the current_node!
-            already_pathed_nodes_list.append(current_node)
+        distances_from_the_start = {}
+        dict_of_which_nodes_were_visited_before_which = {}
+        result = None
+
+        # Nodes come out of the search in order of their distance from
+        # the start (or their guessed distance, for A*), so the search is
+        # over as soon as the end comes out; nothing further away than
+        # the end ever gets looked at.
+        for each_settled_node in self._settle_nodes(
+                starting_node, distances_from_the_start,
+                dict_of_which_nodes_were_visited_before_which,
+                ending_node=ending_node, heuristic=heuristic):
+
+            if each_settled_node is ending_node:
+                result = (distances_from_the_start[ending_node],
+                          self._build_path(
+                              dict_of_which_nodes_were_visited_before_which,
+                              ending_node))
+                break
+
+        if self.query_cache is not None:
+            self.query_cache.put(self.version, cache_key, result)
+
+        return result
+
+    def k_shortest_paths(self, start, end, k):
+        ''' Return up to k of the shortest loopless paths between the
+        Nodes with values start and end, as a list of (total cost,
+        [values along the path]) in order of cost, by Yen's algorithm.
+        Raises ValueError if either Node is not in the graph.
+
+        Each path after the first is found by branching off one of the
+        paths found so far: for each Node along it (the "spur" Node), the
+        path up to that Node is kept, and the rest is the shortest path
+        from there that avoids the kept part and every branch already
+        taken from the same place. Those detours are searched for on the
+        graph itself with some Nodes and Edges masked out, using A*
+        guided by every Node's true distance to the end, found once up
+        front. Masking can only lengthen paths, so that guide never
+        overestimates, and each detour search can stop as soon as it
+        settles a Node whose own shortest path to the end steers clear
+        of everything masked. '''
+
+        starting_node, ending_node = self._return_path_endpoints(start, end)
+
+        if k < 1:
+            return []
+        if starting_node is ending_node:
+            return [(0, [start])]
+        if not self.connectivity.connected(starting_node, ending_node):
+            return []
+
+        # One backward search gives every Node's distance to the end
+        # and the next Node along its shortest path there.
+        distances_to_the_end = {}
+        next_nodes_toward_the_end = {}
+        for each_node in self._settle_nodes(ending_node, distances_to_the_end,
+                                            next_nodes_toward_the_end,
+                                            reverse=True):
+            pass
+
+        if starting_node not in distances_to_the_end:
+            return []
+
+        first_nodes = self._path_toward_the_end(starting_node,
+                                                next_nodes_toward_the_end)
+        found_paths = [(distances_to_the_end[starting_node], first_nodes,
+                        self._costs_along(first_nodes), 0)]
+        candidate_paths = []
+        candidate_node_tuples = set()
+        tie_breaker = count()
+
+        while len(found_paths) < k:
+
+            last_cost, last_nodes, last_costs_so_far, last_spur_index \
+                = found_paths[-1]
+
+            # How many Nodes each path found so far has in common with
+            # the start of the last one, to tell which of them branch
+            # off it at each spur Node.
+            shared_lengths = []
+            for each_cost, each_nodes, each_costs_so_far, each_spur_index \
+                    in found_paths:
+                shared_length = 0
+                for each_node, each_last_node in izip(each_nodes,
+                                                      last_nodes):
+                    if each_node is not each_last_node:
+                        break
+                    shared_length += 1
+                shared_lengths.append((shared_length, each_nodes))
+
+            # The earliest position along the last path of any Node on
+            # a given Node's shortest path to the end. That path steers
+            # clear of a spur Node and all before it if this comes after.
+            positions_on_the_last_path = dict(
+                (each_node, each_index)
+                for each_index, each_node in enumerate(last_nodes))
+            earliest_positions = {}
+
+            def earliest_position(this_node):
+
+                unknown_nodes = []
+                while (this_node is not None
+                        and this_node not in earliest_positions):
+                    unknown_nodes.append(this_node)
+                    this_node = next_nodes_toward_the_end[this_node]
+
+                if this_node is None:
+                    earliest = infinity
+                else:
+                    earliest = earliest_positions[this_node]
+
+                for each_node in reversed(unknown_nodes):
+                    earliest = min(earliest, positions_on_the_last_path.get(
+                        each_node, infinity))
+                    earliest_positions[each_node] = earliest
+
+                return earliest
+
+            # Branching off the last path before the point where it
+            # branched off its own parent would only find what branching
+            # off the parent already has (Lawler's improvement).
+            for spur_index in range(last_spur_index, len(last_nodes) - 1):
 
-            for each_edge in current_node.edges_for_this_node:
+                spur_node = last_nodes[spur_index]
 
-                # Pseudonymize
-                the_other_node = self.other_node(current_node, each_edge)
+                excluded_arcs = {spur_node: set(
+                    each_nodes[spur_index + 1]
+                    for shared_length, each_nodes in shared_lengths
+                    if shared_length > spur_index)}
 
-                if the_other_node in already_pathed_nodes_list:
-                    # I'm so glad I learned about continue.
+                spur_path = self._spur_path(
+                    spur_node, distances_to_the_end,
+                    next_nodes_toward_the_end,
+                    last_nodes[:spur_index], excluded_arcs,
+                    lambda this_node: earliest_position(this_node)
+                    > spur_index)
+
+                if spur_path is None:
                     continue
 
-                distance_for_traveling_to_this_other_node_from_current_node = distances_from_the_start[current_node] + each_edge.weighting
+                candidate_nodes = last_nodes[:spur_index] + spur_path[1]
+                candidate_node_tuple = tuple(candidate_nodes)
+                if candidate_node_tuple in candidate_node_tuples:
+                    continue
 
-                if the_other_node in distances_from_the_start:
+                candidate_node_tuples.add(candidate_node_tuple)
+                heappush(candidate_paths,
+                         (last_costs_so_far[spur_index] + spur_path[0],
+                          next(tie_breaker), candidate_nodes, spur_index))
 
-                    if distances_from_the_start[the_other_node] > distance_for_traveling_to_this_other_node_from_current_node:
-                        distances_from_the_start[the_other_node] = distance_for_traveling_to_this_other_node_from_current_node
-                        dict_of_which_nodes_were_visited_before_which[the_other_node] = current_node
-                        priority_queue_to_visit.put((distances_from_the_start[the_other_node], the_other_node))
-                else:
-                    distances_from_the_start[the_other_node] = distance_for_traveling_to_this_other_node_from_current_node
-                    dict_of_which_nodes_were_visited_before_which[the_other_node] = current_node
-                    priority_queue_to_visit.put((distances_from_the_start[the_other_node], the_other_node))
+            if not candidate_paths:
+                break
 
-        if ending_node not in distances_from_the_start:
-            return None
+            candidate_cost, _, candidate_nodes, candidate_spur_index \
+                = heappop(candidate_paths)
+            found_paths.append((candidate_cost, candidate_nodes,
+                                self._costs_along(candidate_nodes),
+                                candidate_spur_index))
 
-        # This next while loop creeps back through the dict of which nodes
-        # were visited before each other and builds the shortest path.
-        the_node_to_look_at_now = ending_node
-        ordered_path_list = []
+        return [(each_path[0], [each_node.value for each_node in each_path[1]])
+                for each_path in found_paths]
+
+    def _spur_path(self, spur_node, distances_to_the_end,
+                   next_nodes_toward_the_end, excluded_nodes, excluded_arcs,
+                   steers_clear):
+        ''' Return (cost, [Nodes along the path]) for the shortest path
+        from spur_node to the end that avoids the given Nodes and arcs
+        (see _settle_nodes()), or None if there is none.
+
+        The search finishes at the first Node it settles for which
+        steers_clear() is True, meaning its shortest path to the end
+        avoids everything excluded and can be followed the rest of
+        the way. '''
+
+        def heuristic(this_node, ending_node):
+            return distances_to_the_end.get(this_node, infinity)
+
+        distances_from_the_start = {}
+        dict_of_which_nodes_were_visited_before_which = {}
+
+        for each_settled_node in self._settle_nodes(
+                spur_node, distances_from_the_start,
+                dict_of_which_nodes_were_visited_before_which,
+                heuristic=heuristic, excluded_nodes=excluded_nodes,
+                excluded_arcs=excluded_arcs):
+
+            if each_settled_node not in distances_to_the_end:
+                # The only Nodes left can't reach the end at all.
+                return None
+
+            if steers_clear(each_settled_node):
+                break
+        else:
+            return None
 
+        path_nodes = []
+        the_node_to_look_at_now = each_settled_node
         while the_node_to_look_at_now is not None:
+            path_nodes.append(the_node_to_look_at_now)
+            the_node_to_look_at_now \
+                = dict_of_which_nodes_were_visited_before_which[
+                    the_node_to_look_at_now]
+        path_nodes.reverse()
 
-            ordered_path_list.insert(0, the_node_to_look_at_now.value)
+        path_nodes.extend(self._path_toward_the_end(
+            each_settled_node, next_nodes_toward_the_end)[1:])
 
-            the_node_to_look_at_now = dict_of_which_nodes_were_visited_before_which[the_node_to_look_at_now]
+        return (distances_from_the_start[each_settled_node]
+                + distances_to_the_end[each_settled_node], path_nodes)
 
-        return distances_from_the_start[ending_node], ordered_path_list
+    def _path_toward_the_end(self, this_node, next_nodes_toward_the_end):
+        ''' Return the Nodes along the shortest path from this_node to
+        the end of a backward search that filled in
+        next_nodes_toward_the_end. '''
 
-    def a_star_algorithm(self, start, end, heuristic=None):
+        path_nodes = []
+        while this_node is not None:
+            path_nodes.append(this_node)
+            this_node = next_nodes_toward_the_end[this_node]
 
-        # The A* algorithm is very similar to Dijkstra's algorithm.
-        # This is because the A* algorithm is an improvement upon
-        # Dijkstra's algorithm, adding a step that consults a heuristic
-        # to determine which nodes to check next. This heuristic can,
-        # if properly chosen, increase the efficiency with which the
-        # shortest path may be found.
+        return path_nodes
 
-        # Developed with reference to:
-        # http://en.wikipedia.org/wiki/A*_search_algorithm
-        # Some insight from:
-        # http://code.activestate.com
-        #      /recipes/577519-a-star-shortest-path-algorithm/
+    def _costs_along(self, path_nodes):
+        ''' Return the cost of following path_nodes up to each of them. '''
 
-        if heuristic is None:
-            heuristic = self.default_heuristic
+        costs_so_far = [0]
+        for each_index in range(1, len(path_nodes)):
+            costs_so_far.append(
+                costs_so_far[-1] + path_nodes[each_index - 1]
+                .edges_by_neighbor[path_nodes[each_index]].weighting)
+
+        return costs_so_far
+
+    def bidirectional_dijkstra(self, start, end):
+        '''
+        Calculate the shortest path between the Nodes with the values
+        start and end by growing one Dijkstra's algorithm search outward
+        from each of them until the two searches meet.
+        Returns the same (cost, path) result as dijkstra_algorithm.
+        '''
 
         # The trivial case.
         if start == end:
             return [start]
 
-        try:
-            starting_node = self._return_node_with_this_value(start)
-            ending_node = self._return_node_with_this_value(end)
-        except:
-            raise ValueError("Cannot path between {} and {}:"
-                             " no such Node(s)".format(start, end))
+        starting_node, ending_node = self._return_path_endpoints(start, end)
+
+        if not self.connectivity.connected(starting_node, ending_node):
+            return None
+
+        best_distance, meeting_node, forward_predecessors, \
+            backward_predecessors, settled_count \
+            = self._bidirectional_search(starting_node, ending_node)
+
+        if meeting_node is None:
+            return None
+
+        # The forward half of the path runs from the start to the meeting
+        # Node; the backward half is read off from there to the end.
+        ordered_path_list = self._build_path(forward_predecessors,
+                                             meeting_node)
+
+        the_node_to_look_at_now = backward_predecessors[meeting_node]
+        while the_node_to_look_at_now is not None:
+            ordered_path_list.append(the_node_to_look_at_now.value)
+            the_node_to_look_at_now \
+                = backward_predecessors[the_node_to_look_at_now]
+
+        return best_distance, ordered_path_list
+
+    def _bidirectional_search(self, starting_node, ending_node):
+        ''' Run Dijkstra's algorithm forward from starting_node and
+        backward from ending_node at the same time, always advancing
+        whichever search has the closer Node waiting in its heap.
+
+        Return (distance, meeting Node, forward predecessors,
+        backward predecessors, number of Nodes settled), where the
+        meeting Node is None if there is no path. '''
+
+        # Index 0 holds the forward search's state, index 1 the backward's.
+        # The backward search follows Edges into each Node rather than
+        # out of it, which only makes a difference in directed graphs.
+        neighbor_map_names = ('edges_by_neighbor',
+                              'edges_by_incoming_neighbor')
+        distances = ({starting_node: 0}, {ending_node: 0})
+        predecessors = ({starting_node: None}, {ending_node: None})
+        settled_nodes = (set(), set())
+        heaps = ([(0, 0, starting_node)], [(0, 1, ending_node)])
+        tie_breaker = count(2)
+
+        # The cost of the best complete path seen so far, and the Node
+        # where its two halves join.
+        best_distance = infinity
+        meeting_node = None
+
+        while heaps[0] and heaps[1]:
+
+            # The standard meeting criterion: once the closest unsettled
+            # Nodes on the two sides are together at least as far apart
+            # as the best path found, no better path can remain.
+            if heaps[0][0][0] + heaps[1][0][0] >= best_distance:
+                break
+
+            if heaps[0][0][0] <= heaps[1][0][0]:
+                this_side = 0
+            else:
+                this_side = 1
+
+            this_sides_distances = distances[this_side]
+            other_sides_distances = distances[1 - this_side]
+
+            current_node = heappop(heaps[this_side])[2]
+
+            if current_node in settled_nodes[this_side]:
+                continue
+
+            settled_nodes[this_side].add(current_node)
+
+            distance_to_current_node = this_sides_distances[current_node]
+
+            for the_other_node, each_edge in getattr(
+                    current_node, neighbor_map_names[this_side]).items():
+
+                if the_other_node in settled_nodes[this_side]:
+                    continue
+
+                distance_through_current_node = (distance_to_current_node
+                                                 + each_edge.weighting)
+
+                if (distance_through_current_node
+                        < this_sides_distances.get(the_other_node, infinity)):
+
+                    this_sides_distances[the_other_node] \
+                        = distance_through_current_node
+                    predecessors[this_side][the_other_node] = current_node
+                    heappush(heaps[this_side],
+                             (distance_through_current_node,
+                              next(tie_breaker), the_other_node))
+
+                    # Has the other search already reached this Node?
+                    if the_other_node in other_sides_distances:
+                        full_distance = (
+                            distance_through_current_node
+                            + other_sides_distances[the_other_node])
+                        if full_distance < best_distance:
+                            best_distance = full_distance
+                            meeting_node = the_other_node
+
+        return (best_distance, meeting_node, predecessors[0], predecessors[1],
+                len(settled_nodes[0]) + len(settled_nodes[1]))
+
+    def set_coordinates(self, n, x, y):
+        ''' Give the Node with the value n the coordinates (x, y), which
+        the coordinate heuristics and the spatial queries use. Setting
+        x_coordinate and y_coordinate directly works for the heuristics,
+        but leaves nearest_node(), k_nearest() and nodes_in_box() unaware
+        of the change once they have been used. '''
+
+        this_node = self._return_node_with_this_value(n)
+        if this_node is None:
+            raise ValueError("{} not in ShortestPathsGraph".format(n))
+
+        this_node.x_coordinate = x
+        this_node.y_coordinate = y
+
+        if self.spatial_index is not None:
+            self.spatial_index.move(this_node, x, y)
+
+    def nearest_node(self, x, y):
+        ''' Return the value of the Node with coordinates nearest (x, y),
+        or None if no Node has coordinates. '''
+
+        nearest_nodes = self._spatial_index().nearest(x, y)
+        if not nearest_nodes:
+            return None
+
+        return nearest_nodes[0].value
+
+    def k_nearest(self, x, y, k):
+        ''' Return the values of up to k Nodes with coordinates nearest
+        (x, y), nearest first. '''
+
+        return [each_node.value
+                for each_node in self._spatial_index().nearest(x, y, k)]
+
+    def nodes_in_box(self, min_x, min_y, max_x, max_y):
+        ''' Return the values of every Node with coordinates inside the
+        box from (min_x, min_y) to (max_x, max_y), edges included. '''
+
+        return [each_node.value for each_node
+                in self._spatial_index().in_box(min_x, min_y, max_x, max_y)]
+
+    def _spatial_index(self):
+        ''' Return the SpatialGrid of Nodes with coordinates, building
+        it from scratch if there isn't one yet. '''
+
+        if self.spatial_index is None:
+            self.spatial_index = SpatialGrid(
+                (each_node, (each_node.x_coordinate, each_node.y_coordinate))
+                for each_node in self.node_list
+                if each_node.x_coordinate is not None
+                and each_node.y_coordinate is not None)
+
+        return self.spatial_index
+
+    def connected(self, n1, n2):
+        ''' Return True if some chain of Edges joins the Nodes with the
+        values n1 and n2 and False if not. Raise ValueError if either
+        of them is not in the ShortestPathsGraph.
+
+        The direction of Edges is ignored, so in a directed graph this
+        says whether a path could exist, not that one does. '''
+
+        node_one, node_two = self._return_path_endpoints(n1, n2)
+
+        return self._connectivity_index().connected(node_one, node_two)
+
+    def components(self):
+        ''' Return a list of the graph's connected components, each a
+        list of the values of the Nodes in it. Components and the values
+        in them are listed in the order their Nodes were added. '''
+
+        connectivity = self._connectivity_index()
+
+        component_values_by_root = OrderedDict()
+        for each_node in self.node_list:
+            component_values_by_root.setdefault(
+                connectivity.find(each_node), []).append(each_node.value)
+
+        return list(component_values_by_root.values())
+
+    def _connectivity_index(self):
+        ''' Return the graph's ConnectivityIndex, first rebuilding it
+        if a deletion has left it stale. '''
+
+        if self.connectivity_is_stale:
+            connectivity = ConnectivityIndex()
+            for each_node in self.node_list:
+                connectivity.add(each_node)
+            for each_edge in self.edge_list:
+                connectivity.union(each_edge.alpha_node, each_edge.beta_node)
+            self.connectivity = connectivity
+            self.connectivity_is_stale = False
+
+        return self.connectivity
+
+    def enable_query_cache(self, max_entries=1024, max_path_nodes=1000000):
+        ''' Start caching the results of dijkstra_algorithm and
+        a_star_algorithm in a ShortestPathCache of the given size,
+        and return the cache so its hits, misses, evictions and
+        invalidations can be inspected.
+
+        Every method that changes the graph bumps its version, which
+        makes the cache throw out results computed beforehand. Changes
+        made by reaching into Nodes and Edges directly (setting an
+        Edge's weighting, say) are not noticed. '''
+
+        self.query_cache = ShortestPathCache(max_entries, max_path_nodes)
+
+        return self.query_cache
+
+    def disable_query_cache(self):
+        ''' Stop caching query results and throw out the cache. '''
+
+        self.query_cache = None
+
+    def distance_matrix(self, sources, targets, workers=1):
+        ''' Return the matrix of shortest path lengths from each value in
+        sources (rows) to each value in targets (columns), with infinity
+        wherever there is no path. It is a NumPy array if NumPy is
+        installed, or a list of row lists otherwise.
+
+        One Dijkstra's algorithm search is run per source, each stopping
+        once every target is settled. With workers greater than 1 they
+        are spread over a pool of that many processes, each of which is
+        handed a frozen copy of the graph once as it starts up. '''
+
+        sources = list(sources)
+        targets = list(targets)
+
+        for each_value in sources + targets:
+            if each_value not in self.nodes_by_value:
+                raise ValueError("{} not in ShortestPathsGraph"
+                                 .format(each_value))
+
+        frozen_graph = self.freeze()
+
+        source_ids = [frozen_graph.node_ids_by_value[each_value]
+                      for each_value in sources]
+        target_ids = [frozen_graph.node_ids_by_value[each_value]
+                      for each_value in targets]
+
+        if workers > 1 and len(source_ids) > 1:
+            pool = multiprocessing.Pool(
+                workers, initializer=_initialize_distance_matrix_worker,
+                initargs=(frozen_graph, target_ids))
+            try:
+                rows = pool.map(_distance_matrix_row, source_ids,
+                                chunksize=max(1, len(source_ids)
+                                              // (workers * 4)))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            rows = [frozen_graph._distances_to_targets(each_source_id,
+                                                       target_ids)
+                    for each_source_id in source_ids]
+
+        if numpy is not None:
+            return numpy.array(rows, dtype=float).reshape(len(sources),
+                                                          len(targets))
+        return rows
+
+    def freeze(self):
+        ''' Return an immutable FrozenGraph snapshot of the graph, which
+        stores it as flat arrays instead of Node and Edge objects. Its
+        traversals and path algorithms work just like the graph's own,
+        but faster and in far less memory; later changes to the graph
+        are not reflected in it. '''
+
+        return FrozenGraph.from_graph(self)
+
+    def save_binary(self, path):
+        ''' Write a frozen snapshot of the graph to the file at path in a
+        binary layout that load_binary() can map straight into memory. '''
+
+        self.freeze().save_binary(path)
+
+    @staticmethod
+    def load_binary(path, mmap=True):
+        ''' Return the graph saved to the file at path by save_binary(),
+        as a FrozenGraph. With mmap, its arrays are read straight out of
+        a memory mapping of the file, so loading is nearly instant and
+        every process loading the same file shares one copy of it. '''
+
+        return FrozenGraph.load_binary(path, mmap)
+
+    def shortest_path_tree(self, start):
+        ''' Run Dijkstra's algorithm from the Node with the value start
+        to every Node reachable from it, and return the results as a
+        ShortestPathTree, whose distance_to() and path_to() methods
+        answer any number of queries without searching again. '''
+
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise ValueError("Cannot path from {}:"
+                             " no such Node".format(start))
 
         distances_from_the_start = {}
-        guesses_for_distances_from_the_start = {}
+        dict_of_which_nodes_were_visited_before_which = {}
+
+        settling_order = list(self._settle_nodes(
+            starting_node, distances_from_the_start,
+            dict_of_which_nodes_were_visited_before_which))
+
+        return ShortestPathTree._from_search(
+            start, settling_order, distances_from_the_start,
+            dict_of_which_nodes_were_visited_before_which)
+
+    def nearest_targets(self, start, targets, k):
+        ''' Return the shortest paths from the Node with the value start
+        to the k nearest Nodes among those with values in targets, as a
+        list of (total cost, [values along the path]) in order of cost.
+        Fewer are returned if fewer than k targets can be reached.
+        Raises ValueError if start or any target is not in the graph.
 
-        priority_queue_to_visit = PriorityQueue()
+        One Dijkstra's algorithm search serves every target: it stops
+        as soon as k of them are settled, or once every target in the
+        start's component has been. '''
 
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise ValueError("Cannot path from {}:"
+                             " no such Node".format(start))
+
+        target_nodes = set()
+        for each_value in targets:
+            each_node = self._return_node_with_this_value(each_value)
+            if each_node is None:
+                raise ValueError("Cannot path to {}:"
+                                 " no such Node".format(each_value))
+            target_nodes.add(each_node)
+
+        # Targets in other components can never be settled, so there's
+        # no sense searching the whole component for them. A stale index
+        # may count a few too many, which only costs the early stop.
+        connectivity = self.connectivity
+        starting_root = connectivity.find(starting_node)
+        reachable_target_count = sum(
+            1 for each_node in target_nodes
+            if connectivity.find(each_node) is starting_root)
+
+        distances_from_the_start = {}
         dict_of_which_nodes_were_visited_before_which = {}
-        already_pathed_nodes_list = []
+        nearest_paths = []
 
-        dict_of_which_nodes_were_visited_before_which[starting_node] = None
+        if min(k, reachable_target_count) < 1:
+            return nearest_paths
+
+        for each_settled_node in self._settle_nodes(
+                starting_node, distances_from_the_start,
+                dict_of_which_nodes_were_visited_before_which):
+
+            if each_settled_node not in target_nodes:
+                continue
+
+            nearest_paths.append(
+                (distances_from_the_start[each_settled_node],
+                 self._build_path(
+                     dict_of_which_nodes_were_visited_before_which,
+                     each_settled_node)))
+
+            if len(nearest_paths) == min(k, reachable_target_count):
+                break
+
+        return nearest_paths
+
+    def within_cost(self, start, budget):
+        ''' Return an iterator over (value, cost) for every Node whose
+        shortest path from the Node with the value start costs no more
+        than budget, nearest first. Raises ValueError if start is not
+        in the graph.
+
+        Nodes are found by Dijkstra's algorithm as the iterator is
+        consumed, and the search goes no further than the budget, so
+        the work done depends on how much of the graph is within reach
+        rather than on the size of the whole graph. '''
 
-        # Put the starting node in the graph as the node with the lowest
-        # distance away from the starting node.
-        priority_queue_to_visit.put((0, starting_node))
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise ValueError("Cannot path from {}:"
+                             " no such Node".format(start))
+
+        return self._iter_within_cost(starting_node, budget)
+
+    def _iter_within_cost(self, starting_node, budget):
+
+        distances_from_the_start = {}
+
+        for each_settled_node in self._settle_nodes(starting_node,
+                                                    distances_from_the_start,
+                                                    {}):
+
+            # Nodes are settled in order of distance, so once one is
+            # out of reach, all the rest are too.
+            distance = distances_from_the_start[each_settled_node]
+            if distance > budget:
+                return
+
+            yield each_settled_node.value, distance
+
+    def dynamic_shortest_path_tree(self, start):
+        ''' Return a DynamicShortestPathTree of the shortest paths from
+        the Node with the value start, which answers the same queries as
+        a ShortestPathTree but stays current as the graph changes: each
+        change to an Edge repairs only the part of the tree it affects,
+        rather than searching from the start all over again. '''
+
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise ValueError("Cannot path from {}:"
+                             " no such Node".format(start))
+
+        new_tree = DynamicShortestPathTree(self, starting_node)
+        self.dynamic_trees.add(new_tree)
+
+        return new_tree
+
+    def topological_order(self):
+        ''' Return the values of every Node in a directed graph, ordered
+        so that every Edge leads from an earlier Node to a later one.
+        Raises ValueError if the graph is undirected or has a cycle. '''
+
+        return [each_node.value for each_node in self._topological_nodes()]
+
+    def dag_shortest_paths(self, start):
+        ''' Return a ShortestPathTree of the shortest paths from the Node
+        with the value start in a directed acyclic graph.
+
+        Rather than searching with a heap, this relaxes each Node's
+        outgoing Edges once in topological order, which takes time
+        linear in the size of the graph and works with negative
+        weightings too. Raises ValueError if the graph is undirected
+        or has a cycle. '''
+
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise ValueError("Cannot path from {}:"
+                             " no such Node".format(start))
+
+        reached_nodes, distances_from_the_start, \
+            dict_of_which_nodes_were_visited_before_which \
+            = self._relax_in_topological_order([starting_node])
+
+        return ShortestPathTree._from_search(
+            start, reached_nodes, distances_from_the_start,
+            dict_of_which_nodes_were_visited_before_which)
+
+    def critical_path(self, start=None):
+        ''' Return the longest path in a directed acyclic graph, as
+        (total cost, [values along the path]) like dijkstra_algorithm.
+        In a scheduling graph whose Edges are weighted with task
+        durations, this is the chain of tasks that decides how long the
+        whole schedule takes.
+
+        The path may begin at any Node, or only at the Node with the
+        value start if it is given. Returns None if the graph is empty.
+        Raises ValueError if the graph is undirected or has a cycle. '''
+
+        if start is None:
+            starting_nodes = self.node_list
+        else:
+            starting_node = self._return_node_with_this_value(start)
+            if starting_node is None:
+                raise ValueError("Cannot path from {}:"
+                                 " no such Node".format(start))
+            starting_nodes = [starting_node]
+
+        reached_nodes, distances_from_the_start, \
+            dict_of_which_nodes_were_visited_before_which \
+            = self._relax_in_topological_order(starting_nodes, longest=True)
+
+        if not reached_nodes:
+            return None
+
+        ending_node = max(reached_nodes, key=distances_from_the_start.get)
+
+        return (distances_from_the_start[ending_node],
+                self._build_path(dict_of_which_nodes_were_visited_before_which,
+                                 ending_node))
+
+    def _topological_nodes(self):
+        ''' Return every Node in topological order by Kahn's algorithm:
+        repeatedly take a Node with no incoming Edges left, and remove
+        its outgoing Edges by counting down its neighbors' in-degrees. '''
+
+        if not self.directed:
+            raise ValueError("Only a directed graph has a topological order")
+
+        incoming_edge_counts = {}
+        nodes_to_visit = deque()
+        for each_node in self.node_list:
+            incoming_edge_count = len(each_node.edges_by_incoming_neighbor)
+            if incoming_edge_count:
+                incoming_edge_counts[each_node] = incoming_edge_count
+            else:
+                nodes_to_visit.append(each_node)
+
+        ordered_nodes = []
+        while nodes_to_visit:
+            current_node = nodes_to_visit.popleft()
+            ordered_nodes.append(current_node)
+
+            for the_other_node in current_node.edges_by_neighbor:
+                incoming_edge_counts[the_other_node] -= 1
+                if not incoming_edge_counts[the_other_node]:
+                    del incoming_edge_counts[the_other_node]
+                    nodes_to_visit.append(the_other_node)
+
+        # Nodes on or behind a cycle never run out of incoming Edges:
+        if incoming_edge_counts:
+            raise ValueError("Graph has a cycle through {}, so it has no"
+                             " topological order".format(
+                                 self._cycle_from(incoming_edge_counts)))
+
+        return ordered_nodes
+
+    def _cycle_from(self, blocked_nodes):
+        ''' Return the values around a cycle among blocked_nodes, every
+        one of which has an incoming Edge from another of them. '''
+
+        # Walking backward along incoming Edges within blocked_nodes
+        # can never stop, so it must come back around to a Node it
+        # has already passed.
+        positions = {}
+        walk = []
+        current_node = next(iter(blocked_nodes))
+        while current_node not in positions:
+            positions[current_node] = len(walk)
+            walk.append(current_node)
+            current_node = next(
+                each_node for each_node
+                in current_node.edges_by_incoming_neighbor
+                if each_node in blocked_nodes)
+
+        cycle = walk[positions[current_node]:]
+        cycle.reverse()
+
+        return [each_node.value for each_node in cycle + cycle[:1]]
+
+    def _relax_in_topological_order(self, starting_nodes, longest=False):
+        ''' Find the shortest (or, with longest, the longest) paths from
+        starting_nodes by relaxing every reached Node's outgoing Edges
+        in topological order. Returns the reached Nodes in that order,
+        with dicts of their distances and predecessors. '''
+
+        distances_from_the_start = {}
+        dict_of_which_nodes_were_visited_before_which = {}
+        for each_node in starting_nodes:
+            distances_from_the_start[each_node] = 0
+            dict_of_which_nodes_were_visited_before_which[each_node] = None
+
+        reached_nodes = []
+        for current_node in self._topological_nodes():
+
+            distance_to_current_node \
+                = distances_from_the_start.get(current_node)
+            if distance_to_current_node is None:
+                continue
+
+            reached_nodes.append(current_node)
+
+            for the_other_node, each_edge \
+                    in current_node.edges_by_neighbor.items():
+
+                distance_through_current_node = (distance_to_current_node
+                                                 + each_edge.weighting)
+                known_distance = distances_from_the_start.get(the_other_node)
+
+                if (known_distance is None
+                        or (longest
+                            and distance_through_current_node
+                            > known_distance)
+                        or (not longest
+                            and distance_through_current_node
+                            < known_distance)):
+
+                    distances_from_the_start[the_other_node] \
+                        = distance_through_current_node
+                    dict_of_which_nodes_were_visited_before_which[
+                        the_other_node] = current_node
+
+        return (reached_nodes, distances_from_the_start,
+                dict_of_which_nodes_were_visited_before_which)
+
+    def build_contraction_hierarchy(self):
+        ''' Preprocess the graph into a ContractionHierarchy, which
+        answers shortest path queries with its shortest_path() method
+        far faster than dijkstra_algorithm can. It can be saved to disk
+        with its save() method and reloaded with ContractionHierarchy.load()
+        so the preprocessing only needs doing once. Changes made to the
+        graph afterward are not reflected in the hierarchy. '''
+
+        return ContractionHierarchy.from_graph(self)
+
+    def build_landmark_heuristic(self, landmark_count=8, strategy='farthest',
+                                 seed=None):
+        ''' Choose up to landmark_count landmark Nodes by the given strategy
+        ('farthest' or 'avoid'), precompute every Node's distance from
+        each of them, and return a LandmarkHeuristic that can be passed
+        to a_star_algorithm as its heuristic. This lets A* outperform
+        Dijkstra's algorithm on graphs with no coordinates. '''
+
+        return LandmarkHeuristic(self, landmark_count, strategy, seed)
+
+    def _weighted_arcs(self):
+        ''' Yield (tail Node, head Node, weighting) for each direction
+        in which every weighted Edge in the graph can be traveled. '''
+
+        for each_edge in self.edge_list:
+            if each_edge.weighting is None:
+                continue
+            yield each_edge.alpha_node, each_edge.beta_node, \
+                each_edge.weighting
+            if not self.directed:
+                yield each_edge.beta_node, each_edge.alpha_node, \
+                    each_edge.weighting
+
+    def _return_path_endpoints(self, start, end):
+        ''' Return the Nodes with the values start and end, or raise
+        ValueError if either of them is not in the graph. '''
+
+        starting_node = self._return_node_with_this_value(start)
+        ending_node = self._return_node_with_this_value(end)
+
+        if starting_node is None or ending_node is None:
+            raise ValueError("Cannot path between {} and {}:"
+                             " no such Node(s)".format(start, end))
+
+        return starting_node, ending_node
+
+    def _settle_nodes(self, starting_node, distances_from_the_start,
+                      dict_of_which_nodes_were_visited_before_which,
+                      ending_node=None, heuristic=None, reverse=False,
+                      excluded_nodes=(), excluded_arcs=None):
+        ''' Search outward from starting_node, yielding each Node once
+        its shortest distance from the start is known ("settled").
+        Without a heuristic this is Dijkstra's algorithm and Nodes come
+        out in order of distance; with one it is A* towards ending_node.
+        With reverse, Edges are followed backward, finding distances
+        to starting_node instead of from it in a directed graph.
+
+        The search acts as though the Nodes in excluded_nodes were not
+        in the graph, and as though there were no way from any Node in
+        excluded_arcs to the Nodes in the set it maps to, so searches
+        can be run on part of the graph without copying it.
+
+        The two dicts passed in are filled in as the search goes, so
+        the caller can read distances and rebuild paths from them
+        at any point, including after stopping the search early. '''
+
+        # heapq is used directly rather than through Queue.PriorityQueue,
+        # which takes a thread lock on every put() and get().
+        # Nodes are never moved within the heap; a Node that is found
+        # to be closer than first thought is simply pushed again, and
+        # whichever of its entries comes out after the first one
+        # is skipped as stale.
+        # The counter breaks ties between equal priorities without
+        # ever comparing two Nodes to each other.
+        tie_breaker = count()
+        # Excluded Nodes start out as though already settled,
+        # so they're skipped like any other settled Node.
+        settled_nodes = set(excluded_nodes)
+
+        if reverse:
+            neighbor_map_name = 'edges_by_incoming_neighbor'
+        else:
+            neighbor_map_name = 'edges_by_neighbor'
 
         distances_from_the_start[starting_node] = 0
-        guesses_for_distances_from_the_start[starting_node] = distances_from_the_start[starting_node] + heuristic(starting_node, ending_node)
+        dict_of_which_nodes_were_visited_before_which[starting_node] = None
+
+        if heuristic is None:
+            starting_priority = 0
+        else:
+            starting_priority = heuristic(starting_node, ending_node)
+
+        heap_to_visit = [(starting_priority, next(tie_breaker), starting_node)]
+
+        while heap_to_visit:
 
-        # When nothing has been added to the priority queue in a given pass
-        # and everything added before has been removed, there is nothing
-        # left to check.
-        while priority_queue_to_visit.qsize() > 0:
+            current_node = heappop(heap_to_visit)[2]
 
-            # Take the node out of the priority queue with
-            # the lowest distance away from the starting node.
-            # For the A* algorithm, note that the priority queue
-            # has already been sorted according to guessed distances.
-            current_node = priority_queue_to_visit.get()[1]
-            already_pathed_nodes_list.append(current_node)
+            if current_node in settled_nodes:
+                continue
 
-            for each_edge in current_node.edges_for_this_node:
+            settled_nodes.add(current_node)
+            yield current_node
 
-                # Pseudonymize
-                the_other_node = self.other_node(current_node, each_edge)
+            distance_to_current_node = distances_from_the_start[current_node]
 
-                if the_other_node in already_pathed_nodes_list:
+            neighbor_items = getattr(current_node, neighbor_map_name).items()
+            if excluded_arcs and current_node in excluded_arcs:
+                excluded_heads = excluded_arcs[current_node]
+                neighbor_items = [each_item for each_item in neighbor_items
+                                  if each_item[0] not in excluded_heads]
+
+            for the_other_node, each_edge in neighbor_items:
+
+                if the_other_node in settled_nodes:
                     continue
 
-                distance_for_traveling_to_this_other_node_from_current_node = distances_from_the_start[current_node] + each_edge.weighting
+                distance_through_current_node = (distance_to_current_node
+                                                 + each_edge.weighting)
+
+                if (distance_through_current_node
+                        < distances_from_the_start.get(the_other_node,
+                                                       infinity)):
 
-                if the_other_node in distances_from_the_start:
+                    distances_from_the_start[the_other_node] \
+                        = distance_through_current_node
+                    dict_of_which_nodes_were_visited_before_which[
+                        the_other_node] = current_node
 
-                    if distances_from_the_start[the_other_node] > distance_for_traveling_to_this_other_node_from_current_node:
-                        distances_from_the_start[the_other_node] = distance_for_traveling_to_this_other_node_from_current_node
-                        dict_of_which_nodes_were_visited_before_which[the_other_node] = current_node
+                    if heuristic is None:
+                        priority = distance_through_current_node
+                    else:
                         # A* algorithm's differentiation step:
-                        guesses_for_distances_from_the_start[the_other_node] = distances_from_the_start[the_other_node] + heuristic(the_other_node, ending_node)
-                        # Note that the heuristically-informed guess is what
-                        # the priority queue is sorted by.
-                        priority_queue_to_visit.put((guesses_for_distances_from_the_start[the_other_node], the_other_node))
-                else:
-                    distances_from_the_start[the_other_node] = distance_for_traveling_to_this_other_node_from_current_node
-                    dict_of_which_nodes_were_visited_before_which[the_other_node] = current_node
-                    # A* algorithm's differentiation step:
-                    guesses_for_distances_from_the_start[the_other_node] = distances_from_the_start[the_other_node] + heuristic(the_other_node, ending_node)
-                    # Note that the heuristically-informed guess is what
-                    # the priority queue is sorted by.
-                    priority_queue_to_visit.put((guesses_for_distances_from_the_start[the_other_node], the_other_node))
-
-        if ending_node not in distances_from_the_start:
-            return None
+                        # the heap is sorted by the heuristically-informed
+                        # guess rather than the distance alone.
+                        priority = (distance_through_current_node
+                                    + heuristic(the_other_node, ending_node))
+
+                    heappush(heap_to_visit,
+                             (priority, next(tie_breaker), the_other_node))
+
+    def _build_path(self, dict_of_which_nodes_were_visited_before_which,
+                    ending_node):
+        ''' Creep back through the dict of which Nodes were visited
+        before each other from ending_node, returning the values
+        along the way in order from the start to the end. '''
 
-        # This next while loop creeps back through the dict of which nodes
-        # were visited before each other and builds the shortest path.
-        the_node_to_look_at_now = ending_node
         ordered_path_list = []
+        the_node_to_look_at_now = ending_node
 
         while the_node_to_look_at_now is not None:
 
-            ordered_path_list.insert(0, the_node_to_look_at_now.value)
+            ordered_path_list.append(the_node_to_look_at_now.value)
 
-            the_node_to_look_at_now = dict_of_which_nodes_were_visited_before_which[the_node_to_look_at_now]
+            the_node_to_look_at_now \
+                = dict_of_which_nodes_were_visited_before_which[
+                    the_node_to_look_at_now]
 
-        # Important!
-        # The A* algorithm does NOT use guesses_for_distances_from_the_start
-        # when returning the path.
-        # The actual distance from the start determines what route to take;
-        # the heuristic modifier only changes how fast it finds it.
-        return distances_from_the_start[ending_node], ordered_path_list
+        ordered_path_list.reverse()
+
+        return ordered_path_list
 
     def other_node(self, this_node, the_edge):
         if the_edge.alpha_node == this_node:
@@ -560,6 +1820,14 @@ class ShortestPathsGraph:
         else:
             return the_edge.alpha_node
 
+    def _leads_to(self, this_node, the_edge):
+        ''' Return the Node the_edge leads to from this_node, or None
+        if it's a directed Edge leading into this_node instead. '''
+
+        if self.directed and the_edge.alpha_node is not this_node:
+            return None
+        return self.other_node(this_node, the_edge)
+
     def default_heuristic(self, *args, **kwargs):
         # In the A* algorithm, the heuristic is supposed to be a guess about
         # the ideal direction to head in that informs the choice of which
@@ -599,7 +1867,6 @@ class ShortestPathsGraph:
         x_difference = ending_node.x_coordinate - starting_node.x_coordinate
         y_difference = ending_node.y_coordinate - starting_node.y_coordinate
 
-        import math
         return math.sqrt((x_difference ** 2) + (y_difference ** 2))
 
     def manhattan_heuristic(self, starting_node, ending_node):
@@ -0,0 +1,279 @@
+from heapq import heappush, heappushpop
+import math
+
+
+class SpatialGrid:
+    ''' An index of Nodes by their coordinates, for finding the Nodes
+    nearest a point or inside a box without looking at every Node.
+
+    The plane is cut into square cells sized so that each holds about
+    one Node, and each cell lists the Nodes inside it. A query looks
+    only at the cells around its point, spiraling outward ring by ring
+    until no unvisited cell could hold anything closer, which takes
+    near-constant time when Nodes are spread fairly evenly.
+
+    ShortestPathsGraph builds one from its Nodes' coordinates the first
+    time it is needed and keeps it current through set_coordinates()
+    and del_node(). When the number of Nodes has grown well past what
+    the cells were sized for, the grid is rebuilt with smaller cells. '''
+
+    def __init__(self, positions):
+
+        self._rebuild(dict(positions))
+
+    def _rebuild(self, positions):
+        ''' Index the Nodes in positions, a dict of Node to (x, y),
+        in cells sized to suit them. '''
+
+        # The (x, y) of every Node in the index:
+        self.positions = positions
+        self.cells = {}
+
+        self.indexed_count = len(self.positions)
+        self.cell_size = self._cell_size_for(self.positions.values())
+
+        # The range of cells that have ever held a Node, which queries
+        # never need to look beyond.
+        self.lowest_column = self.lowest_row = 0
+        self.highest_column = self.highest_row = -1
+
+        for each_node, (x, y) in self.positions.items():
+            self._file(each_node, x, y)
+
+    @staticmethod
+    def _cell_size_for(points):
+        ''' Return a cell size that would put about one of points in
+        each cell of a grid covering them all. '''
+
+        points = list(points)
+        if len(points) < 2:
+            return 1.0
+
+        x_values = [x for x, y in points]
+        y_values = [y for x, y in points]
+        extent = max(max(x_values) - min(x_values),
+                     max(y_values) - min(y_values))
+        if extent <= 0:
+            return 1.0
+
+        return extent / math.sqrt(len(points))
+
+    def __len__(self):
+
+        return len(self.positions)
+
+    def move(self, this_node, x, y):
+        ''' Put this_node at (x, y), adding it if it isn't indexed yet. '''
+
+        if this_node in self.positions:
+            self._unfile(this_node)
+        elif len(self.positions) >= 4 * max(self.indexed_count, 16):
+            # Four times as many Nodes as the cells were sized for:
+            self._rebuild(self.positions)
+
+        self.positions[this_node] = (x, y)
+        self._file(this_node, x, y)
+
+        # A point far outside the rest leaves the cells far too small
+        # for the area they now have to cover, with queries walking
+        # through rings upon rings of empty cells, so they're resized.
+        if self._occupied_span() > 4 * math.sqrt(len(self.positions)) + 4:
+            self._rebuild(self.positions)
+
+    def remove(self, this_node):
+        ''' Take this_node out of the index, if it is in it. '''
+
+        if this_node in self.positions:
+            self._unfile(this_node)
+            del self.positions[this_node]
+
+    def _occupied_span(self):
+        ''' Return how many cells across the range of cells that have
+        held a Node is, along its longer side. '''
+
+        return max(self.highest_column - self.lowest_column,
+                   self.highest_row - self.lowest_row) + 1
+
+    def nearest(self, x, y, k=1):
+        ''' Return up to k of the Nodes nearest (x, y), nearest first. '''
+
+        if k < 1 or not self.positions:
+            return []
+
+        # The k nearest so far, as a heap with the farthest on top:
+        nearest_found = []
+
+        for each_radius, each_cell in self._cells_spiraling_out(x, y):
+
+            # (x, y) could be anywhere in its own cell, so every cell
+            # from this ring on is at least one cell fewer than
+            # each_radius away from it; nothing there can beat the
+            # k found so far once they are all that close.
+            if (len(nearest_found) == k and each_cell is None
+                    and -nearest_found[0][0]
+                    <= (each_radius - 1) * self.cell_size):
+                break
+
+            if each_cell is None:
+                continue
+
+            for each_node in each_cell:
+                node_x, node_y = self.positions[each_node]
+                entry = (-math.hypot(node_x - x, node_y - y), id(each_node),
+                         each_node)
+                if len(nearest_found) < k:
+                    heappush(nearest_found, entry)
+                elif entry > nearest_found[0]:
+                    heappushpop(nearest_found, entry)
+
+        nearest_found.sort(reverse=True)
+
+        return [each_node for distance, node_id, each_node in nearest_found]
+
+    def in_box(self, min_x, min_y, max_x, max_y):
+        ''' Return every Node with min_x <= x <= max_x
+        and min_y <= y <= max_y. '''
+
+        lowest_column, lowest_row = self._cell_of(min_x, min_y)
+        highest_column, highest_row = self._cell_of(max_x, max_y)
+
+        lowest_column = max(lowest_column, self.lowest_column)
+        highest_column = min(highest_column, self.highest_column)
+        lowest_row = max(lowest_row, self.lowest_row)
+        highest_row = min(highest_row, self.highest_row)
+
+        box_cell_count = (max(highest_column - lowest_column + 1, 0)
+                          * max(highest_row - lowest_row + 1, 0))
+
+        # Looking up every cell in the box is only worth it when there
+        # are fewer of them than occupied cells to check against it.
+        if box_cell_count <= len(self.cells):
+            cells_in_box = [
+                self.cells.get((each_column, each_row), ())
+                for each_column in range(lowest_column, highest_column + 1)
+                for each_row in range(lowest_row, highest_row + 1)]
+        else:
+            cells_in_box = [
+                each_cell for (each_column, each_row), each_cell
+                in self.cells.items()
+                if lowest_column <= each_column <= highest_column
+                and lowest_row <= each_row <= highest_row]
+
+        found_nodes = []
+        for each_cell in cells_in_box:
+            for each_node in each_cell:
+                node_x, node_y = self.positions[each_node]
+                if min_x <= node_x <= max_x and min_y <= node_y <= max_y:
+                    found_nodes.append(each_node)
+
+        return found_nodes
+
+    def _cells_spiraling_out(self, x, y):
+        ''' Yield (radius, cell contents) for every occupied cell in
+        rings of growing radius around the cell holding (x, y), with
+        (radius, None) as each ring begins; rings known to be empty
+        may be left out. '''
+
+        center_column, center_row = self._cell_of(x, y)
+
+        # Rings that can't reach any occupied cell are skipped outright,
+        # and the spiral ends past the farthest one.
+        first_radius = max(self.lowest_column - center_column,
+                           center_column - self.highest_column,
+                           self.lowest_row - center_row,
+                           center_row - self.highest_row, 0)
+        last_radius = max(center_column - self.lowest_column,
+                          self.highest_column - center_column,
+                          center_row - self.lowest_row,
+                          self.highest_row - center_row)
+
+        cells = self.cells
+
+        walked_cell_count = 0
+        each_radius = first_radius
+
+        while each_radius <= last_radius:
+
+            # Once walking the next ring would take the count of cells
+            # walked past the count of occupied cells, the rest of the
+            # occupied cells are sorted into their rings directly
+            # instead, so rings of empty cells cost nothing.
+            if walked_cell_count + 8 * each_radius > len(cells):
+                for each_pair in self._occupied_cells_by_radius(
+                        center_column, center_row, each_radius):
+                    yield each_pair
+                return
+
+            yield each_radius, None
+
+            if each_radius == 0:
+                ring = [(center_column, center_row)]
+            else:
+                left = center_column - each_radius
+                right = center_column + each_radius
+                bottom = center_row - each_radius
+                top = center_row + each_radius
+                ring = ([(each_column, bottom)
+                         for each_column in range(left, right + 1)]
+                        + [(each_column, top)
+                           for each_column in range(left, right + 1)]
+                        + [(left, each_row)
+                           for each_row in range(bottom + 1, top)]
+                        + [(right, each_row)
+                           for each_row in range(bottom + 1, top)])
+
+            walked_cell_count += len(ring)
+
+            for each_key in ring:
+                each_cell = cells.get(each_key)
+                if each_cell:
+                    yield each_radius, each_cell
+
+            each_radius += 1
+
+    def _occupied_cells_by_radius(self, center_column, center_row,
+                                  first_radius):
+        ''' Yield what _cells_spiraling_out() would from first_radius
+        on, marking only the rings that hold occupied cells. '''
+
+        cells_by_radius = sorted(
+            ((max(abs(each_column - center_column),
+                  abs(each_row - center_row)), each_cell)
+             for (each_column, each_row), each_cell in self.cells.items()),
+            key=lambda each_pair: each_pair[0])
+
+        last_radius_yielded = None
+        for each_radius, each_cell in cells_by_radius:
+            if each_radius < first_radius:
+                continue
+            if each_radius != last_radius_yielded:
+                yield each_radius, None
+                last_radius_yielded = each_radius
+            yield each_radius, each_cell
+
+    def _cell_of(self, x, y):
+
+        return (int(math.floor(x / self.cell_size)),
+                int(math.floor(y / self.cell_size)))
+
+    def _file(self, this_node, x, y):
+
+        column, row = self._cell_of(x, y)
+        self.cells.setdefault((column, row), []).append(this_node)
+
+        if self.highest_column < self.lowest_column:
+            self.lowest_column = self.highest_column = column
+            self.lowest_row = self.highest_row = row
+        else:
+            self.lowest_column = min(self.lowest_column, column)
+            self.highest_column = max(self.highest_column, column)
+            self.lowest_row = min(self.lowest_row, row)
+            self.highest_row = max(self.highest_row, row)
+
+    def _unfile(self, this_node):
+
+        key = self._cell_of(*self.positions[this_node])
+        cell = self.cells[key]
+        cell.remove(this_node)
+        if not cell:
+            del self.cells[key]
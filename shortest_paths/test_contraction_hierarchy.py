@@ -0,0 +1,108 @@
+import unittest
+import random
+import os
+import tempfile
+
+import shortest_paths
+from contraction_hierarchy import ContractionHierarchy
+
+
+class test_ContractionHierarchy(unittest.TestCase):
+
+    def setUp(self):
+
+        self.graph_one = shortest_paths.ShortestPathsGraph()
+
+        self.graph_one.add_weighted_edge("alpha", "beta", 1)
+        self.graph_one.add_weighted_edge("beta", "gamma", 199999999999)
+        self.graph_one.add_weighted_edge("gamma", "delta", 1)
+        self.graph_one.add_weighted_edge("hoopa", "gamma", 84)
+        self.graph_one.add_weighted_edge("hoopa", "doopa", 646552)
+        self.graph_one.add_weighted_edge("doopa", "loopa", 534)
+        self.graph_one.add_weighted_edge("alpha", "loopa", 1)
+        self.graph_one.add_node("omicron")
+
+    def assert_is_a_real_path(self, graph, result):
+
+        cost, path = result
+        path_cost = 0
+        for each_index in range(1, len(path)):
+            path_cost += graph.return_weighting(path[each_index - 1],
+                                                path[each_index])
+        assert path_cost == cost
+
+    def test_shortest_path(self):
+
+        self.setUp()
+
+        hierarchy = self.graph_one.build_contraction_hierarchy()
+
+        assert hierarchy.shortest_path("alpha", "delta") \
+            == (647172, ['alpha', 'loopa', 'doopa', 'hoopa',
+                         'gamma', 'delta'])
+        assert hierarchy.shortest_path("delta", "alpha") \
+            == (647172, ['delta', 'gamma', 'hoopa', 'doopa',
+                         'loopa', 'alpha'])
+        assert hierarchy.shortest_path("alpha", "omicron") is None
+        assert hierarchy.shortest_path("alpha", "alpha") == ["alpha"]
+
+        with self.assertRaises(ValueError):
+            hierarchy.shortest_path("alpha", "nowhere")
+
+    def test_against_dijkstra_on_random_graphs(self):
+
+        for each_pass in range(0, 20):
+
+            # Every other pass builds a directed graph:
+            random_graph = shortest_paths.ShortestPathsGraph(
+                directed=bool(each_pass % 2))
+            random_node_count = random.randint(2, 60)
+
+            for each_integer in range(0, random_node_count):
+                random_graph.add_node(each_integer)
+            for each_edge_count in range(0, random_node_count * 2):
+                random_graph.add_weighted_edge(
+                    random.randrange(random_node_count),
+                    random.randrange(random_node_count),
+                    random.randint(1, 20))
+
+            hierarchy = random_graph.build_contraction_hierarchy()
+
+            for each_query in range(0, 30):
+                start = random.randrange(random_node_count)
+                end = random.randrange(random_node_count)
+
+                expected = random_graph.dijkstra_algorithm(start, end)
+                result = hierarchy.shortest_path(start, end)
+
+                if start == end or expected is None:
+                    assert result == expected
+                    continue
+
+                assert result[0] == expected[0]
+                assert result[1][0] == start
+                assert result[1][-1] == end
+                self.assert_is_a_real_path(random_graph, result)
+
+    def test_save_and_load(self):
+
+        self.setUp()
+
+        hierarchy = self.graph_one.build_contraction_hierarchy()
+
+        file_descriptor, path = tempfile.mkstemp()
+        os.close(file_descriptor)
+
+        try:
+            hierarchy.save(path)
+            reloaded_hierarchy = ContractionHierarchy.load(path)
+        finally:
+            os.remove(path)
+
+        for start in self.graph_one.nodes():
+            for end in self.graph_one.nodes():
+                assert reloaded_hierarchy.shortest_path(start, end) \
+                    == hierarchy.shortest_path(start, end)
+
+
+unittest.main()
@@ -0,0 +1,261 @@
+import unittest
+import random
+import os
+import tempfile
+
+import shortest_paths
+import frozen_graph
+
+
+class test_FrozenGraph(unittest.TestCase):
+
+    def setUp(self, directed=False):
+
+        self.random_graph = shortest_paths.ShortestPathsGraph(directed)
+        self.random_node_count = random.randint(10, 60)
+
+        for each_integer in range(0, self.random_node_count):
+            self.random_graph.add_node(each_integer)
+        for each_edge_count in range(0, self.random_node_count * 2):
+            self.random_graph.add_weighted_edge(
+                random.randrange(self.random_node_count),
+                random.randrange(self.random_node_count),
+                random.randint(1, 20))
+
+        self.frozen_graph = self.random_graph.freeze()
+
+    def test_structure(self):
+
+        self.setUp()
+
+        assert self.frozen_graph.nodes() == self.random_graph.nodes()
+        assert len(self.frozen_graph.offsets) == self.random_node_count + 1
+        assert len(self.frozen_graph.targets) \
+            == len(self.frozen_graph.weights)
+
+        for each_value in self.random_graph.nodes():
+            assert self.frozen_graph.has_node(each_value)
+            assert sorted(self.frozen_graph.neighbors(each_value)) \
+                == sorted(set(self.random_graph.neighbors(each_value)))
+
+        assert self.frozen_graph.has_node("nowhere") is False
+        with self.assertRaises(ValueError):
+            self.frozen_graph.neighbors("nowhere")
+
+        # A frozen graph is a snapshot:
+        self.random_graph.add_weighted_edge("alpha", "beta", 1)
+        assert self.frozen_graph.has_node("alpha") is False
+
+    def test_traversals(self):
+
+        for each_pass in range(0, 20):
+
+            self.setUp()
+
+            deep_path = self.frozen_graph.depth_first_traversal(0)
+            broad_path = self.frozen_graph.breadth_first_traversal(0)
+
+            expected_nodes = set(self.random_graph.breadth_first_traversal(0))
+
+            assert deep_path[0] == 0
+            assert broad_path[0] == 0
+            assert len(set(deep_path)) == len(deep_path)
+            assert len(set(broad_path)) == len(broad_path)
+            assert set(deep_path) == expected_nodes
+            assert set(broad_path) == expected_nodes
+
+            with self.assertRaises(ValueError):
+                self.frozen_graph.depth_first_traversal("nowhere")
+
+    def test_path_algorithms(self):
+
+        for each_pass in range(0, 20):
+
+            # Every other pass freezes a directed graph:
+            self.setUp(directed=bool(each_pass % 2))
+
+            for each_query in range(0, 10):
+                start = random.randrange(self.random_node_count)
+                end = random.randrange(self.random_node_count)
+
+                expected = self.random_graph.dijkstra_algorithm(start, end)
+                result = self.frozen_graph.dijkstra_algorithm(start, end)
+                result_star = self.frozen_graph.a_star_algorithm(start, end)
+
+                if expected is None or start == end:
+                    assert result == expected
+                    assert result_star == expected
+                    continue
+
+                assert result[0] == expected[0]
+                assert result_star[0] == expected[0]
+                assert result[1][0] == start
+                assert result[1][-1] == end
+
+    def test_coordinate_heuristics(self):
+
+        grid_graph = shortest_paths.ShortestPathsGraph()
+        for each_row in range(0, 8):
+            for each_column in range(0, 8):
+                this_node = grid_graph.add_node((each_row, each_column),
+                                                _returning=True)
+                this_node.x_coordinate = each_column
+                this_node.y_coordinate = each_row
+                if each_column > 0:
+                    grid_graph.add_weighted_edge(
+                        (each_row, each_column - 1),
+                        (each_row, each_column), 1)
+                if each_row > 0:
+                    grid_graph.add_weighted_edge(
+                        (each_row - 1, each_column),
+                        (each_row, each_column), 1)
+
+        frozen_grid = grid_graph.freeze()
+
+        for each_heuristic in (frozen_grid.euclidean_heuristic,
+                               frozen_grid.manhattan_heuristic,
+                               frozen_grid.chebyshev_heuristic):
+            result = frozen_grid.a_star_algorithm((0, 0), (7, 7),
+                                                  heuristic=each_heuristic)
+            assert result[0] == 14
+            assert len(result[1]) == 15
+
+    def test_coordinate_heuristic_objects(self):
+
+        random_generator = random.Random(0)
+        grid_graph = shortest_paths.ShortestPathsGraph()
+        for each_row in range(0, 12):
+            for each_column in range(0, 12):
+                this_node = grid_graph.add_node((each_row, each_column),
+                                                _returning=True)
+                this_node.x_coordinate = each_column
+                this_node.y_coordinate = each_row
+        for each_row in range(0, 12):
+            for each_column in range(0, 12):
+                for row_step, column_step in ((0, 1), (1, 0), (1, 1)):
+                    if each_row + row_step < 12 \
+                            and each_column + column_step < 12:
+                        grid_graph.add_weighted_edge(
+                            (each_row, each_column),
+                            (each_row + row_step, each_column + column_step),
+                            random_generator.randint(2, 5))
+
+        frozen_grid = grid_graph.freeze()
+
+        for each_metric in ('euclidean', 'manhattan', 'chebyshev'):
+            method_heuristic = getattr(frozen_grid,
+                                       each_metric + '_heuristic')
+            # One heuristic object serves query after query:
+            heuristic = frozen_grid.coordinate_heuristic(each_metric)
+
+            for each_query in range(0, 10):
+                start = (random_generator.randrange(12),
+                         random_generator.randrange(12))
+                end = (random_generator.randrange(12),
+                       random_generator.randrange(12))
+
+                expected = frozen_grid.a_star_algorithm(
+                    start, end, heuristic=method_heuristic)
+                result = frozen_grid.a_star_algorithm(
+                    start, end, heuristic=heuristic)
+                assert result == expected
+
+                ending_id = frozen_grid.node_ids_by_value[end]
+                heuristic.aim_at(ending_id)
+                for each_id in range(0, 144, 7):
+                    assert heuristic(each_id, ending_id) \
+                        == method_heuristic(each_id, ending_id)
+
+        with self.assertRaises(ValueError):
+            frozen_grid.coordinate_heuristic('octile')
+
+    def test_coordinate_heuristics_need_every_coordinate(self):
+
+        # A triangle with one corner left without coordinates:
+        partly_placed = shortest_paths.ShortestPathsGraph()
+        for each_value, coordinates in ((0, (0, 0)), (1, (3, 4)),
+                                        (2, None)):
+            this_node = partly_placed.add_node(each_value, _returning=True)
+            if coordinates is not None:
+                this_node.x_coordinate, this_node.y_coordinate = coordinates
+        partly_placed.add_weighted_edge(0, 1, 5)
+        partly_placed.add_weighted_edge(0, 2, 1)
+        partly_placed.add_weighted_edge(2, 1, 1)
+
+        frozen_graph = partly_placed.freeze()
+
+        for each_metric in ('euclidean', 'manhattan', 'chebyshev'):
+            with self.assertRaises(ValueError):
+                frozen_graph.coordinate_heuristic(each_metric)
+            with self.assertRaises(ValueError):
+                frozen_graph.a_star_algorithm(
+                    0, 1, heuristic=getattr(frozen_graph,
+                                            each_metric + '_heuristic'))
+
+        # Searches that don't need coordinates are unaffected:
+        assert frozen_graph.a_star_algorithm(0, 1) == (2, [0, 2, 1])
+        assert frozen_graph.dijkstra_algorithm(0, 1) == (2, [0, 2, 1])
+
+    def test_save_and_load_binary(self):
+
+        self.setUp()
+
+        self.random_graph.add_node("omicron")
+        this_node = self.random_graph.add_node(("with", "coordinates"),
+                                               _returning=True)
+        this_node.x_coordinate = 1.5
+        this_node.y_coordinate = -2
+        self.random_graph.add_weighted_edge(0, ("with", "coordinates"), 0.25)
+
+        original = self.random_graph.freeze()
+
+        file_descriptor, path = tempfile.mkstemp()
+        os.close(file_descriptor)
+
+        try:
+            self.random_graph.save_binary(path)
+            loaded_graphs = [
+                shortest_paths.ShortestPathsGraph.load_binary(path),
+                shortest_paths.ShortestPathsGraph.load_binary(path,
+                                                              mmap=False)]
+
+            # Without NumPy, mapped arrays are read through MappedArray:
+            if frozen_graph.numpy is None:
+                assert isinstance(loaded_graphs[0].targets,
+                                  frozen_graph.MappedArray)
+
+            for each_loaded_graph in loaded_graphs:
+
+                assert each_loaded_graph.nodes() == original.nodes()
+                for name in ('offsets', 'targets', 'weights'):
+                    assert list(getattr(each_loaded_graph, name)) \
+                        == list(getattr(original, name))
+                assert each_loaded_graph.x_coordinates[-1] == 1.5
+                assert each_loaded_graph.y_coordinates[-1] == -2
+
+                for each_value in original.nodes():
+                    assert each_loaded_graph.neighbors(each_value) \
+                        == original.neighbors(each_value)
+                assert each_loaded_graph.breadth_first_traversal(0) \
+                    == original.breadth_first_traversal(0)
+
+                for each_query in range(0, 10):
+                    start = random.randrange(self.random_node_count)
+                    end = random.randrange(self.random_node_count)
+                    assert each_loaded_graph.dijkstra_algorithm(start, end) \
+                        == original.dijkstra_algorithm(start, end)
+
+                assert each_loaded_graph.dijkstra_algorithm(0, "omicron") \
+                    is None
+
+            with open(path, 'r+b') as file_to_damage:
+                file_to_damage.write("NOTGRAPH")
+            with self.assertRaises(ValueError):
+                shortest_paths.ShortestPathsGraph.load_binary(path)
+        finally:
+            # The mapping has to be closed before Windows will remove it.
+            loaded_graphs[0].mapped_file.close()
+            os.remove(path)
+
+
+unittest.main()
@@ -0,0 +1,227 @@
+import unittest
+import random
+import math
+
+import shortest_paths
+import grid_graph
+
+
+class test_GridGraph(unittest.TestCase):
+
+    def setUp(self, connectivity=8):
+
+        self.height = random.randint(5, 20)
+        self.width = random.randint(5, 20)
+
+        # Mostly open ground of varying cost, with about one wall in five:
+        self.cost_map = [[0 if random.random() < 0.2
+                          else random.randint(1, 9)
+                          for each_column in range(0, self.width)]
+                         for each_row in range(0, self.height)]
+
+        self.grid_graph = grid_graph.GridGraph(self.cost_map, connectivity)
+
+        # The same grid spelled out as Nodes and Edges, for comparison.
+        # Entering a cell costs that cell's cost, so Edges are one-way.
+        self.object_graph = shortest_paths.ShortestPathsGraph(directed=True)
+        for each_cell in self.grid_graph.nodes():
+            self.object_graph.add_node(each_cell)
+        for each_cell in self.grid_graph.nodes():
+            for each_neighbor in self.grid_graph.neighbors(each_cell):
+                step_cost = self.grid_graph.cost_of(each_neighbor)
+                if (each_cell[0] != each_neighbor[0]
+                        and each_cell[1] != each_neighbor[1]):
+                    step_cost *= math.sqrt(2)
+                self.object_graph.add_weighted_edge(each_cell, each_neighbor,
+                                                    step_cost)
+
+    def assert_same_path_cost(self, path_found, path_expected):
+
+        if path_expected is None:
+            assert path_found is None
+            return
+
+        cost_found, cells_found = path_found
+        cost_expected, cells_expected = path_expected
+
+        assert abs(cost_found - cost_expected) < 1e-9
+        assert cells_found[0] == cells_expected[0]
+        assert cells_found[-1] == cells_expected[-1]
+
+        # Every step of the path must be a legal move:
+        for each_index in range(1, len(cells_found)):
+            assert cells_found[each_index] \
+                in self.grid_graph.neighbors(cells_found[each_index - 1])
+
+    def test_structure(self):
+
+        self.setUp()
+
+        assert len(self.grid_graph.costs) == self.height * self.width
+
+        for each_row in range(0, self.height):
+            for each_column in range(0, self.width):
+                assert self.grid_graph.has_node((each_row, each_column)) \
+                    == (self.cost_map[each_row][each_column] > 0)
+
+        assert not self.grid_graph.has_node((-1, 0))
+        assert not self.grid_graph.has_node((0, self.width))
+        assert not self.grid_graph.has_node("omicron")
+
+        open_map = [[1, 1, 1],
+                    [1, 1, 0],
+                    [1, 1, 1]]
+
+        four_connected = grid_graph.GridGraph(open_map, connectivity=4)
+        assert sorted(four_connected.neighbors((1, 1))) \
+            == [(0, 1), (1, 0), (2, 1)]
+
+        # No cutting past the wall at (1, 2) to reach (0, 2) or (2, 2):
+        eight_connected = grid_graph.GridGraph(open_map)
+        assert sorted(eight_connected.neighbors((1, 1))) \
+            == [(0, 0), (0, 1), (1, 0), (2, 0), (2, 1)]
+
+        with self.assertRaises(ValueError):
+            eight_connected.neighbors((1, 2))
+        with self.assertRaises(ValueError):
+            grid_graph.GridGraph(open_map, connectivity=6)
+        with self.assertRaises(ValueError):
+            grid_graph.GridGraph([[1, 1], [1]])
+
+    def test_paths_match_object_graph(self):
+
+        for connectivity in (4, 8):
+
+            self.setUp(connectivity)
+
+            heuristics = [None, self.grid_graph.euclidean_heuristic,
+                          self.grid_graph.chebyshev_heuristic]
+            if connectivity == 4:
+                heuristics.append(self.grid_graph.manhattan_heuristic)
+
+            cells = self.grid_graph.nodes()
+
+            for each_query in range(0, 20):
+                start = random.choice(cells)
+                end = random.choice(cells)
+
+                path_expected = self.object_graph.dijkstra_algorithm(start,
+                                                                     end)
+                if start == end:
+                    assert self.grid_graph.dijkstra_algorithm(start, end) \
+                        == [start]
+                    continue
+
+                self.assert_same_path_cost(
+                    self.grid_graph.dijkstra_algorithm(start, end),
+                    path_expected)
+
+                for each_heuristic in heuristics:
+                    self.assert_same_path_cost(
+                        self.grid_graph.a_star_algorithm(start, end,
+                                                         each_heuristic),
+                        path_expected)
+
+    def test_unreachable_and_walls(self):
+
+        walled_map = [[1, 0, 1],
+                      [1, 0, 1],
+                      [1, 0, 1]]
+        walled_grid = grid_graph.GridGraph(walled_map)
+
+        assert walled_grid.a_star_algorithm((0, 0), (2, 2)) is None
+        assert walled_grid.dijkstra_algorithm((0, 0), (2, 0)) \
+            == (2, [(0, 0), (1, 0), (2, 0)])
+
+        with self.assertRaises(ValueError):
+            walled_grid.a_star_algorithm((0, 0), (0, 1))
+        with self.assertRaises(ValueError):
+            walled_grid.dijkstra_algorithm((0, 0), (3, 0))
+
+    def test_jump_point_search(self):
+
+        for wall_fraction in (0, 0.1, 0.3):
+
+            # Jump Point Search needs every open cell to cost the same:
+            uniform_map = [[0 if random.random() < wall_fraction else 2
+                            for each_column in range(0, 25)]
+                           for each_row in range(0, 25)]
+            uniform_grid = grid_graph.GridGraph(uniform_map)
+            cells = uniform_grid.nodes()
+
+            for each_query in range(0, 50):
+                start = random.choice(cells)
+                end = random.choice(cells)
+
+                path_found = uniform_grid.jump_point_search(start, end)
+                path_expected = uniform_grid.a_star_algorithm(
+                    start, end, uniform_grid.chebyshev_heuristic)
+
+                if start == end:
+                    assert path_found == [start]
+                elif path_expected is None:
+                    assert path_found is None
+                else:
+                    # The path is spelled out cell by cell, one legal
+                    # move at a time, and costs what A*'s does:
+                    cost_found, cells_found = path_found
+                    assert abs(cost_found - path_expected[0]) < 1e-9
+                    assert cells_found[0] == start
+                    assert cells_found[-1] == end
+                    for each_index in range(1, len(cells_found)):
+                        assert cells_found[each_index] in \
+                            uniform_grid.neighbors(cells_found[each_index - 1])
+
+        # On open ground, JPS expands a handful of cells where A*
+        # expands every cell along the many equally cheap paths.
+        open_grid = grid_graph.GridGraph([[1] * 40] * 40)
+        assert abs(open_grid.jump_point_search((0, 0), (39, 20))[0]
+                   - open_grid.a_star_algorithm((0, 0), (39, 20))[0]) < 1e-9
+
+        ending_id = 39 * 40 + 20
+        distances, predecessors = open_grid._new_search_state()
+        a_star_expansions = 0
+        for each_id in open_grid._settle_ids(
+                0, distances, predecessors, ending_id,
+                open_grid.chebyshev_heuristic):
+            a_star_expansions += 1
+            if each_id == ending_id:
+                break
+        distances, predecessors = open_grid._new_search_state()
+        jump_point_expansions = 0
+        for each_id in open_grid._settle_jump_points(
+                0, ending_id, distances, predecessors,
+                open_grid.chebyshev_heuristic):
+            jump_point_expansions += 1
+            if each_id == ending_id:
+                break
+        assert jump_point_expansions * 10 < a_star_expansions
+
+        with self.assertRaises(ValueError):
+            grid_graph.GridGraph([[1, 1], [1, 1]], connectivity=4) \
+                .jump_point_search((0, 0), (1, 1))
+        with self.assertRaises(ValueError):
+            grid_graph.GridGraph([[1, 2], [1, 1]]) \
+                .jump_point_search((0, 0), (1, 1))
+        with self.assertRaises(ValueError):
+            grid_graph.GridGraph([[1, 0], [1, 1]]) \
+                .jump_point_search((0, 0), (0, 1))
+
+    def test_numpy_cost_map(self):
+
+        if grid_graph.numpy is None:
+            return
+
+        self.setUp()
+
+        array_map = grid_graph.numpy.array(self.cost_map, dtype=float)
+        array_map[0, 0] = float('nan')
+        array_grid = grid_graph.GridGraph(array_map)
+
+        assert (array_grid.height, array_grid.width) \
+            == (self.height, self.width)
+        assert not array_grid.has_node((0, 0))
+        assert list(array_grid.costs)[1:] == list(self.grid_graph.costs)[1:]
+
+
+unittest.main()
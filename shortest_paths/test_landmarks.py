@@ -0,0 +1,139 @@
+import unittest
+import random
+
+import shortest_paths
+
+
+class test_LandmarkHeuristic(unittest.TestCase):
+
+    def setUp(self):
+
+        # A 15 by 15 grid with random weightings, in two separate copies
+        # so that some queries have no path.
+        self.grid_graph = shortest_paths.ShortestPathsGraph()
+        random_generator = random.Random(0)
+
+        for each_copy in ("a", "b"):
+            for each_row in range(0, 15):
+                for each_column in range(0, 15):
+                    if each_column > 0:
+                        self.grid_graph.add_weighted_edge(
+                            (each_copy, each_row, each_column - 1),
+                            (each_copy, each_row, each_column),
+                            random_generator.randint(1, 10))
+                    if each_row > 0:
+                        self.grid_graph.add_weighted_edge(
+                            (each_copy, each_row - 1, each_column),
+                            (each_copy, each_row, each_column),
+                            random_generator.randint(1, 10))
+
+    def test_a_star_matches_dijkstra(self):
+
+        self.setUp()
+
+        all_values = self.grid_graph.nodes()
+        random_generator = random.Random(1)
+
+        for each_strategy in ('farthest', 'avoid'):
+
+            heuristic = self.grid_graph.build_landmark_heuristic(
+                landmark_count=6, strategy=each_strategy, seed=2)
+
+            assert len(heuristic.landmarks) == 6
+            assert len(heuristic.landmark_distances) \
+                == 6 * len(self.grid_graph.node_list)
+
+            for each_query in range(0, 40):
+                start = random_generator.choice(all_values)
+                end = random_generator.choice(all_values)
+
+                expected = self.grid_graph.dijkstra_algorithm(start, end)
+                result = self.grid_graph.a_star_algorithm(
+                    start, end, heuristic=heuristic)
+
+                if expected is None or start == end:
+                    assert result == expected
+                else:
+                    assert result[0] == expected[0]
+
+    def test_heuristic_is_admissible(self):
+
+        self.setUp()
+
+        heuristic = self.grid_graph.build_landmark_heuristic(
+            landmark_count=4, seed=3)
+
+        ending_node = self.grid_graph.nodes_by_value[("a", 7, 7)]
+        distances = {}
+        for each_node in self.grid_graph._settle_nodes(ending_node,
+                                                       distances, {}):
+            pass
+
+        for each_node in self.grid_graph.node_list:
+            if each_node in distances:
+                assert heuristic(each_node, ending_node) \
+                    <= distances[each_node]
+
+        assert heuristic(ending_node, ending_node) == 0
+
+    def test_landmarks_settle_fewer_nodes(self):
+
+        self.setUp()
+
+        heuristic = self.grid_graph.build_landmark_heuristic(
+            landmark_count=8, strategy='avoid', seed=4)
+
+        starting_node = self.grid_graph.nodes_by_value[("a", 0, 0)]
+        ending_node = self.grid_graph.nodes_by_value[("a", 14, 14)]
+
+        settled_counts = []
+        for each_heuristic in (None, heuristic):
+            settled_count = 0
+            for each_node in self.grid_graph._settle_nodes(
+                    starting_node, {}, {}, ending_node=ending_node,
+                    heuristic=each_heuristic):
+                settled_count += 1
+                if each_node is ending_node:
+                    break
+            settled_counts.append(settled_count)
+
+        assert settled_counts[1] < settled_counts[0]
+
+    def test_directed_graph(self):
+
+        random_generator = random.Random(3)
+        directed_graph = shortest_paths.ShortestPathsGraph(directed=True)
+        for each_edge_count in range(0, 300):
+            directed_graph.add_weighted_edge(
+                random_generator.randrange(100),
+                random_generator.randrange(100),
+                random_generator.randint(1, 20))
+
+        heuristic = directed_graph.build_landmark_heuristic(
+            landmark_count=4, seed=5)
+        assert len(heuristic.distances_to_landmarks) \
+            == 4 * len(directed_graph.node_list)
+
+        all_values = directed_graph.nodes()
+        for each_query in range(0, 40):
+            start = random_generator.choice(all_values)
+            end = random_generator.choice(all_values)
+
+            expected = directed_graph.dijkstra_algorithm(start, end)
+            result = directed_graph.a_star_algorithm(
+                start, end, heuristic=heuristic)
+
+            if expected is None or start == end:
+                assert result == expected
+            else:
+                assert result[0] == expected[0]
+
+    def test_bad_strategy(self):
+
+        self.setUp()
+
+        with self.assertRaises(ValueError):
+            self.grid_graph.build_landmark_heuristic(strategy="nearest")
+
+
+unittest.main()
@@ -1,6 +1,9 @@
 
 import unittest
 import random
+from array import array
+import os
+import tempfile
 
 import shortest_paths
 
@@ -22,7 +25,9 @@ class test_ShortestPathsGraph(unittest.TestCase):
 
         result_zero = graph_zero.dijkstra_algorithm(0, 5)
         result_zero_star = graph_zero.a_star_algorithm(0, 5)
+        result_zero_both_ways = graph_zero.bidirectional_dijkstra(0, 5)
         assert result_zero == (5, [0, 1, 2, 3, 4, 5])
+        assert result_zero_both_ways == (5, [0, 1, 2, 3, 4, 5])
         assert result_zero_star == (5, [0, 1, 2, 3, 4, 5])
 
         result_one = graph_zero.dijkstra_algorithm(9, 5)
@@ -70,9 +75,802 @@ class test_ShortestPathsGraph(unittest.TestCase):
 
         result_four = graph_one.dijkstra_algorithm("alpha", "omicron")
         result_four_star = graph_one.a_star_algorithm("alpha", "omicron")
+        result_four_both_ways = graph_one.bidirectional_dijkstra("alpha",
+                                                                 "omicron")
         assert result_four == None
-        assert result_four == None
+        assert result_four_star == None
+        assert result_four_both_ways == None
+
+
+    def test_dijkstra_against_exhaustive_relaxation(self):
+
+        for each_pass in range(0, 20):
+
+            random_graph = shortest_paths.ShortestPathsGraph()
+            random_node_count = random.randint(2, 40)
+
+            for each_integer in range(0, random_node_count):
+                random_graph.add_node(each_integer)
+            for each_edge_count in range(0, random_node_count * 2):
+                random_graph.add_weighted_edge(
+                    random.randrange(random_node_count),
+                    random.randrange(random_node_count),
+                    random.randint(1, 20))
+
+            # Bellman-Ford style relaxation until nothing improves:
+            expected_distances = {0: 0}
+            improved = True
+            while improved:
+                improved = False
+                for each_edge in random_graph.edge_list:
+                    for one_end, other_end in (
+                            (each_edge.alpha_node, each_edge.beta_node),
+                            (each_edge.beta_node, each_edge.alpha_node)):
+                        if one_end.value not in expected_distances:
+                            continue
+                        candidate = (expected_distances[one_end.value]
+                                     + each_edge.weighting)
+                        if candidate < expected_distances.get(
+                                other_end.value, float('inf')):
+                            expected_distances[other_end.value] = candidate
+                            improved = True
+
+            for each_integer in range(1, random_node_count):
+                result = random_graph.dijkstra_algorithm(0, each_integer)
+                result_star = random_graph.a_star_algorithm(0, each_integer)
+                result_both_ways = random_graph.bidirectional_dijkstra(
+                    0, each_integer)
+
+                if each_integer not in expected_distances:
+                    assert result is None
+                    assert result_star is None
+                    assert result_both_ways is None
+                    continue
+
+                assert result[0] == expected_distances[each_integer]
+                assert result_star[0] == expected_distances[each_integer]
+                assert result_both_ways[0] == expected_distances[each_integer]
+                assert result_both_ways[1][0] == 0
+                assert result_both_ways[1][-1] == each_integer
+                assert len(set(result_both_ways[1])) \
+                    == len(result_both_ways[1])
+                for each_index in range(1, len(result_both_ways[1])):
+                    assert random_graph.has_edge(
+                        result_both_ways[1][each_index - 1],
+                        result_both_ways[1][each_index])
+                assert result[1][0] == 0
+                assert result[1][-1] == each_integer
+
+                # The path's own Edges add up to its reported cost:
+                path_cost = 0
+                for each_index in range(1, len(result[1])):
+                    path_cost += random_graph.return_weighting(
+                        result[1][each_index - 1], result[1][each_index])
+                assert path_cost == result[0]
+
+    def test_dijkstra_stops_once_the_end_is_settled(self):
+
+        chain_graph = shortest_paths.ShortestPathsGraph()
+        for each_index in range(1, 100):
+            chain_graph.add_weighted_edge(each_index - 1, each_index, 1)
+
+        distances = {}
+        predecessors = {}
+        settled_order = []
+        for each_node in chain_graph._settle_nodes(
+                chain_graph.nodes_by_value[0], distances, predecessors):
+            settled_order.append(each_node.value)
+            if each_node.value == 3:
+                break
+
+        assert settled_order == [0, 1, 2, 3]
+        # Stopping at the end means nothing past it was ever reached:
+        assert sorted(distances.keys(),
+                      key=lambda each_node: each_node.value) \
+            == [chain_graph.nodes_by_value[each_integer]
+                for each_integer in range(0, 4)]
+
+        assert chain_graph.dijkstra_algorithm(0, 3) == (3, [0, 1, 2, 3])
+
+        with self.assertRaises(ValueError):
+            chain_graph.dijkstra_algorithm(0, "nowhere")
+        with self.assertRaises(ValueError):
+            chain_graph.a_star_algorithm("nowhere", 0)
+
+    def test_shortest_path_tree(self):
+
+        graph_zero = shortest_paths.ShortestPathsGraph()
+
+        for each_index in range(1, 10):
+            graph_zero.add_weighted_edge((each_index - 1), each_index, 1)
+        graph_zero.add_weighted_edge(0, 9, 20)
+        graph_zero.add_node("omicron")
+
+        tree = graph_zero.shortest_path_tree(0)
+
+        for each_integer in range(0, 10):
+            expected = graph_zero.dijkstra_algorithm(0, each_integer)
+            if each_integer == 0:
+                assert tree.distance_to(0) == 0
+                assert tree.path_to(0) == [0]
+            else:
+                assert tree.distance_to(each_integer) == expected[0]
+                assert tree.path_to(each_integer) == expected[1]
+
+        assert tree.distance_to(9) == 9
+        assert tree.path_to(9) == range(0, 10)
+
+        assert tree.reaches(5) is True
+        assert tree.reaches("omicron") is False
+        assert tree.distance_to("omicron") is None
+        assert tree.path_to("omicron") is None
+
+        # The tree is a snapshot; changing the graph doesn't change it:
+        graph_zero.add_weighted_edge(0, 9, 1)
+        assert tree.distance_to(9) == 9
+
+        with self.assertRaises(ValueError):
+            graph_zero.shortest_path_tree("nowhere")
+
+    def test_query_cache(self):
+
+        graph_zero = shortest_paths.ShortestPathsGraph()
+        for each_index in range(1, 10):
+            graph_zero.add_weighted_edge((each_index - 1), each_index, 1)
+        graph_zero.add_weighted_edge(0, 9, 20)
+
+        cache = graph_zero.enable_query_cache(max_entries=2)
+
+        assert graph_zero.dijkstra_algorithm(0, 5) == (5, [0, 1, 2, 3, 4, 5])
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert graph_zero.dijkstra_algorithm(0, 5) == (5, [0, 1, 2, 3, 4, 5])
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Callers can't change what's in the cache:
+        graph_zero.dijkstra_algorithm(0, 5)[1].append("junk")
+        assert graph_zero.dijkstra_algorithm(0, 5) == (5, [0, 1, 2, 3, 4, 5])
+
+        # A* results are kept apart from Dijkstra's, and by heuristic:
+        assert graph_zero.a_star_algorithm(0, 5) == (5, [0, 1, 2, 3, 4, 5])
+        assert cache.misses == 2
+
+        # The least recently used result goes first:
+        graph_zero.dijkstra_algorithm(0, 5)
+        graph_zero.dijkstra_algorithm(9, 5)
+        assert cache.evictions == 1
+        assert len(cache) == 2
+        graph_zero.dijkstra_algorithm(0, 5)
+        assert cache.hits == 5
+
+        # Any change to the graph makes every cached result stale:
+        graph_zero.add_weighted_edge(0, 9, 1)
+        assert graph_zero.dijkstra_algorithm(9, 5) == (4, [9, 8, 7, 6, 5])
+        assert graph_zero.dijkstra_algorithm(0, 4) == (4, [0, 1, 2, 3, 4])
+        assert cache.invalidations == 1
+
+        graph_zero.del_edge(4, 5)
+        assert graph_zero.dijkstra_algorithm(0, 5) == (5, [0, 9, 8, 7, 6, 5])
+        graph_zero.add_node("omicron")
+        assert graph_zero.dijkstra_algorithm(0, "omicron") is None
+        assert graph_zero.dijkstra_algorithm(0, "omicron") is None
+        # Queries between separate components are looked up in the cache
+        # first, but their None results are never stored:
+        assert cache.invalidations == 3
+        assert len(cache) == 0
+        graph_zero.del_node(9)
+        assert graph_zero.dijkstra_algorithm(0, 5) is None
+        assert graph_zero.dijkstra_algorithm(0, 4) == (4, [0, 1, 2, 3, 4])
+        assert cache.invalidations == 3
+
+        # The path length limit bounds the cache's size too:
+        small_cache = graph_zero.enable_query_cache(max_path_nodes=6)
+        graph_zero.dijkstra_algorithm(0, 4)
+        graph_zero.dijkstra_algorithm(0, 3)
+        assert small_cache.stored_path_nodes <= 6
+        assert small_cache.evictions == 1
+
+        graph_zero.disable_query_cache()
+        assert graph_zero.query_cache is None
+        assert graph_zero.dijkstra_algorithm(0, 4) == (4, [0, 1, 2, 3, 4])
+
+    def test_connectivity(self):
+
+        graph_zero = shortest_paths.ShortestPathsGraph()
+        for each_index in range(1, 5):
+            graph_zero.add_weighted_edge((each_index - 1), each_index, 1)
+        graph_zero.add_weighted_edge("alpha", "beta", 1)
+        graph_zero.add_node("omicron")
+
+        assert graph_zero.connected(0, 4) is True
+        assert graph_zero.connected(0, "alpha") is False
+        assert graph_zero.connected("omicron", "omicron") is True
+        assert graph_zero.components() \
+            == [[0, 1, 2, 3, 4], ["alpha", "beta"], ["omicron"]]
+
+        with self.assertRaises(ValueError):
+            graph_zero.connected(0, "nowhere")
+
+        # Separate components are ruled out without any searching:
+        graph_zero._settle_nodes = None
+        graph_zero._bidirectional_search = None
+        assert graph_zero.dijkstra_algorithm(0, "alpha") is None
+        assert graph_zero.a_star_algorithm(0, "omicron") is None
+        assert graph_zero.bidirectional_dijkstra("beta", 3) is None
+        del graph_zero._settle_nodes, graph_zero._bidirectional_search
+
+        graph_zero.add_weighted_edge(4, "alpha", 1)
+        assert graph_zero.connected(0, "beta") is True
+        assert graph_zero.dijkstra_algorithm(0, "beta")[0] == 6
+
+        # Path queries after a deletion make do with the stale index;
+        # a rebuild waits until connected() or components() need one:
+        graph_zero.del_edge(2, 3)
+        stale_index = graph_zero.connectivity
+        assert graph_zero.dijkstra_algorithm(0, "beta") is None
+        assert graph_zero.a_star_algorithm(3, "beta")[0] == 3
+        assert graph_zero.bidirectional_dijkstra(0, "omicron") is None
+        assert graph_zero.k_shortest_paths(0, 4, 2) == []
+        assert graph_zero.connectivity is stale_index
+
+        # Deletions can split components, so the index is rebuilt:
+        assert graph_zero.connected(0, "beta") is False
+        assert graph_zero.connectivity is not stale_index
+        assert graph_zero.connected(3, "beta") is True
+        graph_zero.del_node("alpha")
+        assert graph_zero.components() \
+            == [[0, 1, 2], [3, 4], ["beta"], ["omicron"]]
+        graph_zero.add_edge("beta", "omicron")
+        assert graph_zero.connected("beta", "omicron") is True
+
+    def test_add_weighted_edges_from(self):
+
+        edge_triples = [(random.randrange(30), random.randrange(30),
+                         random.randint(1, 20)) for each_edge in range(0, 80)]
+
+        one_at_a_time = shortest_paths.ShortestPathsGraph()
+        for n1, n2, weighting in edge_triples:
+            one_at_a_time.add_weighted_edge(n1, n2, weighting)
+
+        in_bulk = shortest_paths.ShortestPathsGraph()
+        in_bulk.add_weighted_edges_from(edge_triples)
+
+        assert in_bulk.nodes() == one_at_a_time.nodes()
+        assert len(in_bulk.edge_list) == len(one_at_a_time.edge_list)
+        assert in_bulk.components() == one_at_a_time.components()
+        for n1, n2, weighting in edge_triples:
+            assert in_bulk.return_weighting(n1, n2) \
+                == one_at_a_time.return_weighting(n1, n2)
+        for each_query in range(0, 20):
+            start = random.randrange(30)
+            end = random.randrange(30)
+            if in_bulk.has_node(start) and in_bulk.has_node(end):
+                assert in_bulk.dijkstra_algorithm(start, end) \
+                    == one_at_a_time.dijkstra_algorithm(start, end)
+
+        with self.assertRaises(TypeError):
+            in_bulk.add_weighted_edges_from([(1, 2, None)])
+
+        file_descriptor, path = tempfile.mkstemp()
+        os.write(file_descriptor, "a;b;2\nb;c;1.5\n")
+        os.close(file_descriptor)
+        try:
+            from_csv = shortest_paths.ShortestPathsGraph()
+            from_csv.add_weighted_edges_from_csv(path, delimiter=';')
+        finally:
+            os.remove(path)
+        assert from_csv.dijkstra_algorithm("a", "c") == (3.5, ["a", "b", "c"])
+
+        from_arrays = shortest_paths.ShortestPathsGraph()
+        from_arrays.add_weighted_edges_from_arrays(
+            array('l', [0, 1]), array('l', [1, 2]), array('d', [1, 2]))
+        assert from_arrays.dijkstra_algorithm(0, 2) == (3.0, [0, 1, 2])
+
+    def test_directed_graph(self):
+
+        undirected_graph = shortest_paths.ShortestPathsGraph()
+        undirected_graph.add_weighted_edge(1, 2, 1)
+        node_one = undirected_graph.nodes_by_value[1]
+        # Undirected Nodes share one map rather than keeping two:
+        assert node_one.edges_by_incoming_neighbor \
+            is node_one.edges_by_neighbor
+
+        # 1 -> 2 -> 3 -> 4 is long, 1 -> 4 is short but only one way,
+        # and 4 -> 5 -> 1 closes the loop.
+        directed_graph = shortest_paths.ShortestPathsGraph(directed=True)
+        directed_graph.add_weighted_edge(1, 2, 1)
+        directed_graph.add_weighted_edge(2, 3, 1)
+        directed_graph.add_weighted_edge(3, 4, 1)
+        directed_graph.add_weighted_edge(1, 4, 2)
+        directed_graph.add_weighted_edge(4, 5, 1)
+        directed_graph.add_weighted_edge(5, 1, 1)
+
+        assert sorted(directed_graph.neighbors(1)) == [2, 4]
+        assert directed_graph.neighbors(4) == [5]
+        assert directed_graph.adjacent(1, 4) is True
+        assert directed_graph.adjacent(4, 1) is False
+        assert directed_graph.has_edge(5, 1) is True
+        assert directed_graph.has_edge(1, 5) is False
+
+        assert directed_graph.depth_first_traversal(3) == [3, 4, 5, 1, 2]
+        assert directed_graph.breadth_first_traversal(4) == [4, 5, 1, 2, 3]
+
+        assert directed_graph.dijkstra_algorithm(1, 4) == (2, [1, 4])
+        assert directed_graph.dijkstra_algorithm(4, 1) == (2, [4, 5, 1])
+        assert directed_graph.dijkstra_algorithm(3, 2) \
+            == (4, [3, 4, 5, 1, 2])
+        assert directed_graph.a_star_algorithm(3, 2) \
+            == (4, [3, 4, 5, 1, 2])
+        assert directed_graph.bidirectional_dijkstra(3, 2) \
+            == (4, [3, 4, 5, 1, 2])
+
+        # An Edge can only be deleted in its own direction:
+        with self.assertRaises(Exception):
+            directed_graph.del_edge(4, 1)
+        directed_graph.del_edge(5, 1)
+        assert directed_graph.dijkstra_algorithm(4, 1) is None
+        assert directed_graph.bidirectional_dijkstra(4, 1) is None
+        assert directed_graph.dijkstra_algorithm(1, 5) == (3, [1, 4, 5])
+
+        directed_graph.del_node(4)
+        assert directed_graph.neighbors(1) == [2]
+        assert directed_graph.nodes_by_value[5] \
+            .edges_by_incoming_neighbor == {}
+
+        random_generator = random.Random(0)
+        for each_pass in range(0, 10):
+            random_graph = shortest_paths.ShortestPathsGraph(directed=True)
+            for each_edge_count in range(0, 80):
+                random_graph.add_weighted_edge(
+                    random_generator.randrange(30),
+                    random_generator.randrange(30),
+                    random_generator.randint(1, 20))
+            all_values = random_graph.nodes()
+            for each_query in range(0, 30):
+                start = random_generator.choice(all_values)
+                end = random_generator.choice(all_values)
+                expected = random_graph.dijkstra_algorithm(start, end)
+                result = random_graph.bidirectional_dijkstra(start, end)
+                if expected is None or start == end:
+                    assert result == expected
+                else:
+                    assert result[0] == expected[0]
+
+    def test_nearest_targets(self):
+
+        line_graph = shortest_paths.ShortestPathsGraph()
+        for each_integer in range(1, 10):
+            line_graph.add_weighted_edge(each_integer - 1, each_integer, 1)
+        line_graph.add_weighted_edge("far", "away", 1)
+
+        assert line_graph.nearest_targets(3, [0, 8, 5, 9], 2) \
+            == [(2, [3, 4, 5]), (3, [3, 2, 1, 0])]
+        assert line_graph.nearest_targets(3, [3, 8], 5) \
+            == [(0, [3]), (5, [3, 4, 5, 6, 7, 8])]
+        assert line_graph.nearest_targets(3, ["away"], 1) == []
+        assert line_graph.nearest_targets(3, [8], 0) == []
+        with self.assertRaises(ValueError):
+            line_graph.nearest_targets(3, [8, "nonexistent"], 1)
+        with self.assertRaises(ValueError):
+            line_graph.nearest_targets("nonexistent", [8], 1)
+
+        random_generator = random.Random(0)
+        for each_pass in range(0, 10):
+            random_graph = shortest_paths.ShortestPathsGraph(
+                directed=bool(each_pass % 2))
+            for each_edge_count in range(0, 100):
+                random_graph.add_weighted_edge(
+                    random_generator.randrange(50),
+                    random_generator.randrange(50),
+                    random_generator.randint(1, 20))
+
+            all_values = random_graph.nodes()
+            start = random_generator.choice(all_values)
+            targets = random_generator.sample(all_values, 10)
+
+            expected_costs = sorted(
+                random_graph.dijkstra_algorithm(start, each_target)[0]
+                for each_target in targets
+                if each_target != start
+                and random_graph.dijkstra_algorithm(start, each_target))
+            if start in targets:
+                expected_costs.insert(0, 0)
+
+            results = random_graph.nearest_targets(start, targets, 4)
+            assert [each_cost for each_cost, each_path in results] \
+                == expected_costs[:4]
+            for each_cost, each_path in results:
+                assert each_path[0] == start
+                assert each_path[-1] in targets
+
+    def test_within_cost(self):
+
+        grid_graph = shortest_paths.ShortestPathsGraph()
+        random_generator = random.Random(0)
+        for each_row in range(0, 20):
+            for each_column in range(0, 20):
+                if each_column > 0:
+                    grid_graph.add_weighted_edge(
+                        (each_row, each_column - 1), (each_row, each_column),
+                        random_generator.randint(1, 10))
+                if each_row > 0:
+                    grid_graph.add_weighted_edge(
+                        (each_row - 1, each_column), (each_row, each_column),
+                        random_generator.randint(1, 10))
+
+        tree = grid_graph.shortest_path_tree((10, 10))
+
+        for each_budget in (0, 5, 20, 1000):
+            reachable = list(grid_graph.within_cost((10, 10), each_budget))
+            costs = [each_cost for each_value, each_cost in reachable]
+            assert costs == sorted(costs)
+            assert dict(reachable) == dict(
+                (each_value, tree.distance_to(each_value))
+                for each_value in grid_graph.nodes()
+                if tree.distance_to(each_value) <= each_budget)
+
+        assert list(grid_graph.within_cost((10, 10), -1)) == []
+        assert next(grid_graph.within_cost((10, 10), 5)) == ((10, 10), 0)
+
+        with self.assertRaises(ValueError):
+            grid_graph.within_cost("nonexistent", 5)
+
+    def test_k_shortest_paths(self):
+
+        # The example from Wikipedia's article on Yen's algorithm:
+        road_graph = shortest_paths.ShortestPathsGraph(directed=True)
+        for n1, n2, weighting in (("C", "D", 3), ("C", "E", 2), ("D", "F", 4),
+                                  ("E", "D", 1), ("E", "F", 2), ("E", "G", 3),
+                                  ("F", "G", 2), ("F", "H", 1), ("G", "H", 2)):
+            road_graph.add_weighted_edge(n1, n2, weighting)
+
+        assert road_graph.k_shortest_paths("C", "H", 3) \
+            == [(5, ["C", "E", "F", "H"]),
+                (7, ["C", "E", "G", "H"]),
+                (8, ["C", "D", "F", "H"])]
+        assert road_graph.k_shortest_paths("C", "H", 1) \
+            == [road_graph.dijkstra_algorithm("C", "H")]
+        # There are only seven loopless paths from C to H:
+        assert len(road_graph.k_shortest_paths("C", "H", 100)) == 7
+        assert road_graph.k_shortest_paths("H", "C", 3) == []
+        assert road_graph.k_shortest_paths("C", "C", 3) == [(0, ["C"])]
+        assert road_graph.k_shortest_paths("C", "H", 0) == []
+        with self.assertRaises(ValueError):
+            road_graph.k_shortest_paths("C", "nonexistent", 3)
+
+        def all_loopless_path_costs(graph, start, end):
+            costs = []
+            paths_to_extend = [[graph.nodes_by_value[start]]]
+            while paths_to_extend:
+                each_path = paths_to_extend.pop()
+                if each_path[-1].value == end:
+                    costs.append(sum(
+                        each_path[i - 1].edges_by_neighbor[
+                            each_path[i]].weighting
+                        for i in range(1, len(each_path))))
+                    continue
+                for each_neighbor in each_path[-1].edges_by_neighbor:
+                    if each_neighbor not in each_path:
+                        paths_to_extend.append(each_path + [each_neighbor])
+            return sorted(costs)
+
+        random_generator = random.Random(0)
+        for each_pass in range(0, 20):
+            random_graph = shortest_paths.ShortestPathsGraph(
+                directed=bool(each_pass % 2))
+            for each_edge_count in range(0, 16):
+                random_graph.add_weighted_edge(
+                    random_generator.randrange(8),
+                    random_generator.randrange(8),
+                    random_generator.randint(1, 20))
+
+            all_values = random_graph.nodes()
+            start = random_generator.choice(all_values)
+            end = random_generator.choice(all_values)
+            if start == end:
+                continue
+
+            expected_costs = all_loopless_path_costs(random_graph,
+                                                     start, end)[:6]
+            results = random_graph.k_shortest_paths(start, end, 6)
+
+            assert [each_cost for each_cost, each_path in results] \
+                == expected_costs
+            assert len(set(tuple(each_path)
+                           for each_cost, each_path in results)) \
+                == len(results)
+            for each_cost, each_path in results:
+                assert each_path[0] == start
+                assert each_path[-1] == end
+                assert len(set(each_path)) == len(each_path)
+
+    def test_dynamic_shortest_path_tree(self):
+
+        graph = shortest_paths.ShortestPathsGraph()
+        graph.add_weighted_edge(1, 2, 1)
+        graph.add_weighted_edge(2, 3, 1)
+        graph.add_weighted_edge(3, 4, 1)
+        graph.add_weighted_edge(1, 4, 5)
+
+        tree = graph.dynamic_shortest_path_tree(1)
+        assert tree.distance_to(4) == 3
+        assert tree.path_to(4) == [1, 2, 3, 4]
+
+        # Lengthening an Edge off the tree touches nothing:
+        graph.add_weighted_edge(1, 4, 6)
+        assert tree.last_touched_count == 0
+
+        # Lengthening one on it touches the Nodes below it:
+        graph.add_weighted_edge(2, 3, 10)
+        assert tree.last_touched_count == 2
+        assert tree.path_to(4) == [1, 4]
+        assert tree.distance_to(3) == 7
+
+        # Shortening one touches the Nodes whose distance improves:
+        graph.add_weighted_edge(1, 4, 1)
+        assert tree.last_touched_count == 2
+        assert tree.path_to(3) == [1, 4, 3]
+
+        graph.del_edge(1, 4)
+        assert tree.path_to(3) == [1, 2, 3]
+        graph.del_node(2)
+        assert not tree.reaches(3)
+        assert tree.path_to(4) is None
+        graph.add_weighted_edges_from([(1, 3, 2), (3, 4, 2)])
+        assert tree.distance_to(4) == 4
+
+        with self.assertRaises(ValueError):
+            graph.dynamic_shortest_path_tree("nonexistent")
+
+        random_generator = random.Random(0)
+        for each_pass in range(0, 20):
+
+            random_graph = shortest_paths.ShortestPathsGraph(
+                directed=bool(each_pass % 2))
+            for each_edge_count in range(0, 90):
+                random_graph.add_weighted_edge(
+                    random_generator.randrange(30),
+                    random_generator.randrange(30),
+                    random_generator.randint(1, 20))
+
+            start = random_graph.nodes()[0]
+            dynamic_tree = random_graph.dynamic_shortest_path_tree(start)
+
+            for each_update in range(0, 60):
+                roll = random_generator.random()
+                if roll < 0.1 and len(random_graph.node_list) > 2:
+                    value = random_generator.choice(random_graph.nodes())
+                    if value != start:
+                        random_graph.del_node(value)
+                elif roll < 0.3 and random_graph.edge_list:
+                    each_edge = random_generator.choice(
+                        random_graph.edge_list)
+                    random_graph.del_edge(each_edge.alpha_node.value,
+                                          each_edge.beta_node.value)
+                else:
+                    random_graph.add_weighted_edge(
+                        random_generator.randrange(30),
+                        random_generator.randrange(30),
+                        random_generator.randint(1, 20))
+
+                fresh_tree = random_graph.shortest_path_tree(start)
+                for each_value in random_graph.nodes():
+                    assert dynamic_tree.distance_to(each_value) \
+                        == fresh_tree.distance_to(each_value)
+                    if dynamic_tree.reaches(each_value):
+                        path = dynamic_tree.path_to(each_value)
+                        assert path[0] == start
+                        assert path[-1] == each_value
+                        assert sum(
+                            random_graph.return_weighting(path[i - 1],
+                                                          path[i])
+                            for i in range(1, len(path))) \
+                            == dynamic_tree.distance_to(each_value)
+
+    def test_spatial_queries(self):
+
+        graph = shortest_paths.ShortestPathsGraph()
+        assert graph.nearest_node(0, 0) is None
+        assert graph.k_nearest(0, 0, 3) == []
+
+        random_generator = random.Random(0)
+        for each_integer in range(0, 300):
+            graph.add_node(each_integer)
+            if each_integer % 10:
+                graph.set_coordinates(each_integer,
+                                      random_generator.uniform(-50, 50),
+                                      random_generator.uniform(0, 20))
+
+        def distance_from(x, y, value):
+            this_node = graph.nodes_by_value[value]
+            return ((this_node.x_coordinate - x) ** 2
+                    + (this_node.y_coordinate - y) ** 2) ** 0.5
+
+        def check_queries():
+            placed_values = [each_node.value for each_node in graph.node_list
+                             if each_node.x_coordinate is not None]
+            for each_query in range(0, 30):
+                x = random_generator.uniform(-200, 200)
+                y = random_generator.uniform(-100, 100)
+
+                expected = sorted(distance_from(x, y, each_value)
+                                  for each_value in placed_values)
+                assert distance_from(x, y, graph.nearest_node(x, y)) \
+                    == expected[0]
+                assert [distance_from(x, y, each_value) for each_value
+                        in graph.k_nearest(x, y, 7)] == expected[:7]
+
+                min_x, max_x = sorted(random_generator.uniform(-60, 60)
+                                      for each_bound in range(0, 2))
+                min_y, max_y = sorted(random_generator.uniform(-5, 25)
+                                      for each_bound in range(0, 2))
+                assert sorted(graph.nodes_in_box(min_x, min_y,
+                                                 max_x, max_y)) \
+                    == sorted(each_value for each_value in placed_values
+                              if min_x <= graph.nodes_by_value[
+                                  each_value].x_coordinate <= max_x
+                              and min_y <= graph.nodes_by_value[
+                                  each_value].y_coordinate <= max_y)
+
+        check_queries()
+
+        # The index follows moved, newly placed and deleted Nodes,
+        # including enough new ones to resize its cells:
+        for each_integer in range(0, 300, 3):
+            graph.set_coordinates(each_integer,
+                                  random_generator.uniform(-50, 50),
+                                  random_generator.uniform(0, 20))
+        for each_integer in range(300, 1500):
+            graph.add_node(each_integer)
+            graph.set_coordinates(each_integer,
+                                  random_generator.uniform(0, 10),
+                                  random_generator.uniform(0, 10))
+        for each_integer in range(1, 300, 7):
+            graph.del_node(each_integer)
+
+        check_queries()
+
+        assert len(graph.k_nearest(0, 0, 5000)) == len(
+            graph.spatial_index.positions)
+        with self.assertRaises(ValueError):
+            graph.set_coordinates("nonexistent", 0, 0)
+
+        # Points spread far beyond what the index was first sized for
+        # get cells resized to suit them, rather than queries walking
+        # through rings of empty cells to reach them:
+        spreading_graph = shortest_paths.ShortestPathsGraph()
+        spreading_graph.add_node('a')
+        spreading_graph.add_node('b')
+        spreading_graph.set_coordinates('a', 0, 0)
+        spreading_graph.set_coordinates('b', 0.001, 0)
+        assert spreading_graph.nearest_node(1, 1) == 'b'
 
+        for each_integer in range(0, 10):
+            spreading_graph.add_node(each_integer)
+            spreading_graph.set_coordinates(each_integer,
+                                            10 * each_integer, 5)
+
+        index = spreading_graph.spatial_index
+        assert index._occupied_span() \
+            <= 4 * len(index.positions) ** 0.5 + 4
+        assert spreading_graph.nearest_node(45.0, 2.0) in (4, 5)
+        assert spreading_graph.k_nearest(1e6, 1e6, 2) == [9, 8]
+        assert sorted(spreading_graph.nodes_in_box(-1, -1, 15, 6)) \
+            == [0, 1, 'a', 'b']
+
+        # Coordinates in the millions from the start, too:
+        far_graph = shortest_paths.ShortestPathsGraph()
+        far_graph.add_node('only')
+        far_graph.set_coordinates('only', 3e6, 4e6)
+        assert far_graph.nearest_node(0, 0) == 'only'
+        far_graph.add_node('next')
+        far_graph.set_coordinates('next', -3e6, -4e6)
+        assert far_graph.k_nearest(1, 1, 2) in (['only', 'next'],
+                                                ['next', 'only'])
+        assert far_graph.nodes_in_box(-1e7, -1e7, 0, 0) == ['next']
+
+    def test_dag_algorithms(self):
+
+        # A small build pipeline, weighted with how long each step takes:
+        pipeline = shortest_paths.ShortestPathsGraph(directed=True)
+        pipeline.add_weighted_edge("fetch", "compile", 3)
+        pipeline.add_weighted_edge("fetch", "docs", 1)
+        pipeline.add_weighted_edge("compile", "test", 5)
+        pipeline.add_weighted_edge("compile", "package", 2)
+        pipeline.add_weighted_edge("test", "release", 1)
+        pipeline.add_weighted_edge("package", "release", 1)
+        pipeline.add_weighted_edge("docs", "release", 2)
+        pipeline.add_node("unrelated")
+
+        order = pipeline.topological_order()
+        assert sorted(order) == sorted(pipeline.nodes())
+        for each_edge in pipeline.edge_list:
+            assert order.index(each_edge.alpha_node.value) \
+                < order.index(each_edge.beta_node.value)
+
+        tree = pipeline.dag_shortest_paths("fetch")
+        assert tree.distance_to("release") == 3
+        assert tree.path_to("release") == ["fetch", "docs", "release"]
+        assert tree.distance_to("test") == 8
+        assert not tree.reaches("unrelated")
+        assert pipeline.dag_shortest_paths("test").path_to("release") \
+            == ["test", "release"]
+
+        assert pipeline.critical_path() \
+            == (9, ["fetch", "compile", "test", "release"])
+        assert pipeline.critical_path("package") \
+            == (1, ["package", "release"])
+        assert shortest_paths.ShortestPathsGraph(
+            directed=True).critical_path() is None
+
+        # Unlike Dijkstra's algorithm, DAG relaxation copes with
+        # negative weightings:
+        pipeline.add_weighted_edge("docs", "test", -10)
+        assert pipeline.dag_shortest_paths("fetch").path_to("release") \
+            == ["fetch", "docs", "test", "release"]
+
+        with self.assertRaises(ValueError):
+            pipeline.dag_shortest_paths("nonexistent")
+        with self.assertRaises(ValueError):
+            shortest_paths.ShortestPathsGraph().topological_order()
+
+        pipeline.add_weighted_edge("release", "compile", 1)
+        with self.assertRaises(ValueError) as raised:
+            pipeline.topological_order()
+        assert "compile" in str(raised.exception)
+        with self.assertRaises(ValueError):
+            pipeline.dag_shortest_paths("fetch")
+        with self.assertRaises(ValueError):
+            pipeline.critical_path()
+
+        random_generator = random.Random(0)
+        for each_pass in range(0, 10):
+            random_dag = shortest_paths.ShortestPathsGraph(directed=True)
+            for each_integer in range(0, 40):
+                random_dag.add_node(each_integer)
+            # Edges only lead from lower values to higher ones:
+            for each_edge_count in range(0, 120):
+                alpha_value, beta_value = sorted(random_generator.sample(
+                    range(0, 40), 2))
+                random_dag.add_weighted_edge(alpha_value, beta_value,
+                                             random_generator.randint(1, 20))
+
+            dag_tree = random_dag.dag_shortest_paths(0)
+            heap_tree = random_dag.shortest_path_tree(0)
+            for each_integer in range(0, 40):
+                assert dag_tree.distance_to(each_integer) \
+                    == heap_tree.distance_to(each_integer)
+
+    def test_distance_matrix(self):
+
+        random_graph = shortest_paths.ShortestPathsGraph()
+        for each_integer in range(0, 40):
+            random_graph.add_node(each_integer)
+        for each_edge_count in range(0, 50):
+            random_graph.add_weighted_edge(random.randrange(40),
+                                           random.randrange(40),
+                                           random.randint(1, 20))
+
+        sources = [0, 5, 10, 15, 20]
+        targets = [1, 2, 3, 39, 0]
+
+        for each_worker_count in (1, 2):
+            matrix = random_graph.distance_matrix(sources, targets,
+                                                  workers=each_worker_count)
+            assert len(matrix) == len(sources)
+
+            for each_row, source in enumerate(sources):
+                assert len(matrix[each_row]) == len(targets)
+                for each_column, target in enumerate(targets):
+                    expected = random_graph.dijkstra_algorithm(source, target)
+                    if source == target:
+                        assert matrix[each_row][each_column] == 0
+                    elif expected is None:
+                        assert matrix[each_row][each_column] == float('inf')
+                    else:
+                        assert matrix[each_row][each_column] == expected[0]
+
+        with self.assertRaises(ValueError):
+            random_graph.distance_matrix([0], ["nowhere"])
 
     def test_both_traversals(self):
 
@@ -282,6 +1080,83 @@ class test_ShortestPathsGraph(unittest.TestCase):
         for each_node in self.circular_graph.node_list:
             assert each_node.value not in deleted_circular_graph_nodes
 
+    def test_node_index_follows_add_and_del_node(self):
+
+        self.setUp()
+
+        for each_node in self.linear_graph.node_list:
+            assert self.linear_graph.nodes_by_value[each_node.value] \
+                is each_node
+            assert self.linear_graph._return_node_with_this_value(
+                each_node.value) is each_node
+
+        assert self.linear_graph._return_node_with_this_value(100) is None
+
+        # Re-adding an existing value must not replace its Node:
+        original_node = self.linear_graph.nodes_by_value[5]
+        self.linear_graph.add_node(5)
+        assert self.linear_graph.nodes_by_value[5] is original_node
+        assert len(self.linear_graph.node_list) == 10
+
+        self.linear_graph.del_node(5)
+
+        assert self.linear_graph.has_node(5) is False
+        assert 5 not in self.linear_graph.nodes_by_value
+        assert len(self.linear_graph.node_list) == 9
+
+        # The deleted Node's Edges go with it:
+        assert len(self.linear_graph.edge_list) == 7
+        assert self.linear_graph.neighbors(4) == [3]
+        assert self.linear_graph.neighbors(6) == [7]
+
+        # A new Node with the same value is a brand new Node:
+        self.linear_graph.add_edge(4, 5)
+        assert self.linear_graph.nodes_by_value[5] is not original_node
+        assert self.linear_graph.adjacent(4, 5) is True
+
+    def test_weighted_edges_use_neighbor_maps(self):
+
+        graph = shortest_paths.ShortestPathsGraph()
+
+        graph.add_weighted_edge("alpha", "beta", 3)
+        graph.add_weighted_edge("beta", "gamma", 4)
+
+        alpha_node = graph.nodes_by_value["alpha"]
+        beta_node = graph.nodes_by_value["beta"]
+
+        assert alpha_node.edges_by_neighbor[beta_node] \
+            is beta_node.edges_by_neighbor[alpha_node]
+
+        # Each weighted Edge is filed exactly once everywhere:
+        assert len(graph.edge_list) == 2
+        assert len(alpha_node.edges_for_this_node) == 1
+        assert len(beta_node.edges_for_this_node) == 2
+
+        assert graph.has_edge("alpha", "beta") is True
+        assert graph.has_edge("beta", "alpha") is True
+        assert graph.has_edge("alpha", "gamma") is False
+        assert graph.has_edge("alpha", "nowhere") is False
+        assert graph.return_weighting("gamma", "beta") == 4
+
+        # Re-adding an existing Edge updates its weighting in place:
+        graph.add_weighted_edge("beta", "alpha", 7)
+        assert len(graph.edge_list) == 2
+        assert graph.return_weighting("alpha", "beta") == 7
+
+        graph.del_edge("beta", "alpha")
+        assert graph.has_edge("alpha", "beta") is False
+        assert graph.adjacent("alpha", "beta") is False
+        assert beta_node not in alpha_node.edges_by_neighbor
+        assert len(graph.edge_list) == 1
+
+        with self.assertRaises(Exception):
+            graph.del_edge("alpha", "beta")
+        with self.assertRaises(Exception):
+            graph.return_weighting("alpha", "beta")
+
+        graph.del_node("gamma")
+        assert beta_node.edges_by_neighbor == {}
+
     def test_del_edge(self):
         ''' g.del_edge(n1, n2): deletes the edge connecting 'n1' and
         'n2' from the graph, raises an error if no such edge exists '''
@@ -0,0 +1,95 @@
+''' Timing demonstrations for the TraversableGraph.
+
+Run this file from the command line to compare breadth_first_traversal()
+with parallel_bfs() over a range of graph sizes and worker counts. '''
+
+import multiprocessing
+import random
+import sys
+from timeit import default_timer
+
+import traversable_graph
+
+
+def build_random_graph(node_count, extra_edges_per_node=2, seed=0):
+    ''' Return a connected TraversableGraph with node_count Nodes:
+    a chain through every Node plus extra_edges_per_node random
+    Edges per Node. '''
+
+    random_generator = random.Random(seed)
+    graph = traversable_graph.TraversableGraph()
+
+    nodes = [graph.add_node(each_integer, _returning=True)
+             for each_integer in range(0, node_count)]
+
+    # add_edge() looks both Nodes up by value, which takes time linear
+    # in the size of the graph, so the Edges are wired up directly.
+    def connect(node_one, node_two):
+        new_edge = traversable_graph.Edge(node_one, node_two)
+        node_one.edges_for_this_node.append(new_edge)
+        node_two.edges_for_this_node.append(new_edge)
+        graph.edge_list.append(new_edge)
+
+    for each_index in range(1, node_count):
+        connect(nodes[each_index - 1], nodes[each_index])
+
+    for each_index in range(0, node_count * extra_edges_per_node):
+        connect(random_generator.choice(nodes),
+                random_generator.choice(nodes))
+
+    return graph
+
+
+def benchmark_parallel_bfs(node_counts):
+    ''' Time a full breadth_first_traversal() against parallel_bfs():
+    its first call, which builds the compact adjacency, and then later
+    calls with 1, 2, 4... worker processes, up to the number of cores,
+    with each one's speedup over the traversal. '''
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= multiprocessing.cpu_count():
+        worker_counts.append(worker_counts[-1] * 2)
+
+    print "\nFull BFS seconds, and speedup over the traversal" \
+        " ({} cores):".format(multiprocessing.cpu_count())
+    print "{:>10} {:>10} {:>10}".format(
+        "nodes", "traversal", "first call") + "".join(
+            "{:>10} {:>7}".format("{} worker".format(each_count), "speedup")
+            for each_count in worker_counts)
+
+    for each_node_count in node_counts:
+        graph = build_random_graph(each_node_count)
+
+        started_at = default_timer()
+        graph.breadth_first_traversal(0)
+        traversal_seconds = default_timer() - started_at
+
+        started_at = default_timer()
+        graph.parallel_bfs(0)
+        first_call_seconds = default_timer() - started_at
+
+        row = "{:>10} {:>10.3f} {:>10.3f}".format(
+            each_node_count, traversal_seconds, first_call_seconds)
+
+        for each_count in worker_counts:
+            started_at = default_timer()
+            graph.parallel_bfs(0, workers=each_count)
+            each_timing = default_timer() - started_at
+            row += "{:>10.3f} {:>6.1f}x".format(
+                each_timing, traversal_seconds / each_timing)
+
+        print row
+
+
+if __name__ == '__main__':
+
+    # Pass a smaller limit on the command line for a quicker run,
+    # e.g. "python benchmark_traversable_graph.py 100000"
+    largest_graph = 1000000
+    if len(sys.argv) > 1:
+        largest_graph = int(sys.argv[1])
+
+    graph_sizes = [each_size for each_size in (1000, 10000, 100000, 1000000)
+                   if each_size <= largest_graph]
+
+    benchmark_parallel_bfs(graph_sizes)
@@ -77,6 +77,83 @@ class test_TraversableGraph(unittest.TestCase):
         # when tested multiple times:
         # random_graph.breadth_first_traversal(len(broad_path) - 15)
 
+    def test_iter_traversals(self):
+
+        self.setUp()
+
+        # On a chain the two orders are fully predictable:
+        assert list(self.linear_graph.iter_dfs(0)) == range(0, 10)
+        assert list(self.linear_graph.iter_bfs(0)) == range(0, 10)
+        assert list(self.linear_graph.iter_bfs(5)) \
+            == [5, 4, 6, 3, 7, 2, 8, 1, 9, 0]
+
+        assert self.circular_graph.depth_first_traversal(0) \
+            == list(self.circular_graph.iter_dfs(0))
+        assert self.circular_graph.breadth_first_traversal(0) \
+            == list(self.circular_graph.iter_bfs(0))
+
+        # Values come out as they're reached, so callers can stop early:
+        deep_iterator = self.circular_graph.iter_dfs(3)
+        broad_iterator = self.circular_graph.iter_bfs(3)
+        assert next(deep_iterator) == 3
+        assert next(broad_iterator) == 3
+        assert sorted([next(broad_iterator), next(broad_iterator)]) == [2, 4]
+
+        # Self-loops and isolated Nodes:
+        self.linear_graph.add_edge(9, 9)
+        self.linear_graph.add_node("isolated")
+        assert list(self.linear_graph.iter_bfs(9)) == range(9, -1, -1)
+        assert list(self.linear_graph.iter_dfs("isolated")) == ["isolated"]
+
+        with self.assertRaises(Exception):
+            next(self.linear_graph.iter_dfs("nowhere"))
+        with self.assertRaises(Exception):
+            next(self.linear_graph.iter_bfs("nowhere"))
+
+    def test_parallel_bfs(self):
+
+        self.setUp()
+
+        assert list(self.linear_graph.parallel_bfs(0)) == range(0, 10)
+        assert list(self.circular_graph.parallel_bfs(0)) \
+            == [0, 1, 2, 3, 4, 5, 4, 3, 2, 1]
+
+        self.linear_graph.add_node("isolated")
+        assert self.linear_graph.parallel_bfs(9)[-1] == -1
+
+        # The compact adjacency is reused until the graph changes:
+        adjacency = self.linear_graph._compact_adjacency()
+        self.linear_graph.parallel_bfs(0)
+        assert self.linear_graph._compact_adjacency() is adjacency
+        self.linear_graph.add_edge(0, "isolated")
+        assert self.linear_graph.parallel_bfs(9)[-1] == 10
+        self.linear_graph.del_edge(0, "isolated")
+        assert self.linear_graph.parallel_bfs(9)[-1] == -1
+
+        with self.assertRaises(Exception):
+            self.linear_graph.parallel_bfs("nowhere")
+
+        # Hop counts must agree with the order BFS reaches Nodes in,
+        # whether frontiers are expanded here or by worker processes:
+        random_graph = traversable_graph.TraversableGraph()
+        random_graph.parallel_bfs_chunk_size = 4
+        for each_integer in range(0, 200):
+            random_graph.add_node(each_integer)
+        for each_edge_count in range(0, 300):
+            two_random_nodes = random.sample(random_graph.node_list, 2)
+            random_graph.add_edge(two_random_nodes[0].value,
+                                  two_random_nodes[1].value)
+
+        serial_hops = random_graph.parallel_bfs(0)
+        assert random_graph.parallel_bfs(0, workers=2) == serial_hops
+
+        broad_path = random_graph.breadth_first_traversal(0)
+        assert len(broad_path) == len([each_hop for each_hop in serial_hops
+                                       if each_hop >= 0])
+        for each_index in range(1, len(broad_path)):
+            assert serial_hops[broad_path[each_index - 1]] \
+                <= serial_hops[broad_path[each_index]]
+
     # Testing the rest of TraversableGraph:
 
     def setUp(self):
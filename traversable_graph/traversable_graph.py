@@ -1,8 +1,10 @@
 
-from Queue import Queue
+from array import array
+from collections import deque
+import multiprocessing
 
 
-class Node:
+class Node(object):
 
     def __init__(self, value):
 
@@ -10,7 +12,7 @@ class Node:
         self.edges_for_this_node = []
 
 
-class Edge:
+class Edge(object):
 
     def __init__(self, alpha_node, beta_node):
 
@@ -18,13 +20,61 @@ class Edge:
         self.beta_node = beta_node
 
 
+# The compact adjacency each parallel_bfs() worker process expands
+# frontiers over, and the visited marks it shares with the others,
+# set once per worker when its pool starts up.
+_worker_offsets = None
+_worker_targets = None
+_worker_visited = None
+
+
+def _initialize_parallel_bfs_worker(offsets, targets, visited):
+
+    global _worker_offsets, _worker_targets, _worker_visited
+    _worker_offsets = offsets
+    _worker_targets = targets
+    _worker_visited = visited
+
+
+def _expand_frontier_chunk(frontier_ids):
+
+    return _expand_frontier(_worker_offsets, _worker_targets,
+                            _worker_visited, frontier_ids)
+
+
+def _expand_frontier(offsets, targets, visited, frontier_ids):
+    ''' Mark every neighbor of the ids in frontier_ids that isn't marked
+    in visited yet, and return an array of their ids.
+
+    Workers share one visited array, so two of them can occasionally
+    both find the same id unmarked and both return it; parallel_bfs()
+    skips the second copy. '''
+
+    new_ids = array('l')
+    for each_id in frontier_ids:
+        for each_neighbor_id in targets[offsets[each_id]:
+                                        offsets[each_id + 1]]:
+            if not visited[each_neighbor_id]:
+                visited[each_neighbor_id] = 1
+                new_ids.append(each_neighbor_id)
+    return new_ids
+
+
 class TraversableGraph:
 
+    # The smallest share of a frontier worth handing to each worker
+    # process in parallel_bfs().
+    parallel_bfs_chunk_size = 1024
+
     def __init__(self):
 
         self.node_list = []
         self.edge_list = []
 
+        # The compact adjacency parallel_bfs() searches, built when it's
+        # first needed and thrown away whenever the graph changes.
+        self._adjacency = None
+
     def nodes(self):
         ''' Return a list containing all Nodes in the TraversableGraph. '''
 
@@ -52,6 +102,7 @@ class TraversableGraph:
 
         new_node = Node(n)
         self.node_list.append(new_node)
+        self._adjacency = None
 
         if _returning is True:
             return new_node
@@ -74,6 +125,7 @@ class TraversableGraph:
         node_two.edges_for_this_node.append(new_edge)
 
         self.edge_list.append(new_edge)
+        self._adjacency = None
 
     def has_node(self, n):
         ''' Return True if n is contained in the graph
@@ -100,6 +152,8 @@ class TraversableGraph:
 
             raise Exception("{} not in TraversableGraph".formate(n))
 
+        self._adjacency = None
+
         for each_edge in self.edge_list:
 
             # This design decision means Nodes with identical values
@@ -145,6 +199,7 @@ class TraversableGraph:
         if found_the_correct_edge is False:
             raise Exception("Edge ({}, {}) not in TraversableGraph".format(n1,
                                                                            n2))
+        self._adjacency = None
 
     def neighbors(self, n):
         ''' Return the list of all Nodes connected to Node n by Edges.
@@ -214,6 +269,19 @@ class TraversableGraph:
         ''' Perform a full depth-first traversal of the graph beginning
         at start. Return the full visited path when traversal is complete. '''
 
+        return list(self.iter_dfs(start))
+
+    def breadth_first_traversal(self, start):
+        ''' Perform a full breadth-first traversal of the graph, beginning
+        at start. Return the full visited path when traversal is complete. '''
+
+        return list(self.iter_bfs(start))
+
+    def iter_dfs(self, start):
+        ''' Yield the values of the Nodes reachable from start one at a
+        time, in depth-first order, as the traversal reaches them.
+        Raise an exception if start is not in the TraversableGraph. '''
+
         # A depth-first traversal algorithm is the same thing as
         # a breadth-first traversal algorithm, except it uses a stack
         # instead of a queue.
@@ -222,87 +290,176 @@ class TraversableGraph:
         # http://eddmann.com/posts/
         #    depth-first-search-and-breadth-first-search-in-python/
 
-        starting_node = self._return_node_with_this_value(start)
+        starting_node = self._return_starting_node(start)
 
         # Seed the stack with where ever we're starting.
         stack_to_visit = [starting_node]
 
-        # The visited Nodes list will serve as a record of our path.
-        previously_visited_nodes = []
-        nodes_already_added_to_stack = []
+        # Nodes go in this set as they go on the stack, so no Node
+        # is ever stacked (or visited) twice.
+        nodes_already_added_to_stack = set([starting_node])
 
-        # Base the while loop on the size of the stack:
-        while len(stack_to_visit) > 0:
+        while stack_to_visit:
 
             current_node = stack_to_visit.pop()
-            previously_visited_nodes.append(current_node)
+            yield current_node.value
 
-            for each_value in self.neighbors(current_node.value):
-                # This is inefficient but economizes on writing new functions.
-                # If desired, can be fixed by implementing an internal call
-                # for _neighbor_nodes() (that accepts a Node, perhaps).
-                each_neighbor = self._return_node_with_this_value(each_value)
+            for each_neighbor in self._neighbor_nodes(current_node):
+                if each_neighbor not in nodes_already_added_to_stack:
+                    stack_to_visit.append(each_neighbor)
+                    nodes_already_added_to_stack.add(each_neighbor)
 
-                # This wrecks the big O value, but I don't feel like i have
-                # enough time to improve it right now.
-                # Probably something involving dictionaries.
-                if each_neighbor not in previously_visited_nodes:
-                    if each_neighbor not in nodes_already_added_to_stack:
-                        stack_to_visit.append(each_neighbor)
-                        nodes_already_added_to_stack.append(each_neighbor)
-
-        previously_visited_node_values \
-            = [each_node.value for each_node in previously_visited_nodes]
-
-        return previously_visited_node_values
-
-    def breadth_first_traversal(self, start):
-        ''' Perform a full breadth-first traversal of the graph, beginning
-        at start. Return the full visited path when traversal is complete. '''
+    def iter_bfs(self, start):
+        ''' Yield the values of the Nodes reachable from start one at a
+        time, in breadth-first order, as the traversal reaches them.
+        Raise an exception if start is not in the TraversableGraph. '''
 
         # A breadth-first traversal algorithm is the same thing as
         # a depth-first traversal algorithm, except it uses a queue
         # instead of a stack.
 
-        # Well-informed (possibly to the point of nearly copying) by:
-        # http://eddmann.com/posts/
-        #    depth-first-search-and-breadth-first-search-in-python/
+        starting_node = self._return_starting_node(start)
+
+        # A deque, unlike Queue.Queue, takes no locks on the way in or out.
+        queue_to_visit = deque([starting_node])
+        nodes_already_added_to_queue = set([starting_node])
+
+        while queue_to_visit:
+
+            current_node = queue_to_visit.popleft()
+            yield current_node.value
+
+            for each_neighbor in self._neighbor_nodes(current_node):
+                if each_neighbor not in nodes_already_added_to_queue:
+                    queue_to_visit.append(each_neighbor)
+                    nodes_already_added_to_queue.add(each_neighbor)
+
+    def parallel_bfs(self, start, workers=1):
+        ''' Return an array holding every Node's hop distance from start,
+        in the same order as nodes(), with -1 for Nodes start cannot reach.
+        Raise an exception if start is not in the TraversableGraph.
+
+        The search runs one BFS level at a time over a compact copy of
+        the graph's adjacency, which is built on the first call and kept
+        until the graph changes. With workers greater than 1, each
+        level's frontier is split across a pool of that many processes,
+        which mark the Nodes they reach in one shared array and send
+        back only the ones no one had reached before; frontiers too
+        small to be worth shipping out are expanded here. '''
+
+        starting_node = self._return_starting_node(start)
 
-        # Seed the queue with where ever we're starting.
-        queue_to_visit = Queue()
-        queue_to_visit.put(self._return_node_with_this_value(start))
-        # The visited nodes list will serve as a record of our path.
-        previously_visited_nodes = []
-        nodes_already_added_to_queue = []
-
-        # Base the while loop on the size of the queue:
-        while queue_to_visit.qsize() > 0:
-
-            current_node = queue_to_visit.get()
-            previously_visited_nodes.append(current_node)
-
-            for each_value in self.neighbors(current_node.value):
-                # This is inefficient but economizes on writing new functions.
-                # If desired, can be fixed by implementing an internal call
-                # for _neighbor_nodes() (that accepts a Node, perhaps).
-                each_neighbor = self._return_node_with_this_value(each_value)
-
-                # This wrecks the big O value, but I don't feel like i have
-                # enough time to improve it right now.
-                # Probably something involving dictionaries.
-                if each_neighbor not in previously_visited_nodes:
-                    if each_neighbor not in nodes_already_added_to_queue:
-                        queue_to_visit.put(each_neighbor)
-                        # Queue.Queue does not have a simply way to surveil its
-                        # own contents, so we build a list to keep track of
-                        # what we've added to it to prevent certain situations
-                        # involving multiple neighbors:
-                        nodes_already_added_to_queue.append(each_neighbor)
-
-        previously_visited_node_values \
-            = [each_node.value for each_node in previously_visited_nodes]
-
-        return previously_visited_node_values
+        offsets, targets, node_ids = self._compact_adjacency()
+        node_count = len(self.node_list)
+
+        pool = None
+        if workers > 1:
+            # Shared memory, so every worker sees every other's marks:
+            visited = multiprocessing.RawArray('b', node_count)
+            pool = multiprocessing.Pool(
+                workers, initializer=_initialize_parallel_bfs_worker,
+                initargs=(offsets, targets, visited))
+        else:
+            visited = bytearray(node_count)
+
+        hops = array('l', [-1]) * node_count
+        starting_id = node_ids[starting_node]
+        hops[starting_id] = 0
+        visited[starting_id] = 1
+        frontier_ids = array('l', [starting_id])
+        level = 0
+
+        try:
+            while frontier_ids:
+
+                level += 1
+
+                if (pool is not None and len(frontier_ids)
+                        >= workers * self.parallel_bfs_chunk_size):
+                    chunk_size = -(-len(frontier_ids) // workers)
+                    expanded_chunks = pool.map(
+                        _expand_frontier_chunk,
+                        [frontier_ids[each_index:each_index + chunk_size]
+                         for each_index in range(0, len(frontier_ids),
+                                                 chunk_size)])
+                else:
+                    expanded_chunks = [_expand_frontier(offsets, targets,
+                                                        visited,
+                                                        frontier_ids)]
+
+                next_frontier_ids = array('l')
+                for each_chunk in expanded_chunks:
+                    for each_id in each_chunk:
+                        if hops[each_id] == -1:
+                            hops[each_id] = level
+                            next_frontier_ids.append(each_id)
+
+                frontier_ids = next_frontier_ids
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return hops
+
+    def _compact_adjacency(self):
+        ''' Return (offsets, targets, node_ids): the neighbors of the Node
+        numbered i are the ids from targets[offsets[i]] up to
+        targets[offsets[i + 1]]. Nodes are numbered in node_list order,
+        and node_ids maps each Node to its number.
+        The result is kept until add_node(), add_edge(), del_node() or
+        del_edge() changes the graph. '''
+
+        if self._adjacency is not None:
+            return self._adjacency
+
+        node_ids = dict((each_node, each_id) for each_id, each_node
+                        in enumerate(self.node_list))
+
+        offsets = array('l', [0])
+        targets = array('l')
+
+        # The same walk as _neighbor_nodes(), written out here since
+        # it's done for every Edge twice over.
+        append_target = targets.append
+        for each_node in self.node_list:
+            for each_edge in each_node.edges_for_this_node:
+                the_other_node = each_edge.beta_node
+                if the_other_node is each_node:
+                    the_other_node = each_edge.alpha_node
+                    if the_other_node is each_node:
+                        continue
+                append_target(node_ids[the_other_node])
+            offsets.append(len(targets))
+
+        self._adjacency = (offsets, targets, node_ids)
+
+        return self._adjacency
+
+    def _return_starting_node(self, start):
+
+        starting_node = self._return_node_with_this_value(start)
+        if starting_node is None:
+            raise Exception("{} not in TraversableGraph".format(start))
+        return starting_node
+
+    def _neighbor_nodes(self, this_node):
+        ''' Return the Nodes this_node shares an Edge with, in the same
+        order neighbors() returns their values, without looking any of
+        them up by value. '''
+
+        neighbor_nodes = []
+
+        for each_edge in this_node.edges_for_this_node:
+            if each_edge.alpha_node is this_node:
+                the_other_node = each_edge.beta_node
+            else:
+                the_other_node = each_edge.alpha_node
+            # Self-loops don't lead anywhere new:
+            if the_other_node is not this_node:
+                neighbor_nodes.append(the_other_node)
+
+        return neighbor_nodes
 
 if __name__ == '__main__':
     # "In addition, write some demonstration code in
@@ -1,5 +1,8 @@
 import weighted_graph
 import unittest
+from array import array
+import os
+import tempfile
 
 '''
 Your graph should support the following operations:
@@ -403,6 +406,72 @@ class test_WeightedGraph(unittest.TestCase):
         self.circular_graph.add_weighted_edge(-6, "stringzzz", -4)
         assert self.circular_graph.return_weighting("stringzzz", -6) == -4
 
+    def test_freeze(self):
+
+        self.setUp()
+
+        for each_index in range(1, 10):
+            self.linear_graph.add_weighted_edge(each_index - 1, each_index,
+                                                each_index)
+        # Unweighted Edges are left out of the frozen graph:
+        self.linear_graph.add_edge(0, 9)
+
+        frozen_graph = self.linear_graph.freeze()
+
+        assert frozen_graph.nodes() == self.linear_graph.nodes()
+        assert sorted(frozen_graph.neighbors(5)) == [4, 6]
+        assert frozen_graph.neighbors(0) == [1]
+
+        assert frozen_graph.breadth_first_traversal(0) == range(0, 10)
+        assert frozen_graph.depth_first_traversal(9) == range(9, -1, -1)
+
+        assert frozen_graph.dijkstra_algorithm(0, 3) == (6, [0, 1, 2, 3])
+        assert frozen_graph.a_star_algorithm(3, 0) == (6, [3, 2, 1, 0])
+
+        frozen_graph = self.empty_graph.freeze()
+        assert frozen_graph.nodes() == []
+        with self.assertRaises(Exception):
+            frozen_graph.breadth_first_traversal(0)
+
+    def test_add_weighted_edges_from(self):
+
+        self.setUp()
+
+        self.circular_graph.add_weighted_edges_from(
+            [(1, 2, 5), (6, 3, 4), (-1, 0, 5), (2, 1, 7), (10, 11, 2.5)])
+
+        assert self.circular_graph.return_weighting(1, 2) == 7
+        assert self.circular_graph.return_weighting(3, 6) == 4
+        assert self.circular_graph.return_weighting(0, -1) == 5
+        assert self.circular_graph.return_weighting(11, 10) == 2.5
+        assert len(self.circular_graph.node_list) == 13
+        assert len(self.circular_graph.edge_list) == 13
+        assert self.circular_graph.neighbors(10) == [11]
+
+        with self.assertRaises(TypeError):
+            self.circular_graph.add_weighted_edges_from([(1, 2, "heavy")])
+
+        file_descriptor, path = tempfile.mkstemp()
+        os.write(file_descriptor, "alpha,beta,weighting\n"
+                                  "0,1,3\n1,2,0.5\n2,0,4\n")
+        os.close(file_descriptor)
+        try:
+            self.empty_graph.add_weighted_edges_from_csv(path, node_type=int,
+                                                         has_header=True)
+        finally:
+            os.remove(path)
+
+        assert self.empty_graph.nodes() == [0, 1, 2]
+        assert self.empty_graph.return_weighting(1, 2) == 0.5
+        assert self.empty_graph.return_weighting(0, 2) == 4
+        assert isinstance(self.empty_graph.return_weighting(0, 1), int)
+
+        self.linear_graph.add_weighted_edges_from_arrays(
+            array('l', [20, 21]), array('l', [21, 22]), array('d', [1, 2]))
+        assert self.linear_graph.return_weighting(22, 21) == 2
+        with self.assertRaises(ValueError):
+            self.linear_graph.add_weighted_edges_from_arrays([1], [2], [])
+
 
 
 
@@ -1,8 +1,14 @@
 
+import csv
+import gc
+from itertools import izip
 from Queue import Queue
 
+from frozen_graph import FrozenGraph
 
-class Node:
+
+# New-style, since old-style instances are slow to hash as dict keys.
+class Node(object):
 
     def __init__(self, value):
 
@@ -10,7 +16,7 @@ class Node:
         self.edges_for_this_node = []
 
 
-class Edge:
+class Edge(object):
 
     def __init__(self, alpha_node, beta_node):
 
@@ -18,6 +24,15 @@ class Edge:
         self.beta_node = beta_node
 
 
+def _number_from_string(text):
+    ''' Return text as an int if it is one, or else as a float. '''
+
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
 class WeightedGraph:
 
     def __init__(self):
@@ -334,6 +349,98 @@ class WeightedGraph:
             node_two.edges_for_this_node.append(new_edge)
             self.edge_list.append(new_edge)
 
+    def add_weighted_edges_from(self, weighted_edges):
+        ''' Add every (n1, n2, weighting) in weighted_edges as
+        add_weighted_edge() would, creating Nodes as needed and updating
+        the weighting of Edges that already exist.
+
+        Rather than scanning the graph for every Edge, this indexes its
+        Nodes by value and its Edges by their pair of Nodes once, up
+        front, and keeps those indexes up to date as it goes. '''
+
+        nodes_by_value = {}
+        for each_node in self.node_list:
+            nodes_by_value.setdefault(each_node.value, each_node)
+
+        edges_by_node_pair = {}
+        for each_edge in self.edge_list:
+            edges_by_node_pair.setdefault(
+                (each_edge.alpha_node, each_edge.beta_node), each_edge)
+            edges_by_node_pair.setdefault(
+                (each_edge.beta_node, each_edge.alpha_node), each_edge)
+
+        # Collecting over millions of new objects would outlast the load:
+        collector_was_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            for n1, n2, weighting in weighted_edges:
+
+                if not (isinstance(weighting, int)
+                        or isinstance(weighting, float)):
+                    raise TypeError("weighting must be int or float")
+
+                node_one = nodes_by_value.get(n1)
+                if node_one is None:
+                    node_one = nodes_by_value[n1] = Node(n1)
+                    self.node_list.append(node_one)
+
+                node_two = nodes_by_value.get(n2)
+                if node_two is None:
+                    node_two = nodes_by_value[n2] = Node(n2)
+                    self.node_list.append(node_two)
+
+                existing_edge = edges_by_node_pair.get((node_one, node_two))
+                if existing_edge is not None:
+                    existing_edge.weighting = weighting
+                    continue
+
+                new_edge = Edge(node_one, node_two)
+                new_edge.weighting = weighting
+
+                node_one.edges_for_this_node.append(new_edge)
+                node_two.edges_for_this_node.append(new_edge)
+                self.edge_list.append(new_edge)
+
+                edges_by_node_pair[(node_one, node_two)] = new_edge
+                edges_by_node_pair[(node_two, node_one)] = new_edge
+        finally:
+            if collector_was_enabled:
+                gc.enable()
+
+    def add_weighted_edges_from_csv(self, path, node_type=str,
+                                    delimiter=',', has_header=False):
+        ''' Add the weighted Edges listed in the CSV file at path, one
+        "n1,n2,weighting" row per Edge, with add_weighted_edges_from().
+        Node values are converted with node_type, and weightings become
+        ints or, failing that, floats. Set has_header to skip the
+        first row. '''
+
+        with open(path, 'rb') as csv_file:
+            rows = csv.reader(csv_file, delimiter=delimiter)
+            if has_header:
+                next(rows, None)
+            self.add_weighted_edges_from(
+                (node_type(n1), node_type(n2), _number_from_string(weighting))
+                for n1, n2, weighting in rows)
+
+    def add_weighted_edges_from_arrays(self, alpha_values, beta_values,
+                                       weightings):
+        ''' Add an Edge between alpha_values[i] and beta_values[i]
+        weighted weightings[i] for each i, with add_weighted_edges_from().
+        NumPy arrays are converted to lists of plain Python numbers
+        first, all at once. '''
+
+        columns = [each_column.tolist() if hasattr(each_column, 'tolist')
+                   else each_column for each_column
+                   in (alpha_values, beta_values, weightings)]
+
+        if not len(columns[0]) == len(columns[1]) == len(columns[2]):
+            raise ValueError("alpha_values, beta_values and weightings"
+                             " must be the same length")
+
+        self.add_weighted_edges_from(izip(*columns))
+
     def return_weighting(self, n1, n2):
         ''' Return the weighting between the Nodes with
         values n1, n2;or, raise Exception if no such nodes. '''
@@ -355,6 +462,17 @@ class WeightedGraph:
                 return True
         return False
 
+    def freeze(self):
+        ''' Return an immutable FrozenGraph snapshot of the weighted Edges
+        in the graph, which stores them as flat arrays instead of Node and
+        Edge objects. It can be traversed and searched for shortest paths
+        much faster and in far less memory, but does not reflect later
+        changes to the graph. Its shortest path algorithms assume no
+        weighting is negative. '''
+
+        return FrozenGraph.from_graph(self)
+
+
 if __name__ == '__main__':
     # "In addition, write some demonstration code in
     # an "if __name__ == '__main__':" block at the end of your file